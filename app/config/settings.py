@@ -8,5 +8,112 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o")
 
+# LLM client: max in-flight requests (also the HTTP connection pool size) and request timeout
+LLM_MAX_CONCURRENCY = int(os.getenv("EXECMIND_LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("EXECMIND_LLM_TIMEOUT_SECONDS", "60"))
+
+# LLM resilience: retries with exponential backoff (honouring Retry-After), client-side
+# rate limits matching the deployment's quota (0 = unlimited), and a circuit breaker
+LLM_MAX_RETRIES = int(os.getenv("EXECMIND_LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("EXECMIND_LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("EXECMIND_LLM_RETRY_MAX_SECONDS", "30"))
+LLM_RPM_LIMIT = float(os.getenv("EXECMIND_LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = float(os.getenv("EXECMIND_LLM_TPM_LIMIT", "0"))
+# Tokens reserved against the TPM limit for each response, settled against actual usage
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("EXECMIND_LLM_EXPECTED_COMPLETION_TOKENS", "500"))
+LLM_CIRCUIT_FAILURES = int(os.getenv("EXECMIND_LLM_CIRCUIT_FAILURES", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("EXECMIND_LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Structured output for the JSON prompts: "json_object" (JSON mode), "json_schema" (strict
+# schemas; needs API version 2024-08-01-preview or later) or "off" (prompt instructions only)
+LLM_STRUCTURED_OUTPUT = os.getenv("EXECMIND_LLM_STRUCTURED_OUTPUT", "json_object").lower()
+
+# Prompt budgets, in tokens (counted with tiktoken if installed, else ~4 characters per token):
+# the ceiling on every LLM call's system + user prompt (0 = none), the research prompt's shares
+# for internal history, web results and each web snippet, and how much of the refinement
+# history is kept verbatim before older clarifications are summarised
+LLM_PROMPT_TOKEN_CEILING = int(os.getenv("EXECMIND_LLM_PROMPT_TOKEN_CEILING", "8000"))
+RESEARCH_HISTORY_TOKEN_BUDGET = int(os.getenv("EXECMIND_RESEARCH_HISTORY_TOKEN_BUDGET", "600"))
+RESEARCH_WEB_TOKEN_BUDGET = int(os.getenv("EXECMIND_RESEARCH_WEB_TOKEN_BUDGET", "1200"))
+RESEARCH_SNIPPET_MAX_TOKENS = int(os.getenv("EXECMIND_RESEARCH_SNIPPET_MAX_TOKENS", "150"))
+REFINEMENT_HISTORY_TOKEN_BUDGET = int(os.getenv("EXECMIND_REFINEMENT_HISTORY_TOKEN_BUDGET", "400"))
+
+# LLM response cache (keyed by prompt hash) for the deterministic steps that opt in
+# (structuring, evaluation); set EXECMIND_LLM_CACHE=false to bypass globally
+LLM_CACHE_ENABLED = os.getenv("EXECMIND_LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("EXECMIND_LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("EXECMIND_LLM_CACHE_MAX_ENTRIES", "20000"))
+
+# Voice transcription: Whisper model size (tiny/base/small/...) and whether to
+# start loading it in a background worker process at startup
+WHISPER_MODEL_SIZE = os.getenv("EXECMIND_WHISPER_MODEL", "base")
+WHISPER_PRELOAD = os.getenv("EXECMIND_WHISPER_PRELOAD", "true").lower() == "true"
+# Long recordings are transcribed in windows, optionally across several processes
+TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("EXECMIND_TRANSCRIBE_WINDOW_SECONDS", "30"))
+TRANSCRIBE_PROCESSES = int(os.getenv("EXECMIND_TRANSCRIBE_PROCESSES", "1"))
+TRANSCRIBE_STREAM_MIN_SECONDS = float(os.getenv("EXECMIND_TRANSCRIBE_STREAM_MIN_SECONDS", "120"))
+# Before transcription, audio is resampled to 16 kHz mono and pauses longer than AUDIO_SILENCE_MIN_SECONDS
+# are cut with ffmpeg (skipped when ffmpeg is missing), at most AUDIO_PREPROCESS_WORKERS files at a time.
+# Transcripts are cached in the database by audio content hash and model size.
+AUDIO_PREPROCESS = os.getenv("EXECMIND_AUDIO_PREPROCESS", "true").lower() == "true"
+AUDIO_PREPROCESS_WORKERS = int(os.getenv("EXECMIND_AUDIO_PREPROCESS_WORKERS", "2"))
+AUDIO_SILENCE_MIN_SECONDS = float(os.getenv("EXECMIND_AUDIO_SILENCE_MIN_SECONDS", "0.5"))
+# Preprocessing holds the decoded audio in memory: past this much speech, the file is sent as is
+AUDIO_PREPROCESS_MAX_SECONDS = float(os.getenv("EXECMIND_AUDIO_PREPROCESS_MAX_SECONDS", "900"))
+TRANSCRIPT_CACHE_ENABLED = os.getenv("EXECMIND_TRANSCRIPT_CACHE", "true").lower() == "true"
+
+# Web research: query variants per idea, merged results kept, per-query timeout and result cache TTL
+WEB_SEARCH_QUERIES = int(os.getenv("EXECMIND_WEB_SEARCH_QUERIES", "4"))
+WEB_SEARCH_RESULTS = int(os.getenv("EXECMIND_WEB_SEARCH_RESULTS", "8"))
+WEB_SEARCH_TIMEOUT_SECONDS = float(os.getenv("EXECMIND_WEB_SEARCH_TIMEOUT_SECONDS", "8"))
+WEB_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("EXECMIND_WEB_SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Tracing: per-step latency/token spans appended to execmind_traces.jsonl (rotated past TRACE_MAX_BYTES),
+# and LLM prices (USD per 1K tokens) used for the cost per idea in `execmind stats`
+TRACE_ENABLED = os.getenv("EXECMIND_TRACE", "true").lower() == "true"
+TRACE_MAX_BYTES = int(os.getenv("EXECMIND_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_PROMPT_PRICE_PER_1K = float(os.getenv("EXECMIND_LLM_PROMPT_PRICE_PER_1K", "0.0025"))
+LLM_COMPLETION_PRICE_PER_1K = float(os.getenv("EXECMIND_LLM_COMPLETION_PRICE_PER_1K", "0.01"))
+
+# Server mode (`execmind serve`): bind address, threads running the (blocking) workflows,
+# background job workers (research, transcription), finished jobs kept for polling, upload limit
+SERVER_HOST = os.getenv("EXECMIND_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("EXECMIND_SERVER_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("EXECMIND_SERVER_WORKERS", "16"))
+SERVER_JOB_WORKERS = int(os.getenv("EXECMIND_SERVER_JOB_WORKERS", "4"))
+SERVER_MAX_JOBS = int(os.getenv("EXECMIND_SERVER_MAX_JOBS", "1000"))
+# Queued plus running jobs accepted at once; further job requests get a 503
+SERVER_MAX_PENDING_JOBS = int(os.getenv("EXECMIND_SERVER_MAX_PENDING_JOBS", "100"))
+SERVER_MAX_UPLOAD_MB = int(os.getenv("EXECMIND_SERVER_MAX_UPLOAD_MB", "100"))
+
+# Local storage: the SQLite database and its sidecar files (vector index, etc.)
+DATA_DIR = os.getenv("EXECMIND_DATA_DIR", ".")
+DATABASE_URL = os.getenv("EXECMIND_DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'execmind.db')}")
+# Batch mode groups finished ideas into shared transactions: at most this many
+# per commit, waiting at most this long for a group to fill
+BATCH_COMMIT_SIZE = int(os.getenv("EXECMIND_BATCH_COMMIT_SIZE", "16"))
+BATCH_COMMIT_DELAY_SECONDS = float(os.getenv("EXECMIND_BATCH_COMMIT_DELAY_SECONDS", "0.5"))
+
+# Internal duplicate detection
+VECTOR_DIM = int(os.getenv("EXECMIND_VECTOR_DIM", "256"))
+SIMILAR_IDEAS_TOP_K = int(os.getenv("EXECMIND_SIMILAR_IDEAS_TOP_K", "5"))
+SIMILAR_IDEAS_MIN_SCORE = float(os.getenv("EXECMIND_SIMILAR_IDEAS_MIN_SCORE", "0.2"))
+
+# Idea clustering (`execmind cluster`): number of clusters (0 = about sqrt(ideas / 2)),
+# mini-batch k-means batch size and iterations, and the similarity above which ideas
+# are linked as near-duplicates
+CLUSTER_COUNT = int(os.getenv("EXECMIND_CLUSTER_COUNT", "0"))
+CLUSTER_BATCH_SIZE = int(os.getenv("EXECMIND_CLUSTER_BATCH_SIZE", "1024"))
+CLUSTER_ITERATIONS = int(os.getenv("EXECMIND_CLUSTER_ITERATIONS", "200"))
+DUPLICATE_MIN_SIMILARITY = float(os.getenv("EXECMIND_DUPLICATE_MIN_SIMILARITY", "0.9"))
+
+# Retrieval (RAG) for structuring context
+RAG_CHUNK_WORDS = int(os.getenv("EXECMIND_RAG_CHUNK_WORDS", "120"))
+RAG_CHUNK_OVERLAP = int(os.getenv("EXECMIND_RAG_CHUNK_OVERLAP", "20"))
+RAG_TOP_K = int(os.getenv("EXECMIND_RAG_TOP_K", "8"))
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("EXECMIND_RAG_CONTEXT_TOKEN_BUDGET", "800"))
+# Weight of the dense (embedding) score in hybrid ranking; 0 disables the dense index
+RAG_HYBRID_ALPHA = float(os.getenv("EXECMIND_RAG_HYBRID_ALPHA", "0.3"))
+
 if not AZURE_OPENAI_API_KEY or not AZURE_OPENAI_ENDPOINT:
     print("WARNING: Azure OpenAI Credentials not fully set in environment variables.")
@@ -0,0 +1,376 @@
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import delete, insert, update
+
+from app.config.settings import CLUSTER_COUNT, CLUSTER_BATCH_SIZE, CLUSTER_ITERATIONS, DUPLICATE_MIN_SIMILARITY
+from app.context.vector_index import get_idea_index
+from app.storage.database import SessionLocal, Idea, IdeaCluster, IdeaClusterMember, IdeaDuplicate, on_commit
+from app.utils.tracing import traced
+
+# Ideas are clustered on their (unit-length) duplicate-detection embeddings
+# with spherical mini-batch k-means: each iteration assigns one random batch
+# to the nearest centroid by cosine similarity and moves those centroids with
+# a per-centroid 1/count learning rate, so the cost is independent of corpus
+# size. Near-duplicates are then looked for only among ideas sharing one of
+# their DUPLICATE_PROBES nearest clusters, which keeps the pairwise
+# comparisons to blocks of cluster size while catching pairs that straddle a
+# cluster boundary.
+
+# Rows per block when scoring vectors against centroids, and score matrix
+# elements per block when comparing the members of a cluster
+BLOCK_ROWS = 4096
+DUPLICATE_BLOCK_ELEMENTS = 1 << 24
+# Sample size (per cluster) used for k-means++ seeding
+SEED_SAMPLE_PER_CLUSTER = 20
+# Nearest clusters each idea is compared within when looking for duplicates
+DUPLICATE_PROBES = 2
+# Mini-batch k-means stops once no centroid moves more than this (cosine distance)
+CONVERGENCE_TOLERANCE = 1e-4
+
+def default_cluster_count(n: int) -> int:
+    return max(1, int(round(np.sqrt(n / 2))))
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+def _seed(vectors: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    k-means++ seeding on a random sample: each next centroid is drawn with
+    probability proportional to its cosine distance from the nearest one chosen.
+    """
+    sample_size = min(len(vectors), k * SEED_SAMPLE_PER_CLUSTER)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = np.empty((k, vectors.shape[1]), dtype=np.float32)
+    centroids[0] = sample[rng.integers(sample_size)]
+    distance = np.maximum(1 - sample @ centroids[0], 0).astype(np.float64)
+    for i in range(1, k):
+        total = distance.sum()
+        pick = rng.choice(sample_size, p=distance / total) if total > 0 else rng.integers(sample_size)
+        centroids[i] = sample[pick]
+        distance = np.minimum(distance, np.maximum(1 - sample @ centroids[i], 0))
+    return centroids
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> tuple:
+    """
+    Returns (index of the nearest centroid, cosine similarity) for each vector.
+    """
+    labels = np.empty(len(vectors), dtype=np.int64)
+    similarity = np.empty(len(vectors), dtype=np.float32)
+    for lo in range(0, len(vectors), BLOCK_ROWS):
+        scores = vectors[lo:lo + BLOCK_ROWS] @ centroids.T
+        labels[lo:lo + BLOCK_ROWS] = scores.argmax(axis=1)
+        similarity[lo:lo + BLOCK_ROWS] = scores[np.arange(len(scores)), labels[lo:lo + BLOCK_ROWS]]
+    return labels, similarity
+
+def minibatch_kmeans(vectors: np.ndarray, k: int, batch_size: int = CLUSTER_BATCH_SIZE,
+                     iterations: int = CLUSTER_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Spherical mini-batch k-means (Sculley, 2010) over unit vectors.
+    Returns the k unit-length centroids.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(vectors))
+    centroids = _seed(vectors, k, rng)
+    counts = np.zeros(k, dtype=np.float64)
+    batch_size = min(batch_size, len(vectors))
+    for _ in range(iterations):
+        batch = vectors[rng.integers(0, len(vectors), batch_size)]
+        labels = (batch @ centroids.T).argmax(axis=1)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, batch)
+
+        moved = batch_counts > 0
+        counts[moved] += batch_counts[moved]
+        previous = centroids[moved]
+        # Running mean: each centroid is the average of every point assigned to it so far
+        updated = previous + (sums[moved] - batch_counts[moved, None] * previous) / counts[moved, None]
+        centroids[moved] = _normalize(updated)
+        if moved.any() and (1 - (centroids[moved] * previous).sum(axis=1)).max() < CONVERGENCE_TOLERANCE:
+            break
+    return centroids
+
+def _top_clusters(vectors: np.ndarray, centroids: np.ndarray, probes: int) -> np.ndarray:
+    """
+    Indexes of the `probes` nearest centroids of each vector, shape (n, probes).
+    """
+    probes = min(probes, len(centroids))
+    top = np.empty((len(vectors), probes), dtype=np.int64)
+    for lo in range(0, len(vectors), BLOCK_ROWS):
+        scores = vectors[lo:lo + BLOCK_ROWS] @ centroids.T
+        top[lo:lo + BLOCK_ROWS] = np.argpartition(-scores, probes - 1, axis=1)[:, :probes]
+    return top
+
+def find_duplicates(ids: np.ndarray, vectors: np.ndarray, groups: np.ndarray,
+                    min_similarity: float = DUPLICATE_MIN_SIMILARITY) -> list:
+    """
+    Links each idea to its most similar earlier idea among those sharing one
+    of its clusters (`groups` holds each idea's cluster indexes, shape
+    (n, probes)), if at least min_similarity. Returns (idea_id, duplicate_of,
+    canonical_id, similarity) tuples in idea id order.
+    """
+    links = {}
+    points = np.repeat(np.arange(len(ids)), groups.shape[1])
+    labels = groups.ravel()
+    order = np.lexsort((ids[points], labels))
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    for members in np.split(points[order], boundaries):
+        if len(members) < 2:
+            continue
+        member_ids = ids[members]
+        member_vectors = vectors[members]
+        step = max(1, DUPLICATE_BLOCK_ELEMENTS // len(members))
+        for lo in range(1, len(members), step):
+            hi = min(lo + step, len(members))
+            # Members are sorted by id, so only columns left of each row are earlier ideas
+            scores = member_vectors[lo:hi] @ member_vectors[:hi].T
+            scores[np.triu_indices(hi - lo, k=lo, m=hi)] = -np.inf
+            best = scores.argmax(axis=1)
+            best_score = scores[np.arange(hi - lo), best]
+            for row in np.flatnonzero(best_score >= min_similarity):
+                idea_id, score = int(member_ids[lo + row]), float(best_score[row])
+                if idea_id not in links or score > links[idea_id][1]:
+                    links[idea_id] = (int(member_ids[best[row]]), score)
+
+    result = []
+    canonical = {}
+    for idea_id in sorted(links):
+        duplicate_of, similarity = links[idea_id]
+        canonical[idea_id] = canonical.get(duplicate_of, duplicate_of)
+        result.append((idea_id, duplicate_of, canonical[idea_id], similarity))
+    return result
+
+@traced("context.cluster")
+def cluster_ideas(n_clusters: int = CLUSTER_COUNT, min_similarity: float = DUPLICATE_MIN_SIMILARITY,
+                  on_progress=None) -> dict:
+    """
+    Clusters every idea and links near-duplicates, replacing the previous
+    clusters and links in a single transaction. n_clusters=0 picks about
+    sqrt(ideas / 2). on_progress(stage) is called as each stage starts.
+    Returns a report with counts and timings.
+    """
+    from app.context.provider import sync_idea_index
+
+    started = time.perf_counter()
+    report = {}
+    if on_progress:
+        on_progress("embedding")
+    sync_idea_index()
+    ids, vectors = get_idea_index().items()
+
+    db = SessionLocal()
+    try:
+        # The index is append-only, so it can hold ideas deleted since
+        existing = np.array([i for (i,) in db.query(Idea.id)], dtype=np.int64)
+        keep = np.isin(ids, existing)
+        ids, vectors = ids[keep], vectors[keep]
+        report["ideas"] = len(ids)
+        if not len(ids):
+            report.update({
+                "clusters": 0, "largest_cluster": 0, "duplicates": 0, "duplicate_groups": 0,
+                "elapsed_seconds": round(time.perf_counter() - started, 2)
+            })
+            return report
+
+        if on_progress:
+            on_progress("clustering")
+        start = time.perf_counter()
+        centroids = minibatch_kmeans(vectors, n_clusters or default_cluster_count(len(ids)))
+        labels, similarity = _nearest(vectors, centroids)
+        report["cluster_seconds"] = round(time.perf_counter() - start, 2)
+
+        if on_progress:
+            on_progress("finding duplicates")
+        start = time.perf_counter()
+        duplicates = find_duplicates(ids, vectors, _top_clusters(vectors, centroids, DUPLICATE_PROBES), min_similarity)
+        report["duplicate_seconds"] = round(time.perf_counter() - start, 2)
+
+        if on_progress:
+            on_progress("saving")
+        # Empty clusters are dropped; the rest are numbered from 1
+        used, labels = np.unique(labels, return_inverse=True)
+        centroids = centroids[used]
+        sizes = np.bincount(labels)
+        representatives = np.full(len(used), -1, dtype=np.int64)
+        best = np.full(len(used), -np.inf, dtype=np.float32)
+        np.maximum.at(best, labels, similarity)
+        representatives[labels[similarity == best[labels]]] = ids[similarity == best[labels]]
+
+        db.execute(delete(IdeaDuplicate))
+        db.execute(delete(IdeaClusterMember))
+        db.execute(delete(IdeaCluster))
+        db.execute(insert(IdeaCluster), [
+            {"id": c + 1, "centroid": centroids[c].astype(np.float32).tobytes(), "size": int(sizes[c]),
+             "representative_idea_id": int(representatives[c])}
+            for c in range(len(used))
+        ])
+        db.execute(insert(IdeaClusterMember), [
+            {"idea_id": int(i), "cluster_id": int(c) + 1, "similarity": float(s)}
+            for i, c, s in zip(ids, labels, similarity)
+        ])
+        if duplicates:
+            db.execute(insert(IdeaDuplicate), [
+                {"idea_id": i, "duplicate_of": d, "canonical_id": c, "similarity": s}
+                for i, d, c, s in duplicates
+            ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+    reset_cluster_model()
+    report.update({
+        "clusters": len(used),
+        "largest_cluster": int(sizes.max()),
+        "duplicates": len(duplicates),
+        "duplicate_groups": len({c for _, _, c, _ in duplicates}),
+        "elapsed_seconds": round(time.perf_counter() - started, 2)
+    })
+    return report
+
+class ClusterModel:
+    """
+    In-memory copy of the cluster centroids, used to assign new ideas
+    without reclustering: one (clusters x dim) dot product per idea.
+    Centroids follow their members as ideas are added (running mean),
+    once the transaction adding them commits.
+    """
+
+    def __init__(self, ids: np.ndarray, centroids: np.ndarray, sizes: np.ndarray):
+        self.ids = ids
+        self.centroids = centroids
+        self.sizes = sizes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> "ClusterModel":
+        db = SessionLocal()
+        try:
+            rows = db.query(IdeaCluster.id, IdeaCluster.centroid, IdeaCluster.size).order_by(IdeaCluster.id).all()
+        finally:
+            db.close()
+        if not rows:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64))
+        return cls(
+            np.array([r[0] for r in rows], dtype=np.int64),
+            np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows]),
+            np.array([r[2] for r in rows], dtype=np.int64)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, vector: np.ndarray) -> tuple:
+        """
+        (cluster id, similarity) of the centroid nearest to the vector.
+        """
+        with self._lock:
+            scores = self.centroids @ vector
+            c = int(scores.argmax())
+            return int(self.ids[c]), float(scores[c])
+
+    def update(self, cluster_id: int, centroid: np.ndarray, size: int):
+        """
+        Sets a cluster's centroid and size to committed values.
+        """
+        with self._lock:
+            c = int(np.searchsorted(self.ids, cluster_id))
+            if c < len(self.ids) and self.ids[c] == cluster_id:
+                self.centroids[c] = centroid
+                self.sizes[c] = size
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_cluster_model() -> ClusterModel:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = ClusterModel.load()
+    return _model
+
+def reset_cluster_model():
+    global _model
+    _model = None
+
+def assign_idea(idea_id: int, vector: np.ndarray, db=None, min_similarity: float = DUPLICATE_MIN_SIMILARITY):
+    """
+    Places a newly indexed idea in its nearest cluster and links it to its
+    most similar earlier idea if that is a near-duplicate. Does nothing for
+    clusters until cluster_ideas has run once. If db is given, the rows join
+    that session's transaction and are committed by the caller.
+    """
+    if db is None:
+        db = SessionLocal()
+        try:
+            assign_idea(idea_id, vector, db, min_similarity)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+        return
+
+    model = get_cluster_model()
+    if len(model):
+        cluster_id, similarity = model.nearest(vector)
+        db.add(IdeaClusterMember(idea_id=idea_id, cluster_id=cluster_id, similarity=similarity))
+        # Increment first: the UPDATE takes the database write lock, so the row
+        # read next is the latest committed one and no other writer can move
+        # the centroid before this transaction ends
+        db.execute(update(IdeaCluster).where(IdeaCluster.id == cluster_id).values(size=IdeaCluster.size + 1))
+        stored, size = db.query(IdeaCluster.centroid, IdeaCluster.size).filter(IdeaCluster.id == cluster_id).one()
+        current = np.frombuffer(stored, dtype=np.float32)
+        centroid = current + (vector - current) / size
+        centroid = (centroid / (np.linalg.norm(centroid) or 1)).astype(np.float32)
+        db.execute(update(IdeaCluster).where(IdeaCluster.id == cluster_id).values(centroid=centroid.tobytes()))
+        on_commit(db, lambda: model.update(cluster_id, centroid, size))
+
+    # The nearest-neighbour index covers the whole corpus, so duplicates are
+    # found across cluster boundaries too
+    match = next(((i, s) for i, s in get_idea_index().search(vector, 2) if i != idea_id), None)
+    if match is not None and match[0] < idea_id and match[1] >= min_similarity:
+        duplicate_of, similarity = match
+        canonical = db.query(IdeaDuplicate.canonical_id).filter(IdeaDuplicate.idea_id == duplicate_of).scalar()
+        db.add(IdeaDuplicate(idea_id=idea_id, duplicate_of=duplicate_of, canonical_id=canonical or duplicate_of,
+                             similarity=similarity))
+    db.flush()
+
+def duplicates_of(idea_id: int) -> list:
+    """
+    Ids of the other ideas in the same near-duplicate group, oldest first.
+    """
+    db = SessionLocal()
+    try:
+        canonical = db.query(IdeaDuplicate.canonical_id).filter(IdeaDuplicate.idea_id == idea_id).scalar() or idea_id
+        group = [i for (i,) in db.query(IdeaDuplicate.idea_id).filter(IdeaDuplicate.canonical_id == canonical)]
+    finally:
+        db.close()
+    if not group:
+        return []
+    return sorted(i for i in {canonical, *group} if i != idea_id)
+
+def largest_clusters(n: int = 10) -> list:
+    """
+    The n largest clusters as (cluster id, size, representative Idea) tuples.
+    """
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(IdeaCluster.id, IdeaCluster.size, Idea)
+            .outerjoin(Idea, Idea.id == IdeaCluster.representative_idea_id)
+            .order_by(IdeaCluster.size.desc())
+            .limit(n)
+            .all()
+        )
+    finally:
+        db.close()
+    return [(cluster_id, size, idea) for cluster_id, size, idea in rows]
@@ -1,6 +1,93 @@
+import threading
+from app.config.settings import SIMILAR_IDEAS_TOP_K, SIMILAR_IDEAS_MIN_SCORE
+from app.context.vector_index import embed_text, get_idea_index
+from app.context.clustering import assign_idea
+from app.context.retrieval import (
+    retrieve, index_document, idea_document, research_document, evaluation_document
+)
+from app.storage.database import SessionLocal, Idea, Evaluation, ResearchReport, on_commit
+from app.utils.tracing import traced
+
+_synced = False
+_sync_lock = threading.Lock()
+
+def idea_text(idea: Idea) -> str:
+    """
+    Text used to embed an idea for similarity search.
+    """
+    parts = [idea.problem_statement, idea.proposed_solution, idea.target_users]
+    text = "\n".join(p for p in parts if p)
+    return text or idea.raw_input or ""
+
+def index_idea(idea: Idea, research_report: ResearchReport = None, db=None):
+    """
+    Adds a saved idea (and its research report, if any) to the duplicate
+    detection index, its nearest cluster and the retrieval index. With db,
+    the in-memory and sidecar indexes are only updated once it commits.
+    """
+    _ensure_synced()
+    vector = embed_text(idea_text(idea))
+    idea_id = idea.id
+    on_commit(db, lambda: get_idea_index().add(idea_id, vector))
+    assign_idea(idea.id, vector, db=db)
+    index_document("idea", idea.id, idea_document(idea), db=db)
+    if research_report is not None:
+        index_document("research", research_report.id, research_document(research_report), db=db)
+
+def index_evaluation(evaluation: Evaluation, db=None):
+    """
+    Adds a saved evaluation to the retrieval index.
+    """
+    index_document("evaluation", evaluation.id, evaluation_document(evaluation), db=db)
+
+def sync_idea_index(batch_size: int = 1000):
+    """
+    Embeds any ideas in the database that are not yet in the index
+    (e.g. ideas created before the index existed, or whose commit hook never
+    ran). Stored ids are compared with the indexed ones rather than resuming
+    from the highest indexed id: concurrent commits can index a newer idea
+    before an older one.
+    """
+    index = get_idea_index()
+    db = SessionLocal()
+    try:
+        missing = [idea_id for (idea_id,) in db.query(Idea.id).order_by(Idea.id) if idea_id not in index]
+        for start in range(0, len(missing), batch_size):
+            batch = db.query(Idea).filter(Idea.id.in_(missing[start:start + batch_size])).all()
+            index.add_many([(i.id, embed_text(idea_text(i))) for i in batch])
+    finally:
+        db.close()
+
+def _ensure_synced():
+    global _synced
+    if not _synced:
+        with _sync_lock:
+            if not _synced:
+                sync_idea_index()
+                _synced = True
+
+@traced("context.similar")
+def find_similar_ideas(text: str, k: int = SIMILAR_IDEAS_TOP_K, min_score: float = SIMILAR_IDEAS_MIN_SCORE) -> list:
+    """
+    Returns up to k (Idea, similarity) pairs from the whole corpus, best first.
+    """
+    _ensure_synced()
+    matches = [(i, s) for i, s in get_idea_index().search(embed_text(text), k) if s >= min_score]
+    if not matches:
+        return []
+
+    db = SessionLocal()
+    try:
+        ideas = {i.id: i for i in db.query(Idea).filter(Idea.id.in_([i for i, _ in matches])).all()}
+    finally:
+        db.close()
+    return [(ideas[i], s) for i, s in matches if i in ideas]
+
 def get_context(query: str) -> str:
     """
     RAG provider hook.
-    Currently returns empty string as no retrieval logic is implemented yet.
+    Returns the best matching chunks of past ideas, research reports and
+    evaluations, within the configured context token budget.
     """
-    return ""
+    chunks = retrieve(query)
+    return "\n\n".join(f"[{c['source_type']} #{c['source_id']}] {c['text']}" for c in chunks)
@@ -0,0 +1,320 @@
+import math
+import os
+import threading
+from collections import Counter
+from sqlalchemy import select, func
+
+from app.config.settings import (
+    DATA_DIR,
+    RAG_CHUNK_WORDS,
+    RAG_CHUNK_OVERLAP,
+    RAG_TOP_K,
+    RAG_CONTEXT_TOKEN_BUDGET,
+    RAG_HYBRID_ALPHA
+)
+from app.context.vector_index import VectorIndex, embed_text, tokenize
+from app.utils.tracing import traced
+from app.storage.database import (
+    SessionLocal, Idea, Evaluation, ResearchReport, ContextChunk, ContextChunkTerm, on_commit
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "were", "will", "with", "we", "our", "you", "your", "i", "can", "not", "but"
+}
+
+_lock = threading.Lock()
+_corpus_stats = None # [chunk count, total chunk length]
+_chunk_index = None
+_synced = False
+_sync_lock = threading.Lock()
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token) used for budgeting.
+    """
+    return max(1, len(text) // 4)
+
+def chunk_text(text: str, words: int = RAG_CHUNK_WORDS, overlap: int = RAG_CHUNK_OVERLAP) -> list:
+    """
+    Splits text into overlapping windows of roughly `words` words.
+    """
+    tokens = (text or "").split()
+    if not tokens:
+        return []
+    step = max(1, words - overlap)
+    chunks = []
+    for start in range(0, len(tokens), step):
+        chunks.append(" ".join(tokens[start:start + words]))
+        if start + words >= len(tokens):
+            break
+    return chunks
+
+def index_terms(text: str) -> list:
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+def idea_document(idea: Idea) -> str:
+    return "\n".join([
+        f"Idea #{idea.id}: {idea.raw_input}",
+        f"Problem: {idea.problem_statement}",
+        f"Solution: {idea.proposed_solution}",
+        f"Users: {idea.target_users}",
+        f"Assumptions: {idea.assumptions}",
+    ])
+
+def research_document(report: ResearchReport) -> str:
+    return f"Research for idea #{report.idea_id}:\n{report.report}"
+
+def evaluation_document(evaluation: Evaluation) -> str:
+    return (
+        f"Evaluation of idea #{evaluation.idea_id}: verdict {evaluation.verdict}, "
+        f"score {evaluation.final_score}/10. {evaluation.summary}"
+    )
+
+# Indexed sources: source_type -> (model, document text)
+SOURCES = {
+    "idea": (Idea, idea_document),
+    "research": (ResearchReport, research_document),
+    "evaluation": (Evaluation, evaluation_document),
+}
+
+def _get_chunk_index() -> VectorIndex:
+    global _chunk_index
+    if _chunk_index is None:
+        with _lock:
+            if _chunk_index is None:
+                _chunk_index = VectorIndex(os.path.join(DATA_DIR, "execmind_chunks"))
+    return _chunk_index
+
+def _get_corpus_stats(db) -> list:
+    global _corpus_stats
+    if _corpus_stats is None:
+        count, total = db.execute(
+            select(func.count(ContextChunk.id), func.coalesce(func.sum(ContextChunk.token_count), 0))
+        ).one()
+        with _lock:
+            if _corpus_stats is None:
+                _corpus_stats = [count, total]
+    return _corpus_stats
+
+def index_document(source_type: str, source_id: int, text: str, db=None):
+    """
+    Chunks a document and adds it to the lexical (and, if enabled, dense) index.
+    Indexing is incremental: only the new chunks and their postings are written.
+    If db is given, the rows join that session's transaction and are committed
+    by the caller.
+    """
+    # Catch up first so older rows are not skipped by the max-id backfill
+    _ensure_synced()
+    if db is not None:
+        _index_document(db, source_type, source_id, text)
+        return
+
+    db = SessionLocal()
+    try:
+        _index_document(db, source_type, source_id, text)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def _index_document(db, source_type: str, source_id: int, text: str):
+    chunks = chunk_text(text)
+    if not chunks:
+        return
+
+    # Read before the new chunks are flushed, or a first read would count them
+    # and the increment below would count them again
+    stats = _get_corpus_stats(db)
+    rows = [
+        ContextChunk(source_type=source_type, source_id=source_id, text=c, token_count=estimate_tokens(c))
+        for c in chunks
+    ]
+    db.add_all(rows)
+    db.flush()
+
+    postings = []
+    for row in rows:
+        for term, tf in Counter(index_terms(row.text)).items():
+            postings.append({"term": term, "chunk_id": row.id, "tf": tf})
+    if postings:
+        db.execute(ContextChunkTerm.__table__.insert(), postings)
+
+    vectors = [(r.id, embed_text(r.text)) for r in rows] if RAG_HYBRID_ALPHA > 0 else None
+    n_chunks, n_tokens = len(rows), sum(r.token_count for r in rows)
+
+    def _committed():
+        with _lock:
+            stats[0] += n_chunks
+            stats[1] += n_tokens
+        if vectors:
+            _get_chunk_index().add_many(vectors)
+
+    # Sidecar vectors and corpus stats are not transactional: they follow the commit
+    on_commit(db, _committed)
+
+def sync_context_index(batch_size: int = 500):
+    """
+    Indexes any stored ideas, research reports and evaluations that have no
+    chunks yet, e.g. rows saved before retrieval existed or whose commit
+    hook never ran. Each source is compared with the chunk table rather than
+    resumed from its highest indexed id, since concurrent commits can index
+    a newer row before an older one.
+    """
+    db = SessionLocal()
+    try:
+        for source_type, (model, to_text) in SOURCES.items():
+            indexed = select(ContextChunk.id).where(
+                ContextChunk.source_type == source_type, ContextChunk.source_id == model.id
+            ).exists()
+            # Rows with no text get no chunks; last_id keeps them from being read again
+            last_id = 0
+            while True:
+                batch = (
+                    db.query(model).filter(model.id > last_id, ~indexed)
+                    .order_by(model.id).limit(batch_size).all()
+                )
+                if not batch:
+                    break
+                for row in batch:
+                    _index_document(db, source_type, row.id, to_text(row))
+                db.commit()
+                last_id = batch[-1].id
+
+        if RAG_HYBRID_ALPHA > 0:
+            # Dense vectors are derived data; fill in any chunks missing from the sidecar files
+            chunk_index = _get_chunk_index()
+            missing = [chunk_id for (chunk_id,) in db.query(ContextChunk.id).order_by(ContextChunk.id)
+                       if chunk_id not in chunk_index]
+            for start in range(0, len(missing), batch_size):
+                chunks = db.query(ContextChunk).filter(ContextChunk.id.in_(missing[start:start + batch_size])).all()
+                chunk_index.add_many([(c.id, embed_text(c.text)) for c in chunks])
+    finally:
+        db.close()
+
+def remove_documents(cursor, source_type: str, source_ids: list) -> list:
+    """
+    Deletes the chunks and postings of whichever of the documents are
+    indexed, through a DB-API cursor in the caller's transaction (for bulk
+    writers that bypass the ORM, such as apply_profile), and returns their
+    ids for reindex_documents once that transaction has committed. Dense
+    vectors of the removed chunks stay in the sidecar file; retrieve skips
+    ids that no longer have a chunk row.
+    """
+    indexed = {source_id for (source_id,) in cursor.execute(
+        "SELECT DISTINCT source_id FROM context_chunks WHERE source_type = ?", (source_type,)
+    )}
+    removed = [source_id for source_id in source_ids if source_id in indexed]
+    rows = [(source_type, source_id) for source_id in removed]
+    cursor.executemany(
+        "DELETE FROM context_chunk_terms WHERE chunk_id IN "
+        "(SELECT id FROM context_chunks WHERE source_type = ? AND source_id = ?)", rows
+    )
+    cursor.executemany("DELETE FROM context_chunks WHERE source_type = ? AND source_id = ?", rows)
+    return removed
+
+def reindex_documents(source_type: str, source_ids: list, batch_size: int = 500):
+    """
+    Chunks documents removed by remove_documents again from their current
+    rows. The corpus statistics are recounted, since the removal bypassed
+    them. If this is interrupted, sync_context_index picks up the rest.
+    """
+    global _corpus_stats
+    with _lock:
+        _corpus_stats = None
+    model, to_text = SOURCES[source_type]
+    db = SessionLocal()
+    try:
+        for start in range(0, len(source_ids), batch_size):
+            for row in db.query(model).filter(model.id.in_(source_ids[start:start + batch_size])).order_by(model.id):
+                _index_document(db, source_type, row.id, to_text(row))
+            db.commit()
+    finally:
+        db.close()
+
+def _ensure_synced():
+    global _synced
+    if not _synced:
+        with _sync_lock:
+            if not _synced:
+                sync_context_index()
+                _synced = True
+
+def _bm25_scores(db, terms: list) -> dict:
+    n_chunks, total_length = _get_corpus_stats(db)
+    if not terms or n_chunks == 0:
+        return {}
+    avg_length = total_length / n_chunks
+
+    doc_freq = dict(db.execute(
+        select(ContextChunkTerm.term, func.count())
+        .where(ContextChunkTerm.term.in_(terms))
+        .group_by(ContextChunkTerm.term)
+    ).all())
+    postings = db.execute(
+        select(ContextChunkTerm.term, ContextChunkTerm.chunk_id, ContextChunkTerm.tf, ContextChunk.token_count)
+        .join(ContextChunk, ContextChunk.id == ContextChunkTerm.chunk_id)
+        .where(ContextChunkTerm.term.in_(terms))
+    ).all()
+
+    scores = {}
+    for term, chunk_id, tf, length in postings:
+        df = doc_freq[term]
+        idf = math.log(1 + (n_chunks - df + 0.5) / (df + 0.5))
+        norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+        scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+    return scores
+
+@traced("context.retrieve")
+def retrieve(query: str, k: int = RAG_TOP_K, token_budget: int = RAG_CONTEXT_TOKEN_BUDGET, alpha: float = RAG_HYBRID_ALPHA) -> list:
+    """
+    Hybrid retrieval: BM25 over the inverted index, optionally blended with
+    dense cosine similarity (weight `alpha`). Returns chunk dicts, best first,
+    trimmed so their combined token estimate fits `token_budget`.
+    """
+    _ensure_synced()
+    terms = list(set(index_terms(query)))
+
+    db = SessionLocal()
+    try:
+        lexical = _bm25_scores(db, terms)
+        top_lexical = max(lexical.values(), default=0.0)
+
+        dense = {}
+        if alpha > 0:
+            dense = dict(_get_chunk_index().search(embed_text(query), k * 4))
+
+        combined = {}
+        for chunk_id in set(lexical) | set(dense):
+            bm25 = lexical.get(chunk_id, 0.0) / top_lexical if top_lexical else 0.0
+            combined[chunk_id] = (1 - alpha) * bm25 + alpha * max(dense.get(chunk_id, 0.0), 0.0)
+
+        ranked = sorted(combined, key=combined.get, reverse=True)[:k]
+        if not ranked:
+            return []
+        rows = {c.id: c for c in db.query(ContextChunk).filter(ContextChunk.id.in_(ranked)).all()}
+    finally:
+        db.close()
+
+    results = []
+    used = 0
+    for chunk_id in ranked:
+        chunk = rows.get(chunk_id)
+        if chunk is None or used + chunk.token_count > token_budget:
+            continue
+        used += chunk.token_count
+        results.append({
+            "chunk_id": chunk.id,
+            "source_type": chunk.source_type,
+            "source_id": chunk.source_id,
+            "text": chunk.text,
+            "score": combined[chunk_id],
+        })
+    return results
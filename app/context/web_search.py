@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import urlsplit, urlunsplit
+
+from app.config.settings import (
+    DATA_DIR,
+    WEB_SEARCH_QUERIES,
+    WEB_SEARCH_RESULTS,
+    WEB_SEARCH_TIMEOUT_SECONDS,
+    WEB_SEARCH_CACHE_TTL_SECONDS
+)
+from app.context.vector_index import tokenize
+from app.context.retrieval import STOPWORDS
+from app.storage.cache import DiskCache, make_key
+from app.utils import tracing
+
+class DDGSProvider:
+    """
+    DuckDuckGo search via the ddgs package (imported on first use).
+    Any object with the same search(query, max_results) method can be
+    installed with set_search_provider, e.g. a local fake in tests.
+    """
+
+    name = "ddgs"
+
+    def search(self, query: str, max_results: int) -> list:
+        try:
+            from ddgs import DDGS
+        except ImportError:
+            from duckduckgo_search import DDGS
+
+        with DDGS() as ddgs:
+            return [
+                {"title": r.get("title", ""), "body": r.get("body", ""), "href": r.get("href", "")}
+                for r in ddgs.text(query, max_results=max_results)
+            ]
+
+_provider = None
+_cache = None
+_lock = threading.Lock()
+# Shared across research calls; a timed-out query keeps its thread until it
+# returns, so the pool is sized for a few stragglers on top of one fan-out
+_pool = ThreadPoolExecutor(max_workers=WEB_SEARCH_QUERIES * 2, thread_name_prefix="web-search")
+
+def set_search_provider(provider):
+    """
+    Installs the search backend used by search_web (None restores DDGS).
+    """
+    global _provider
+    _provider = provider
+
+def get_search_provider():
+    global _provider
+    if _provider is None:
+        _provider = DDGSProvider()
+    return _provider
+
+def get_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(DATA_DIR, "execmind_search_cache.db"),
+                    ttl_seconds=WEB_SEARCH_CACHE_TTL_SECONDS
+                )
+    return _cache
+
+def generate_queries(framed_text: str, max_queries: int = WEB_SEARCH_QUERIES) -> list:
+    """
+    Builds search variants from the framed idea: the idea itself, its key
+    terms, and key terms aimed at existing companies and products.
+    """
+    words = framed_text.split()
+    keywords = []
+    for term in tokenize(framed_text):
+        if term not in STOPWORDS and len(term) > 2 and term not in keywords:
+            keywords.append(term)
+    key_phrase = " ".join(keywords[:8])
+
+    queries = [" ".join(words[:30])]
+    if key_phrase:
+        queries += [key_phrase, f"{key_phrase} startup", f"{key_phrase} existing product competitors"]
+
+    unique = []
+    for query in queries:
+        if query and query not in unique:
+            unique.append(query)
+    return unique[:max_queries]
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."), path, parts.query, ""))
+
+def _cached_search(provider, query: str, per_query: int) -> list:
+    with tracing.span("search.query", cache_hit=False) as span:
+        key = make_key(getattr(provider, "name", type(provider).__name__), query, per_query)
+        cached = get_cache().get(key)
+        if cached is not None:
+            span.set(cache_hit=True)
+            return json.loads(cached)
+        results = provider.search(query, per_query)
+        # No results is as likely a throttled or flaky backend as an empty
+        # web: keep it out of the cache so the next run asks again
+        if results:
+            get_cache().set(key, json.dumps(results))
+        span.set(results=len(results))
+        return results
+
+def search_web(framed_text: str, max_results: int = WEB_SEARCH_RESULTS,
+               timeout: float = WEB_SEARCH_TIMEOUT_SECONDS) -> list:
+    """
+    Runs the query variants concurrently and merges their results,
+    de-duplicated by URL and interleaved so each query's best hits come
+    first. Queries slower than `timeout` seconds are dropped. Raises only
+    if every query failed.
+    """
+    with tracing.span("search.web") as span:
+        merged, errors = _search_web(framed_text, max_results, timeout)
+        span.set(results=len(merged), failed_queries=len(errors))
+        return merged
+
+def _search_web(framed_text: str, max_results: int, timeout: float):
+    provider = get_search_provider()
+    queries = generate_queries(framed_text)
+    futures = [_pool.submit(tracing.bind(_cached_search), provider, q, max_results) for q in queries]
+
+    deadline = time.monotonic() + timeout
+    per_query, errors = [], []
+    for future in futures:
+        try:
+            per_query.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except TimeoutError:
+            errors.append("timed out")
+        except Exception as e:
+            errors.append(str(e))
+    if errors and not per_query:
+        raise RuntimeError(f"all {len(queries)} queries failed ({errors[0]})")
+
+    merged, seen = [], set()
+    for rank in range(max((len(r) for r in per_query), default=0)):
+        for results in per_query:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            url = normalize_url(result.get("href", ""))
+            if url in seen:
+                continue
+            seen.add(url)
+            merged.append(result)
+    return merged[:max_results], errors
@@ -0,0 +1,215 @@
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+
+from app.config.settings import (
+    AUDIO_PREPROCESS, AUDIO_PREPROCESS_WORKERS, AUDIO_SILENCE_MIN_SECONDS, AUDIO_PREPROCESS_MAX_SECONDS
+)
+
+# Whisper's native input format
+SAMPLE_RATE = 16000
+
+# Voice-activity detection works on 30 ms frames
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+# A frame counts as voiced above this RMS level (about -40 dBFS), and a
+# segment needs at least MIN_SPEECH_FRAMES voiced frames (~300 ms) to be kept
+SPEECH_THRESHOLD = 0.01
+MIN_SPEECH_FRAMES = 10
+
+def probe_duration(file_path: str):
+    """
+    Returns the duration of an audio file in seconds via ffprobe, or None.
+    """
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", file_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        return float(out.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+def iter_pcm_blocks(file_path: str, block_seconds: float):
+    """
+    Decodes a file with ffmpeg to 16 kHz mono float32, yielding blocks of
+    `block_seconds` as they are decoded. Only one block is held in memory,
+    regardless of the file's length.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"
+    ]
+    block_bytes = int(block_seconds * SAMPLE_RATE) * 2
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    closed = False
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+    except GeneratorExit:
+        # The consumer stopped early: ffmpeg is stopped too, and its exit
+        # status (from the broken pipe) is not an error
+        closed = True
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", "replace")
+        process.stderr.close()
+        if process.wait() != 0 and not closed:
+            raise RuntimeError(f"ffmpeg failed to decode {file_path}: {stderr.strip()}")
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+def preprocess_audio(file_path: str, silence_min_seconds: float = AUDIO_SILENCE_MIN_SECONDS,
+                     max_seconds: float = AUDIO_PREPROCESS_MAX_SECONDS) -> np.ndarray:
+    """
+    Decodes a file with ffmpeg to 16 kHz mono float32, cutting every pause
+    longer than `silence_min_seconds` down to a short gap, so the model only
+    sees speech. Silence is anything under SPEECH_THRESHOLD, as in the
+    voice-activity detection below.
+
+    The result is held in memory, so decoding stops and None is returned
+    once more than `max_seconds` of audio remain (0 for no limit): such
+    recordings should be streamed (see app.interfaces.voice.transcribe_stream)
+    or sent as a file.
+    """
+    threshold = f"{20 * np.log10(SPEECH_THRESHOLD):.0f}dB"
+    # Leave a little of each pause in place so words on either side stay apart
+    gap = min(0.2, silence_min_seconds / 2)
+    trim = (
+        f"silenceremove=start_periods=1:start_threshold={threshold}:"
+        f"stop_periods=-1:stop_duration={silence_min_seconds}:stop_threshold={threshold}:stop_silence={gap}"
+    )
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", file_path, "-af", trim,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"
+    ]
+    max_bytes = int(max_seconds * SAMPLE_RATE) * 2 if max_seconds else None
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    pcm = bytearray()
+    try:
+        while True:
+            data = process.stdout.read(SAMPLE_RATE * 2 * 10)
+            if not data:
+                break
+            pcm += data
+            if max_bytes is not None and len(pcm) > max_bytes:
+                process.kill()
+                return None
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", "replace")
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to preprocess {file_path}: {stderr.strip()}")
+    return np.frombuffer(bytes(pcm), dtype=np.int16).astype(np.float32) / 32768.0
+
+# ffmpeg runs as a child process; these threads only wait on it, bounding
+# how many decodes run at once
+_preprocess_pool = None
+_preprocess_lock = threading.Lock()
+
+def _get_preprocess_pool() -> ThreadPoolExecutor:
+    global _preprocess_pool
+    if _preprocess_pool is None:
+        with _preprocess_lock:
+            if _preprocess_pool is None:
+                _preprocess_pool = ThreadPoolExecutor(max_workers=AUDIO_PREPROCESS_WORKERS, thread_name_prefix="ffmpeg")
+    return _preprocess_pool
+
+def preprocess_audio_async(file_path: str) -> Future:
+    """
+    Queues preprocess_audio on the ffmpeg pool. The Future resolves to None
+    when preprocessing is turned off, ffmpeg is not installed or the speech
+    is too long to hold in memory, in which case the original file should
+    be transcribed as is.
+    """
+    if not AUDIO_PREPROCESS or not ffmpeg_available():
+        future = Future()
+        future.set_result(None)
+        return future
+    return _get_preprocess_pool().submit(preprocess_audio, file_path)
+
+def frame_energy(samples: np.ndarray) -> np.ndarray:
+    """
+    RMS energy per 30 ms frame.
+    """
+    n_frames = len(samples) // FRAME_SAMPLES
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def has_speech(samples: np.ndarray) -> bool:
+    return int(np.count_nonzero(frame_energy(samples) > SPEECH_THRESHOLD)) >= MIN_SPEECH_FRAMES
+
+def trim_silence(samples: np.ndarray, silence_min_seconds: float = AUDIO_SILENCE_MIN_SECONDS) -> np.ndarray:
+    """
+    In-process counterpart of preprocess_audio's filter, for audio already
+    decoded: shortens every run of silent frames longer than
+    `silence_min_seconds` to a short gap.
+    """
+    energy = frame_energy(samples)
+    if not len(energy):
+        return samples
+    silent = energy <= SPEECH_THRESHOLD
+    max_run = max(1, int(silence_min_seconds * 1000 / 30))
+    gap = max(1, int(min(0.2, silence_min_seconds / 2) * 1000 / 30))
+    edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+    keep = np.ones(len(energy), dtype=bool)
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if end - start > max_run:
+            keep[start + gap:end] = False
+    # Trailing samples that do not fill a frame are kept
+    frames = samples[: len(energy) * FRAME_SAMPLES].reshape(len(energy), FRAME_SAMPLES)
+    return np.concatenate([frames[keep].ravel(), samples[len(energy) * FRAME_SAMPLES:]])
+
+def find_cut(samples: np.ndarray, search_seconds: float) -> int:
+    """
+    Picks where to end a segment: the quietest frame within the last
+    `search_seconds`, so cuts land in pauses rather than mid-word.
+    """
+    energy = frame_energy(samples)
+    search_frames = int(search_seconds * 1000 / 30)
+    if len(energy) <= search_frames:
+        return len(samples)
+    start = len(energy) - search_frames
+    quietest = start + int(np.argmin(energy[start:]))
+    return (quietest + 1) * FRAME_SAMPLES
+
+def iter_speech_segments(file_path: str, window_seconds: float = 30, search_seconds: float = 5):
+    """
+    Streams (start_seconds, end_seconds, samples) segments of at most
+    `window_seconds`, cut at pauses. Windows with no detected speech are
+    skipped so silence is never sent to the model.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0 # samples consumed before `buffer`
+
+    def _emit(segment, start):
+        if has_speech(segment):
+            return (start / SAMPLE_RATE, (start + len(segment)) / SAMPLE_RATE, segment)
+        return None
+
+    for block in iter_pcm_blocks(file_path, block_seconds=window_seconds / 2):
+        buffer = np.concatenate([buffer, block])
+        while len(buffer) >= window:
+            cut = find_cut(buffer[:window], search_seconds)
+            segment = _emit(buffer[:cut], offset)
+            if segment:
+                yield segment
+            buffer = buffer[cut:]
+            offset += cut
+
+    if len(buffer):
+        segment = _emit(buffer, offset)
+        if segment:
+            yield segment
@@ -1,8 +1,13 @@
+import datetime
+import json
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.markdown import Markdown
-from app.storage.database import Idea, Evaluation
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.storage.database import Idea, Evaluation
 
 console = Console()
 
@@ -13,9 +18,11 @@ def display_menu():
     console.print("\n[bold]Select an option:[/bold]")
     console.print("1. [green]New Idea (Text)[/green]")
     console.print("2. [yellow]New Idea (Voice)[/yellow]")
-    console.print("3. [red]Exit[/red]")
+    console.print("3. [cyan]Search Ideas[/cyan]")
+    console.print("4. [magenta]Portfolio[/magenta]")
+    console.print("5. [red]Exit[/red]")
 
-def display_idea_framing(idea: Idea):
+def display_idea_framing(idea: "Idea"):
     console.print("\n[bold cyan]--- Framed Idea ---[/bold cyan]")
     
     grid = Table.grid(expand=True)
@@ -29,7 +36,65 @@ def display_idea_framing(idea: Idea):
     
     console.print(Panel(grid, title=f"Idea #{idea.id}", border_style="cyan"))
 
-def display_evaluation(evaluation: Evaluation):
+def display_search_results(ideas: list, query: str, page: int):
+    table = Table(title=f"Results for \"{query}\" (page {page})")
+    table.add_column("ID", justify="right", style="cyan")
+    table.add_column("Problem", style="yellow")
+    table.add_column("Solution")
+    table.add_column("Created", style="dim")
+
+    for idea in ideas:
+        created = idea.created_at.strftime("%Y-%m-%d") if idea.created_at else ""
+        table.add_row(str(idea.id), idea.problem_statement or "", idea.proposed_solution or "", created)
+
+    console.print(table)
+
+def display_portfolio(top: list, distribution: dict, trend: list, verdict: str = None):
+    title = f"Top Ideas ({verdict})" if verdict else "Top Ideas"
+    table = Table(title=title)
+    table.add_column("ID", justify="right", style="cyan")
+    table.add_column("Score", justify="right", style="green")
+    table.add_column("Verdict")
+    table.add_column("Solution")
+    for idea, latest in top:
+        table.add_row(str(idea.id), f"{latest['final_score']:.2f}", latest["verdict"] or "", idea.proposed_solution or "")
+    console.print(table)
+
+    if not distribution["count"]:
+        console.print("[dim]No evaluated ideas yet.[/dim]")
+        return
+
+    stats = Table(title="Score Distribution")
+    stats.add_column("Mean", justify="right")
+    stats.add_column("Std", justify="right")
+    stats.add_column("p25", justify="right")
+    stats.add_column("Median", justify="right", style="green")
+    stats.add_column("p75", justify="right")
+    stats.add_column("p90", justify="right")
+    stats.add_column("Verdicts")
+    stats.add_row(
+        str(distribution["mean"]), str(distribution["std"]), str(distribution["p25"]),
+        str(distribution["median"]), str(distribution["p75"]), str(distribution["p90"]),
+        ", ".join(f"{k or 'none'}: {v}" for k, v in distribution["verdicts"].items())
+    )
+    console.print(stats)
+
+    peak = max(b["count"] for b in distribution["histogram"]) or 1
+    for b in distribution["histogram"]:
+        bar = "#" * round(40 * b["count"] / peak)
+        console.print(f"[dim]{b['low']:>4.1f}-{b['high']:<4.1f}[/dim] [green]{bar}[/green] {b['count']}")
+
+    if trend:
+        table = Table(title="Trend (latest evaluation per idea)")
+        table.add_column("Period from", style="dim")
+        table.add_column("Ideas", justify="right")
+        table.add_column("Mean score", justify="right", style="green")
+        for point in trend[-12:]:
+            start = datetime.datetime.fromtimestamp(point["start"], datetime.timezone.utc).strftime("%Y-%m-%d")
+            table.add_row(start, str(point["count"]), f"{point['mean_score']:.2f}")
+        console.print(table)
+
+def display_evaluation(evaluation: "Evaluation"):
     console.print("\n[bold magenta]--- Evaluation Results ---[/bold magenta]")
     
     # Scores Table
@@ -51,3 +116,124 @@ def display_evaluation(evaluation: Evaluation):
     summary_md = f"**Verdict:** [{verdict_color}]{evaluation.verdict.upper()}[/{verdict_color}]\n\n**Final Score:** {evaluation.final_score}/10\n\n**Summary:** {evaluation.summary}"
     
     console.print(Panel(Markdown(summary_md), title="Conclusion", border_style=verdict_color))
+
+def display_batch_report(report: dict):
+    table = Table(title="Batch Report")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+
+    table.add_row("Processed", str(report["processed"]))
+    table.add_row("Failed", str(report["failed"]))
+    table.add_row("Skipped (done/empty)", str(report["skipped"]))
+    table.add_row("Elapsed (s)", str(report["elapsed_seconds"]))
+    table.add_row("Ideas / min", str(report["ideas_per_minute"]))
+    table.add_row("Tokens / min", str(report["tokens_per_minute"]))
+
+    console.print(table)
+
+def display_cluster_report(report: dict, largest: list):
+    table = Table(title="Clustering Report")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+
+    table.add_row("Ideas", str(report["ideas"]))
+    table.add_row("Clusters", str(report["clusters"]))
+    table.add_row("Largest cluster", str(report["largest_cluster"]))
+    table.add_row("Near-duplicates linked", str(report["duplicates"]))
+    table.add_row("Duplicate groups", str(report["duplicate_groups"]))
+    table.add_row("Elapsed (s)", str(report["elapsed_seconds"]))
+    console.print(table)
+
+    if largest:
+        table = Table(title="Largest Clusters")
+        table.add_column("Cluster", justify="right", style="cyan")
+        table.add_column("Ideas", justify="right", style="green")
+        table.add_column("Representative idea")
+        for cluster_id, size, idea in largest:
+            table.add_row(str(cluster_id), str(size), f"#{idea.id} {idea.proposed_solution or idea.raw_input}" if idea else "")
+        console.print(table)
+
+def display_profiles(profiles: list):
+    table = Table(title="Scoring Profiles")
+    table.add_column("Profile", style="cyan")
+    table.add_column("Weights")
+    table.add_column("Verdict")
+    table.add_column("Active", justify="center", style="green")
+    for profile in profiles:
+        weights = json.loads(profile.weights)
+        thresholds = json.loads(profile.thresholds) if profile.thresholds else None
+        verdict = f"pursue >= {thresholds['pursue']}, refine >= {thresholds['refine']}" if thresholds else "from LLM"
+        table.add_row(
+            f"{profile.name} v{profile.version}", ", ".join(f"{k} {v}" for k, v in weights.items()),
+            verdict, "*" if profile.active else ""
+        )
+    console.print(table)
+
+def display_profile_comparison(report: dict):
+    table = Table(title=f"What-if: {report['a']['profile']} -> {report['b']['profile']} ({report['ideas']} ideas)")
+    table.add_column("Metric", style="cyan")
+    table.add_column(report["a"]["profile"], justify="right")
+    table.add_column(report["b"]["profile"], justify="right", style="green")
+    table.add_row("Mean score", str(report["a"]["mean"]), str(report["b"]["mean"]))
+    for verdict in report["a"]["verdicts"]:
+        table.add_row(f"Verdict: {verdict}", str(report["a"]["verdicts"][verdict]), str(report["b"]["verdicts"][verdict]))
+    console.print(table)
+
+    table = Table(title="Changes")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+    table.add_row("Verdicts changed", str(report["changed_verdicts"]))
+    for transition, count in report["transitions"].items():
+        table.add_row(f"  {transition}", str(count))
+    table.add_row("Mean score change", f"{report['mean_delta']:+.3f}")
+    table.add_row("Largest score change", str(report["max_delta"]))
+    table.add_row("Rank correlation", str(report["rank_correlation"]))
+    table.add_row("Top ideas kept", f"{report['top_overlap']:.0%}")
+    console.print(table)
+
+def display_rescore_report(report: dict):
+    table = Table(title=f"Re-scored with {report['profile']}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+    table.add_row("Evaluations", str(report["evaluations"]))
+    table.add_row("Updated", str(report["updated"]))
+    table.add_row("Load (s)", str(report["load_seconds"]))
+    table.add_row("Compute (s)", str(report["compute_seconds"]))
+    table.add_row("Write (s)", str(report["write_seconds"]))
+    table.add_row("Elapsed (s)", str(report["elapsed_seconds"]))
+    console.print(table)
+
+def display_stats(report: dict):
+    if not report["spans"]:
+        console.print("[dim]No traces recorded yet.[/dim]")
+        return
+
+    table = Table(title="Latency by Stage")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Errors", justify="right", style="red")
+    table.add_column("p50 (ms)", justify="right", style="green")
+    table.add_column("p95 (ms)", justify="right", style="yellow")
+    table.add_column("Total (s)", justify="right")
+    for stage in report["stages"]:
+        table.add_row(
+            stage["name"], str(stage["count"]), str(stage["errors"] or ""),
+            f"{stage['p50_ms']:.1f}", f"{stage['p95_ms']:.1f}", f"{stage['total_s']:.1f}"
+        )
+    console.print(table)
+
+    table = Table(title="LLM Usage & Cost")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+    table.add_row("LLM calls", str(report["llm_calls"]))
+    table.add_row("Cache hits", str(report["llm_cache_hits"]))
+    table.add_row("Retries", str(report["llm_retries"]))
+    table.add_row("Invalid JSON rate", f"{report['json_invalid_rate']:.1%} of {report['json_responses']} ({report['json_repaired']} repaired)")
+    table.add_row("Prompt tokens", str(report["prompt_tokens"]))
+    table.add_row("Completion tokens", str(report["completion_tokens"]))
+    table.add_row("Total cost ($)", f"{report['llm_cost']:.4f}")
+    table.add_row("Ideas saved", str(report["ideas"]))
+    table.add_row("Cost / idea ($)", f"{report['cost_per_idea']:.4f}")
+    table.add_row("Cost / idea p95 ($)", f"{report['cost_per_idea_p95']:.4f}")
+    table.add_row("Ideas dropped (cost $)", f"{report['dropped_ideas']} ({report['dropped_cost']:.4f})")
+    console.print(table)
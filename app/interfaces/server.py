@@ -0,0 +1,420 @@
+import asyncio
+import functools
+import itertools
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from app.config.settings import (
+    SERVER_WORKERS, SERVER_JOB_WORKERS, SERVER_MAX_JOBS, SERVER_MAX_PENDING_JOBS, SERVER_MAX_UPLOAD_MB
+)
+from app.llm.client import LLMNotConfiguredError
+from app.utils import tracing
+
+# The workflow functions are synchronous (they block on the shared LLM client
+# loop), so handlers run them on a thread pool. All LLM calls still go through
+# the one client and its connection pool, bounded by LLM_MAX_CONCURRENCY.
+
+class BadRequest(ValueError):
+    """
+    Invalid request input. Other ValueErrors (e.g. an LLM response that
+    could not be parsed) come from upstream and are not the client's fault.
+    """
+
+class NotFound(LookupError):
+    """
+    An unknown job or idea id. Other LookupErrors (a KeyError in a workflow)
+    are bugs, not a 404.
+    """
+
+class Overloaded(RuntimeError):
+    """
+    Too many background jobs are queued or running to accept another.
+    """
+
+def idea_to_dict(idea) -> dict:
+    return {
+        "id": idea.id,
+        "raw_input": idea.raw_input,
+        "problem_statement": idea.problem_statement,
+        "proposed_solution": idea.proposed_solution,
+        "target_users": idea.target_users,
+        "assumptions": idea.assumptions,
+        "source": idea.source,
+        "created_at": idea.created_at.isoformat() if idea.created_at else None
+    }
+
+def evaluation_to_dict(evaluation) -> dict:
+    return {
+        "id": evaluation.id,
+        "idea_id": evaluation.idea_id,
+        "feasibility": evaluation.feasibility,
+        "market_value": evaluation.market_value,
+        "complexity": evaluation.complexity,
+        "risk": evaluation.risk,
+        "innovation": evaluation.innovation,
+        "final_score": evaluation.final_score,
+        "verdict": evaluation.verdict,
+        "llm_verdict": evaluation.llm_verdict,
+        "profile_id": evaluation.profile_id,
+        "summary": evaluation.summary,
+        "created_at": evaluation.created_at.isoformat() if evaluation.created_at else None
+    }
+
+class Job:
+    """
+    A long-running task (research, transcription). Progress events are kept,
+    so a client subscribing late still receives the whole stream.
+    """
+
+    def __init__(self, job_id: str, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.events = []
+        self._changed = asyncio.Condition()
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "kind": self.kind, "status": self.status, "result": self.result, "error": self.error}
+
+    async def publish(self, event: str, data):
+        async with self._changed:
+            self.events.append((event, data))
+            self._changed.notify_all()
+
+    async def stream(self):
+        """
+        Yields (event, data) from the first event until the job finishes.
+        """
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > sent)
+                pending = self.events[sent:]
+            for event, data in pending:
+                yield event, data
+                if event in ("done", "error"):
+                    return
+            sent += len(pending)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+class JobQueue:
+    """
+    Background jobs run by a fixed number of worker tasks; queued jobs wait
+    their turn, so a burst of research requests cannot exhaust the thread
+    pool for the interactive endpoints. At most `max_pending` jobs may be
+    queued or running; submit raises Overloaded beyond that. Finished jobs
+    are kept for polling up to `max_jobs`, oldest evicted first.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, workers: int = SERVER_JOB_WORKERS, max_jobs: int = SERVER_MAX_JOBS,
+                 max_pending: int = SERVER_MAX_PENDING_JOBS):
+        self.executor = executor
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.pending = 0
+        self.jobs = OrderedDict()
+        self._queue = asyncio.Queue()
+        self._ids = itertools.count(1)
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, kind: str, fn, *args) -> Job:
+        """
+        Queues fn(*args, publish) to run on the thread pool; publish(event,
+        data) may be called from that thread to stream progress.
+        """
+        if self.pending >= self.max_pending:
+            raise Overloaded(f"{self.pending} jobs are already queued or running; retry later")
+        job = Job(f"{kind}-{next(self._ids)}", kind)
+        self.pending += 1
+        self.jobs[job.id] = job
+        self._evict()
+        self._queue.put_nowait((job, fn, args, tracing.current()))
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise NotFound(f"No job {job_id}")
+        return job
+
+    def _evict(self):
+        while len(self.jobs) > self.max_jobs:
+            oldest = next((j for j in self.jobs.values() if j.finished), None)
+            if oldest is None:
+                break
+            del self.jobs[oldest.id]
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, fn, args, parent = await self._queue.get()
+
+            def publish(event: str, data, job=job):
+                asyncio.run_coroutine_threadsafe(job.publish(event, data), loop)
+
+            def run():
+                with tracing.span(f"job.{job.kind}", parent=parent, job=job.id):
+                    return fn(*args, publish)
+
+            job.status = "running"
+            try:
+                job.result = await loop.run_in_executor(self.executor, run)
+                job.status = "done"
+                await job.publish("done", job.result)
+            except Exception as e:
+                job.status, job.error = "failed", str(e)
+                await job.publish("error", {"error": str(e)})
+            finally:
+                self.pending -= 1
+                self._queue.task_done()
+
+async def _read_json(request: web.Request) -> dict:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise BadRequest("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise BadRequest("Request body must be a JSON object")
+    return body
+
+def _require_text(body: dict, field: str = "text") -> str:
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise BadRequest(f"'{field}' is required")
+    return value
+
+@web.middleware
+async def error_middleware(request: web.Request, handler):
+    """
+    Maps workflow errors to JSON responses: bad input 400, unknown ids 404,
+    LLM not configured or too many jobs 503, other LLM/upstream failures
+    502. Each request is traced as an http span.
+    """
+    route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+    with tracing.span("http", method=request.method, route=route) as span:
+        try:
+            response = await handler(request)
+        except web.HTTPException:
+            raise
+        except BadRequest as e:
+            response = web.json_response({"error": str(e)}, status=400)
+        except NotFound as e:
+            response = web.json_response({"error": str(e)}, status=404)
+        except (LLMNotConfiguredError, Overloaded) as e:
+            response = web.json_response({"error": str(e)}, status=503)
+        except (ValueError, RuntimeError) as e:
+            response = web.json_response({"error": str(e)}, status=502)
+        span.set(status=response.status)
+        return response
+
+class ExecMindServer:
+    """
+    HTTP API over the ideation and evaluation workflows.
+
+        POST /frame              {"text"}                          -> framing
+        POST /research           {"text"}                          -> 202 job (streams report deltas)
+        POST /structure          {"text", "framed_text"?, "save"?, "research_report"?, "source"?}
+        POST /evaluate           {"idea_id"}                       -> evaluation
+        GET  /search?q=&limit=&offset=                             -> ideas
+        POST /transcribe         audio body                        -> 202 job (streams segments)
+        GET  /jobs/{id}                                            -> job status / result
+        GET  /jobs/{id}/events                                     -> server-sent events
+        GET  /health
+    """
+
+    def __init__(self, workers: int = SERVER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server")
+        self.jobs = None
+
+    def run_blocking(self, fn, *args, **kwargs):
+        """
+        Runs a workflow function on the thread pool, within the request's trace.
+        """
+        loop = asyncio.get_running_loop()
+        # bind here, on the request's task, so the context copied is the request's
+        return loop.run_in_executor(self.executor, tracing.bind(functools.partial(fn, *args, **kwargs)))
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[error_middleware], client_max_size=SERVER_MAX_UPLOAD_MB * 1024 * 1024)
+        app.add_routes([
+            web.get("/health", self.health),
+            web.post("/frame", self.frame),
+            web.post("/research", self.research),
+            web.post("/structure", self.structure),
+            web.post("/evaluate", self.evaluate),
+            web.get("/search", self.search),
+            web.post("/transcribe", self.transcribe),
+            web.get("/jobs/{job_id}", self.job_status),
+            web.get("/jobs/{job_id}/events", self.job_events),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        from app.storage.database import init_db
+
+        await self.run_blocking(init_db)
+        self.jobs = JobQueue(self.executor)
+        self.jobs.start()
+
+    async def _on_cleanup(self, app):
+        await self.jobs.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def health(self, request):
+        queued = sum(1 for j in self.jobs.jobs.values() if j.status == "queued")
+        return web.json_response({"status": "ok", "jobs_queued": queued})
+
+    async def frame(self, request):
+        from app.workflows.ideation import frame_idea
+
+        text = _require_text(await _read_json(request))
+        return web.json_response(await self.run_blocking(frame_idea, text))
+
+    async def research(self, request):
+        from app.workflows.ideation import conduct_research
+
+        text = _require_text(await _read_json(request))
+
+        def run(framed_text, publish):
+            sent = [0]
+
+            def on_token(report):
+                publish("delta", report[sent[0]:])
+                sent[0] = len(report)
+
+            return {"report": conduct_research(framed_text, on_token=on_token)}
+
+        job = self.jobs.submit("research", run, text)
+        return web.json_response(job.to_dict(), status=202)
+
+    async def structure(self, request):
+        from app.workflows.ideation import structure_idea, save_structured_idea
+
+        body = await _read_json(request)
+        text = _require_text(body)
+        framed_text = body.get("framed_text")
+        structured = await self.run_blocking(structure_idea, text, framed_text)
+        if not body.get("save"):
+            return web.json_response(structured)
+
+        idea = await self.run_blocking(
+            save_structured_idea, text, body.get("source", "api"), body.get("research_report"),
+            structured=structured
+        )
+        return web.json_response(idea_to_dict(idea), status=201)
+
+    async def evaluate(self, request):
+        from app.storage.database import SessionLocal, Idea
+        from app.workflows.evaluation import evaluate_idea
+
+        body = await _read_json(request)
+        idea_id = body.get("idea_id")
+        if not isinstance(idea_id, int):
+            raise BadRequest("'idea_id' must be an integer")
+
+        def run():
+            db = SessionLocal()
+            try:
+                idea = db.get(Idea, idea_id)
+            finally:
+                db.close()
+            if idea is None:
+                raise NotFound(f"No idea {idea_id}")
+            return evaluation_to_dict(evaluate_idea(idea))
+
+        return web.json_response(await self.run_blocking(run), status=201)
+
+    async def search(self, request):
+        from app.storage.search import search_ideas
+
+        query = request.query.get("q", "")
+        if not query.strip():
+            raise BadRequest("'q' is required")
+        try:
+            limit = min(int(request.query.get("limit", 10)), 100)
+            offset = int(request.query.get("offset", 0))
+        except ValueError:
+            raise BadRequest("'limit' and 'offset' must be integers")
+        ideas = await self.run_blocking(search_ideas, query, limit, offset)
+        return web.json_response([idea_to_dict(i) for i in ideas])
+
+    async def transcribe(self, request):
+        from app.interfaces.voice import whisper_available
+
+        if not whisper_available():
+            return web.json_response({"error": "Whisper is not installed on this server"}, status=503)
+        data = await request.read()
+        if not data:
+            raise BadRequest("Request body must be the audio file")
+
+        suffix = os.path.splitext(request.query.get("filename", ""))[1] or ".audio"
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            f.write(data)
+            path = f.name
+
+        def run(file_path, publish):
+            from app.interfaces.voice import transcribe_stream
+
+            try:
+                texts = []
+                for segment in transcribe_stream(file_path):
+                    if segment["text"]:
+                        texts.append(segment["text"])
+                    publish("segment", segment)
+                return {"text": " ".join(texts)}
+            finally:
+                os.remove(file_path)
+
+        try:
+            job = self.jobs.submit("transcribe", run, path)
+        except Overloaded:
+            os.remove(path)
+            raise
+        return web.json_response(job.to_dict(), status=202)
+
+    async def job_status(self, request):
+        return web.json_response(self.jobs.get(request.match_info["job_id"]).to_dict())
+
+    async def job_events(self, request):
+        """
+        Server-sent events: the job's progress events, then "done" (with the
+        result) or "error".
+        """
+        job = self.jobs.get(request.match_info["job_id"])
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+        async for event, data in job.stream():
+            await response.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        await response.write_eof()
+        return response
+
+def run_server(host: str, port: int):
+    server = ExecMindServer()
+    web.run_app(server.make_app(), host=host, port=port)
@@ -1,24 +1,336 @@
-import whisper
 import os
+import itertools
+import importlib.util
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 
-# Load model once at module level or lazily
-# Using "base" model for balance of speed and accuracy
+from app.config.settings import (
+    WHISPER_MODEL_SIZE, TRANSCRIBE_WINDOW_SECONDS, TRANSCRIBE_PROCESSES, TRANSCRIPT_CACHE_ENABLED,
+    AUDIO_PREPROCESS
+)
+from app.utils import tracing
+
+# In-process model, loaded lazily (used by worker processes themselves)
 _model = None
 
-def get_model():
+def get_model(model_size: str = WHISPER_MODEL_SIZE):
     global _model
     if _model is None:
-        print("Loading Whisper model (base)... please wait.")
-        _model = whisper.load_model("base")
+        # Imported here: whisper pulls in torch, which takes seconds to load
+        import whisper
+        _model = whisper.load_model(model_size)
     return _model
 
+def whisper_available() -> bool:
+    return importlib.util.find_spec("whisper") is not None
+
+def _worker_main(model_size: str, jobs, results):
+    """
+    Transcription worker process: loads the model once, then serves jobs
+    from `jobs` until it receives None.
+    """
+    try:
+        model = get_model(model_size)
+    except Exception as e:
+        results.put(("error", None, f"Could not load Whisper model '{model_size}': {e}"))
+        return
+    results.put(("ready", None, None))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, audio = job
+        try:
+            # audio is a file path or a 16 kHz float32 array
+            result = model.transcribe(audio)
+            results.put((job_id, result["text"].strip(), None))
+        except Exception as e:
+            results.put((job_id, None, f"{type(e).__name__}: {e}"))
+
+class TranscriptionWorker:
+    """
+    Long-lived process that holds a loaded Whisper model.
+
+    The model starts loading as soon as the worker is created, so by the time
+    a user has picked an audio file it is usually warm. Jobs are queued to the
+    process and results come back as Futures, keeping the CLI thread free.
+    """
+
+    def __init__(self, model_size: str = WHISPER_MODEL_SIZE):
+        self.model_size = model_size
+        self.ready = threading.Event()
+        self.error = None
+        # spawn, not fork: torch does not survive being forked with threads running
+        ctx = multiprocessing.get_context("spawn")
+        self._jobs = ctx.Queue()
+        self._results = ctx.Queue()
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._closed = None # set under _lock, with the reason, once no result can arrive
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(model_size, self._jobs, self._results),
+            name="whisper-worker",
+            daemon=True
+        )
+        self._process.start()
+        threading.Thread(target=self._collect, name="whisper-results", daemon=True).start()
+
+    def _collect(self):
+        while True:
+            try:
+                job_id, text, error = self._results.get(timeout=1)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                self._fail_pending(self.error or "Transcription worker exited unexpectedly.")
+                return
+
+            if job_id == "ready":
+                self.ready.set()
+                continue
+            if job_id == "error":
+                self.error = error
+                self.ready.set()
+                self._fail_pending(error)
+                return
+
+            with self._lock:
+                future = self._pending.pop(job_id, None)
+            if future is None:
+                continue
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(text)
+
+    def _fail_pending(self, message: str):
+        with self._lock:
+            self._closed = message
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError(message))
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive() and self.error is None
+
+    def submit(self, audio) -> Future:
+        """
+        Queues a file path or a 16 kHz mono float32 array for transcription.
+        """
+        future = Future()
+        job_id = next(self._ids)
+        with self._lock:
+            # Checked under the lock _fail_pending takes, so a future is never
+            # registered after the results thread has failed the rest and exited
+            closed = self._closed
+            if closed is None and not self.is_alive():
+                closed = self.error or "Transcription worker is not running."
+            if closed is None:
+                self._pending[job_id] = future
+        if closed is not None:
+            future.set_exception(RuntimeError(closed))
+            return future
+        if isinstance(audio, str):
+            audio = os.path.abspath(audio)
+        self._jobs.put((job_id, audio))
+        return future
+
+    def shutdown(self):
+        if self._process.is_alive():
+            self._jobs.put(None)
+            self._process.join(timeout=5)
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def start_worker(model_size: str = WHISPER_MODEL_SIZE) -> TranscriptionWorker:
+    """
+    Starts (or returns) the shared worker, which begins loading the model
+    in the background immediately. A worker that has died is replaced.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = TranscriptionWorker(model_size)
+    return _worker
+
+def _cached_transcript(file_path: str, model_size: str) -> tuple:
+    """
+    (audio hash, cached transcript or None). The hash is None when the
+    transcript cache is turned off.
+    """
+    if not TRANSCRIPT_CACHE_ENABLED:
+        return None, None
+    from app.storage.transcripts import audio_hash, get_transcript
+
+    with tracing.span("voice.cache") as span:
+        key = audio_hash(file_path)
+        cached = get_transcript(key, model_size)
+        span.set(cache_hit=cached is not None)
+    return key, cached
+
+def _save_transcript(key: str, model_size: str, text: str, **details):
+    if key is None:
+        return
+    from app.storage.transcripts import save_transcript
+
+    try:
+        save_transcript(key, model_size, text, **details)
+    except Exception:
+        # The cache only saves time: failing to write it must not lose the transcript
+        pass
+
+def transcribe_audio_async(file_path: str, model_size: str = WHISPER_MODEL_SIZE) -> Future:
+    """
+    Queues an audio file for transcription and returns a Future for the text.
+
+    A recording already transcribed with this model size resolves at once
+    from the transcript cache. Otherwise it is resampled and silence-trimmed
+    on the ffmpeg pool (see app.interfaces.audio.preprocess_audio) while the
+    model warms up, then sent to the worker; without ffmpeg, or if
+    preprocessing fails, the original file is sent.
+    """
+    from app.interfaces.audio import SAMPLE_RATE, preprocess_audio_async, probe_duration
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Audio file not available at {file_path}")
+    # A running worker keeps the model it was loaded with
+    worker_model = _worker.model_size if _worker is not None and _worker.is_alive() else model_size
+    key, cached = _cached_transcript(file_path, worker_model)
+    result = Future()
+    if cached is not None:
+        result.set_result(cached["text"])
+        return result
+
+    worker = start_worker(model_size)
+    parent = tracing.current()
+    submitted = time.perf_counter()
+
+    def _finish(text: str, **details):
+        _save_transcript(key, worker.model_size, text, **details)
+        result.set_result(text)
+
+    def _transcribed(future, details):
+        try:
+            text = future.result()
+        except Exception as e:
+            result.set_exception(e)
+            return
+        _finish(text, **details)
+
+    def _preprocessed(future):
+        try:
+            samples = future.result()
+        except Exception as e:
+            # Trimming is an optimisation: a file ffmpeg cannot filter may
+            # still be one the model can read, so fall back to the original
+            tracing.record("voice.preprocess", (time.perf_counter() - submitted) * 1000, parent=parent, error=type(e).__name__)
+            samples = None
+        if samples is None:
+            worker.submit(file_path).add_done_callback(lambda f: _transcribed(f, {}))
+            return
+        details = {"audio_seconds": probe_duration(file_path), "speech_seconds": round(len(samples) / SAMPLE_RATE, 2)}
+        tracing.record("voice.preprocess", (time.perf_counter() - submitted) * 1000, parent=parent, **details)
+        if not len(samples):
+            # Nothing but silence: no need to wake the model
+            _finish("", **details)
+            return
+        worker.submit(samples).add_done_callback(lambda f: _transcribed(f, details))
+
+    preprocess_audio_async(file_path).add_done_callback(_preprocessed)
+    return result
+
+@tracing.traced("voice.transcribe")
 def transcribe_audio(file_path: str) -> str:
     """
     Transcribes audio file to text using Whisper.
     """
+    return transcribe_audio_async(file_path).result()
+
+def _init_pool_process(model_size: str):
+    get_model(model_size)
+
+def _transcribe_samples(samples) -> str:
+    return get_model().transcribe(samples)["text"].strip()
+
+def transcribe_stream(file_path: str, window_seconds: float = TRANSCRIBE_WINDOW_SECONDS,
+                      processes: int = TRANSCRIBE_PROCESSES, model_size: str = WHISPER_MODEL_SIZE):
+    """
+    Transcribes a long recording piece by piece, yielding
+    {"start", "end", "text"} dicts in order as each segment finishes.
+
+    Audio is decoded in windows and cut at pauses (see
+    app.interfaces.audio.iter_speech_segments), so memory stays bounded and
+    silent stretches are skipped; long pauses inside a segment are cut
+    before it is sent (see app.interfaces.audio.trim_silence). With processes > 1, segments run in
+    parallel on a pool of processes, each with its own model; otherwise
+    they go to the shared background worker.
+
+    A recording already transcribed with this model size is replayed from
+    the transcript cache without decoding it.
+    """
+    from app.interfaces.audio import SAMPLE_RATE, iter_speech_segments, trim_silence
+
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Audio file not available at {file_path}")
+    if processes <= 1 and _worker is not None and _worker.is_alive():
+        model_size = _worker.model_size
+    key, cached = _cached_transcript(file_path, model_size)
+    if cached is not None:
+        yield from cached["segments"] or [{"start": 0.0, "end": cached["audio_seconds"] or 0.0, "text": cached["text"]}]
+        return
+
+    pool = None
+    if processes > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_process,
+            initargs=(model_size,)
+        )
+
+        def submit(samples):
+            return pool.submit(_transcribe_samples, samples)
+    else:
+        submit = start_worker(model_size).submit
+
+    # Keep a few segments in flight: enough to keep every process busy while
+    # bounding how much decoded audio is held in memory
+    lookahead = max(2, processes * 2)
+    in_flight = deque()
+
+    def _next():
+        start_s, end_s, submitted, future = in_flight.popleft()
+        text = future.result()
+        # Recorded, not a span: a generator cannot hold one open across yields
+        tracing.record("voice.segment", (time.perf_counter() - submitted) * 1000, audio_seconds=round(end_s - start_s, 2))
+        return {"start": start_s, "end": end_s, "text": text}
 
-    model = get_model()
-    result = model.transcribe(file_path)
-    return result["text"].strip()
+    segments = []
+    speech_seconds = 0.0
+    try:
+        for start, end, samples in iter_speech_segments(file_path, window_seconds):
+            if AUDIO_PREPROCESS:
+                samples = trim_silence(samples)
+            speech_seconds += len(samples) / SAMPLE_RATE
+            in_flight.append((start, end, time.perf_counter(), submit(samples)))
+            if len(in_flight) >= lookahead:
+                segments.append(_next())
+                yield segments[-1]
+        while in_flight:
+            segments.append(_next())
+            yield segments[-1]
+        _save_transcript(
+            key, model_size, " ".join(s["text"] for s in segments if s["text"]), segments=segments,
+            speech_seconds=round(speech_seconds, 2)
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
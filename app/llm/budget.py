@@ -0,0 +1,122 @@
+import threading
+
+from app.config.settings import AZURE_OPENAI_DEPLOYMENT_NAME, LLM_PROMPT_TOKEN_CEILING
+
+# Token counts use tiktoken when it is installed (with the encoding of the
+# deployed model where known), and ~4 characters per token otherwise. The
+# estimate errs on the high side for English prose, so budgets stay safe.
+
+TRUNCATION_MARKER = " [...] "
+# Below this, a cut user prompt carries too little of the request to be worth sending
+MIN_USER_TOKENS = 64
+
+_encoder = None
+_encoder_lock = threading.Lock()
+_encoder_loaded = False
+
+def get_encoder():
+    """
+    Returns the tiktoken encoding for the deployment, or None if tiktoken
+    (or its encoding files) is unavailable.
+    """
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        with _encoder_lock:
+            if not _encoder_loaded:
+                try:
+                    import tiktoken
+                    try:
+                        _encoder = tiktoken.encoding_for_model(AZURE_OPENAI_DEPLOYMENT_NAME)
+                    except KeyError:
+                        # Azure deployment names are user-chosen; default to the GPT-4o encoding
+                        _encoder = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoder = None
+                _encoder_loaded = True
+    return _encoder
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoder = get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+def truncate_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """
+    Cuts text to at most max_tokens, marking the cut. By default the start
+    is kept; with keep_tail the start and the end are kept and the middle
+    is dropped (for prompts whose instructions come last).
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(1, max_tokens - count_tokens(TRUNCATION_MARKER))
+    encoder = get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        if keep_tail:
+            head, tail = keep - keep // 2, keep // 2
+            return encoder.decode(tokens[:head]) + TRUNCATION_MARKER + encoder.decode(tokens[len(tokens) - tail:])
+        return encoder.decode(tokens[:keep]) + TRUNCATION_MARKER.rstrip()
+
+    chars = keep * 4
+    if keep_tail:
+        head, tail = chars - chars // 2, chars // 2
+        return text[:head] + TRUNCATION_MARKER + text[len(text) - tail:]
+    # Prefer to cut at a word boundary
+    cut = text[:chars]
+    space = cut.rfind(" ")
+    if space > chars // 2:
+        cut = cut[:space]
+    return cut + TRUNCATION_MARKER.rstrip()
+
+def select_within_budget(items: list, budget: int, max_item_tokens: int = None, separator: str = "\n") -> list:
+    """
+    Keeps items (already in rank order) while they fit the token budget,
+    first cutting each to max_item_tokens. An item that does not fit is
+    truncated to the remaining budget if enough of it would remain to be useful.
+    """
+    selected = []
+    remaining = budget
+    separator_tokens = count_tokens(separator)
+    for item in items:
+        if max_item_tokens:
+            item = truncate_tokens(item, max_item_tokens)
+        tokens = count_tokens(item) + (separator_tokens if selected else 0)
+        if tokens <= remaining:
+            selected.append(item)
+            remaining -= tokens
+            continue
+        if remaining >= 32:
+            selected.append(truncate_tokens(item, remaining - separator_tokens))
+        break
+    return selected
+
+def fit_prompt(system_prompt: str, user_prompt: str, ceiling: int = LLM_PROMPT_TOKEN_CEILING) -> tuple:
+    """
+    Enforces the prompt ceiling: if system and user prompt together exceed it,
+    the middle of the user prompt is dropped. Returns (user_prompt, tokens
+    dropped). A ceiling of 0 disables the check.
+
+    Raises ValueError if the system prompt leaves fewer than MIN_USER_TOKENS
+    for a user prompt that has to be cut, rather than sending the request
+    without it.
+    """
+    if not ceiling:
+        return user_prompt, 0
+    system_tokens = count_tokens(system_prompt)
+    user_tokens = count_tokens(user_prompt)
+    if system_tokens + user_tokens <= ceiling:
+        return user_prompt, 0
+    available = ceiling - system_tokens
+    if available < MIN_USER_TOKENS:
+        raise ValueError(
+            f"System prompt uses {system_tokens} of the {ceiling}-token prompt ceiling, leaving "
+            f"{max(0, available)} for a {user_tokens}-token user prompt; raise EXECMIND_LLM_PROMPT_TOKEN_CEILING"
+        )
+    fitted = truncate_tokens(user_prompt, available, keep_tail=True)
+    return fitted, user_tokens - count_tokens(fitted)
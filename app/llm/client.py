@@ -1,37 +1,398 @@
-from openai import AzureOpenAI
+import asyncio
+import atexit
+import os
+import queue
+import threading
+import time
 from app.config.settings import (
-    AZURE_OPENAI_API_KEY, 
-    AZURE_OPENAI_ENDPOINT, 
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_API_VERSION,
-    AZURE_OPENAI_DEPLOYMENT_NAME
+    AZURE_OPENAI_DEPLOYMENT_NAME,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SECONDS,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+    DATA_DIR
 )
+from app.llm import budget, resilience
+from app.storage.cache import DiskCache, make_key
+from app.utils import tracing
 
+TEMPERATURE = 0.7
+
+# One shared async client: its HTTP connection pool (keep-alive, TLS sessions)
+# is reused by every call in the process. Created on first use, since
+# importing openai is slow and text-free paths (search, menus) never need it.
 client = None
-if AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT:
-    client = AzureOpenAI(
-        api_key=AZURE_OPENAI_API_KEY,
-        api_version=AZURE_OPENAI_API_VERSION,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT
-    )
+_client_lock = threading.Lock()
+
+class LLMNotConfiguredError(ValueError):
+    """
+    Raised by LLM calls when no Azure OpenAI credentials are configured.
+    """
+
+def get_client():
+    global client
+    if client is None and AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT:
+        with _client_lock:
+            if client is None:
+                from openai import AsyncAzureOpenAI
+                client = AsyncAzureOpenAI(
+                    api_key=AZURE_OPENAI_API_KEY,
+                    api_version=AZURE_OPENAI_API_VERSION,
+                    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                    timeout=LLM_TIMEOUT_SECONDS,
+                    # Retries are handled by app.llm.resilience, which also
+                    # rate-limits and counts them
+                    max_retries=0
+                )
+    return client
+
+# The client is bound to a single event loop, run in a daemon thread so that
+# synchronous callers (the CLI, thread pools) can share it.
+_loop = None
+_loop_lock = threading.Lock()
+_semaphore = None
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _semaphore
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                _loop = loop
+    return _loop
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Process-wide token usage, as reported by the API
+_usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_usage_lock = threading.Lock()
+
+def usage_totals() -> dict:
+    with _usage_lock:
+        return dict(_usage)
+
+def _record_usage(usage):
+    with _usage_lock:
+        _usage["requests"] += 1
+        if usage is not None:
+            _usage["prompt_tokens"] += usage.prompt_tokens or 0
+            _usage["completion_tokens"] += usage.completion_tokens or 0
+
+def get_cache() -> DiskCache:
+    """
+    Returns the persistent response cache, stored next to the database.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(DATA_DIR, "execmind_llm_cache.db"),
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                    max_entries=LLM_CACHE_MAX_ENTRIES
+                )
+                # Keep the access times of this run's in-memory hits
+                atexit.register(_cache.flush)
+    return _cache
+
+def cache_stats() -> dict:
+    return get_cache().stats()
 
-def call_llm(system_prompt: str, user_prompt: str) -> str:
+def _cache_key(system_prompt: str, user_prompt: str, response_format: dict = None) -> str:
+    if response_format:
+        return make_key(AZURE_OPENAI_DEPLOYMENT_NAME, TEMPERATURE, system_prompt, user_prompt, response_format)
+    return make_key(AZURE_OPENAI_DEPLOYMENT_NAME, TEMPERATURE, system_prompt, user_prompt)
+
+def _format_args(response_format: dict) -> dict:
+    return {"response_format": response_format} if response_format else {}
+
+def _use_cache(cache: bool) -> bool:
+    return LLM_CACHE_ENABLED and cache
+
+def _estimate_tokens(system_prompt: str, user_prompt: str) -> int:
+    """
+    Tokens to reserve against the TPM limit before the real usage is known
+    (~4 characters per token, plus a typical response).
+    """
+    return (len(system_prompt) + len(user_prompt)) // 4 + LLM_EXPECTED_COMPLETION_TOKENS
+
+def _settle_tokens(estimated: int, usage):
+    if usage is not None:
+        resilience.get_limiter().settle(estimated, (usage.prompt_tokens or 0) + (usage.completion_tokens or 0))
+
+def _fit(system_prompt: str, user_prompt: str) -> str:
+    """
+    Applies the prompt token ceiling; a cut is traced as an llm.truncate span.
+    """
+    fitted, dropped = budget.fit_prompt(system_prompt, user_prompt)
+    if dropped:
+        tracing.record("llm.truncate", 0, dropped_tokens=dropped)
+    return fitted
+
+def _run(coro):
+    """
+    Runs a coroutine on the client loop and blocks until it completes.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def _cached(system_prompt: str, user_prompt: str, response_format: dict = None):
+    """
+    Cache lookup on the calling thread; a hit is traced as a free LLM call.
+    """
+    start = time.perf_counter()
+    cached = get_cache().get(_cache_key(system_prompt, user_prompt, response_format))
+    if cached is not None:
+        tracing.record("llm", (time.perf_counter() - start) * 1000, cache_hit=True)
+    return cached
+
+async def _complete(system_prompt: str, user_prompt: str, use_cache: bool = True, lookup: bool = True,
+                    parent: tracing.Span = None, response_format: dict = None) -> str:
+    # Runs on the client loop, where the caller's span is not current: callers
+    # pass it as `parent`
+    with tracing.span("llm", parent=parent, cache_hit=False) as span:
+        if use_cache and lookup:
+            cached = get_cache().get(_cache_key(system_prompt, user_prompt, response_format))
+            if cached is not None:
+                span.set(cache_hit=True)
+                return cached
+
+        llm = get_client()
+        if not llm:
+            raise LLMNotConfiguredError("Azure OpenAI Client is not initialized. Check your credentials.")
+
+        async def _request():
+            # The concurrency slot is only held while a request is in flight,
+            # not while backing off between retries
+            queued = time.perf_counter()
+            async with _semaphore:
+                span.set(queue_ms=round((time.perf_counter() - queued) * 1000, 2))
+                return await llm.chat.completions.create(
+                    model=AZURE_OPENAI_DEPLOYMENT_NAME,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=TEMPERATURE,
+                    **_format_args(response_format)
+                )
+
+        estimated = _estimate_tokens(system_prompt, user_prompt)
+        try:
+            response = await resilience.call(_request, estimated, on_retry=lambda: span.add("retries"))
+            content = response.choices[0].message.content.strip()
+        except Exception as e:
+            raise RuntimeError(f"LLM Call Failed: {str(e)}")
+        usage = getattr(response, "usage", None)
+        _record_usage(usage)
+        _settle_tokens(estimated, usage)
+        if usage is not None:
+            span.set(prompt_tokens=usage.prompt_tokens or 0, completion_tokens=usage.completion_tokens or 0)
+
+        if use_cache:
+            get_cache().set(_cache_key(system_prompt, user_prompt, response_format), content)
+        return content
+
+async def acall_llm(system_prompt: str, user_prompt: str, cache: bool = False,
+                    response_format: dict = None) -> str:
+    """
+    Async variant of call_llm. Safe to await from any event loop; the request
+    itself always runs on the shared client loop, within the concurrency limit.
+    """
+    user_prompt = _fit(system_prompt, user_prompt)
+    use_cache = _use_cache(cache)
+    if use_cache:
+        cached = _cached(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            return cached
+
+    loop = _get_loop()
+    coro = _complete(system_prompt, user_prompt, use_cache, lookup=False, parent=tracing.current(),
+                     response_format=response_format)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def call_llm(system_prompt: str, user_prompt: str, cache: bool = False, response_format: dict = None) -> str:
     """
     Calls Azure OpenAI with the given system and user prompts.
     Returns the content of the response message.
+    With cache=True, identical requests are answered from the response
+    cache. Only deterministic steps (extraction, scoring) should opt in: at
+    TEMPERATURE a repeat of a creative prompt is expected to differ.
+    response_format is passed through to the API
+    (see app.llm.structured). Prompts over LLM_PROMPT_TOKEN_CEILING have the
+    middle of the user prompt cut.
+    A system prompt that leaves almost nothing of the ceiling for the user
+    prompt raises ValueError (see app.llm.budget.fit_prompt).
     """
-    if not client:
-        raise ValueError("Azure OpenAI Client is not initialized. Check your credentials.")
+    user_prompt = _fit(system_prompt, user_prompt)
+    use_cache = _use_cache(cache)
+    if use_cache:
+        # Answer hits on the calling thread, without a hop to the client loop
+        cached = _cached(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            return cached
+    return _run(_complete(system_prompt, user_prompt, use_cache, lookup=False, parent=tracing.current(),
+                          response_format=response_format))
 
-    try:
-        response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
+def call_many(requests: list, return_exceptions: bool = False, cache: bool = False) -> list:
+    """
+    Runs several independent (system_prompt, user_prompt) calls concurrently,
+    bounded by LLM_MAX_CONCURRENCY. Results are returned in request order.
+    With return_exceptions=True, failed calls yield their exception instead
+    of aborting the batch.
+    """
+    use_cache = _use_cache(cache)
+    parent = tracing.current()
+    fitted = []
+    for system_prompt, user_prompt in requests:
+        try:
+            fitted.append((system_prompt, _fit(system_prompt, user_prompt)))
+        except ValueError as e:
+            # A prompt that cannot fit the ceiling fails alone, like any other call
+            if not return_exceptions:
+                raise
+            fitted.append(e)
+
+    async def _failed(error: Exception):
+        raise error
+
+    async def _gather():
+        return await asyncio.gather(
+            *[_failed(item) if isinstance(item, Exception) else _complete(*item, use_cache, parent=parent) for item in fitted],
+            return_exceptions=return_exceptions
         )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        # In a real app we might retry or log more specifically
-        raise RuntimeError(f"LLM Call Failed: {str(e)}")
+    return list(_run(_gather()))
+
+async def _stream(system_prompt: str, user_prompt: str, sink: queue.Queue, stats: dict, response_format: dict = None):
+    """
+    Streams completion deltas into `sink`, followed by None (done) or the
+    exception that ended the stream. Token usage, when the API reports it
+    for streams, and the retry count are stored in `stats`.
+    """
+    try:
+        llm = get_client()
+        if not llm:
+            raise LLMNotConfiguredError("Azure OpenAI Client is not initialized. Check your credentials.")
+
+        async def _open():
+            # The slot is held for the whole stream, so it is released here
+            # only if opening fails
+            await _semaphore.acquire()
+            try:
+                return await llm.chat.completions.create(
+                    model=AZURE_OPENAI_DEPLOYMENT_NAME,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=TEMPERATURE,
+                    stream=True,
+                    **_format_args(response_format)
+                )
+            except BaseException:
+                _semaphore.release()
+                raise
+
+        def _count_retry():
+            stats["retries"] = stats.get("retries", 0) + 1
+
+        estimated = _estimate_tokens(system_prompt, user_prompt)
+        try:
+            # Only opening the stream is retried: once deltas have been
+            # delivered, a failure mid-stream is reported as is
+            stream = await resilience.call(_open, estimated, on_retry=_count_retry)
+        except Exception as e:
+            raise RuntimeError(f"LLM Call Failed: {str(e)}")
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    stats["usage"] = chunk.usage
+                    _record_usage(chunk.usage)
+                    _settle_tokens(estimated, chunk.usage)
+                # Azure sends content-filter chunks with no choices
+                if chunk.choices and chunk.choices[0].delta.content:
+                    sink.put(chunk.choices[0].delta.content)
+        except Exception as e:
+            raise RuntimeError(f"LLM Call Failed: {str(e)}")
+        finally:
+            _semaphore.release()
+        sink.put(None)
+    except BaseException as e:
+        sink.put(e)
+        raise
+
+def stream_llm(system_prompt: str, user_prompt: str, cache: bool = False, response_format: dict = None):
+    """
+    Like call_llm, but yields the response text in deltas as they arrive.
+    With cache=True, a cached response is yielded as a single delta and the
+    complete response is cached once the stream finishes.
+    """
+    user_prompt = _fit(system_prompt, user_prompt)
+    use_cache = _use_cache(cache)
+    if use_cache:
+        cached = _cached(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            yield cached
+            return
+
+    # A generator cannot hold a span open across yields (it would become the
+    # caller's current span), so the call is timed here and recorded at the end
+    parent = tracing.current()
+    start = time.perf_counter()
+    first_token_ms = None
+    stats = {}
+    sink = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(_stream(system_prompt, user_prompt, sink, stats, response_format), _get_loop())
+    parts = []
+    try:
+        while True:
+            item = sink.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                tracing.record("llm", (time.perf_counter() - start) * 1000, parent=parent, stream=True,
+                               cache_hit=False, retries=stats.get("retries", 0), error=type(item).__name__)
+                raise item
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - start) * 1000, 2)
+            if not parts:
+                # Match call_llm, which strips the response
+                item = item.lstrip()
+                if not item:
+                    continue
+            parts.append(item)
+            yield item
+    finally:
+        # Stop the request if the consumer abandoned the stream early
+        future.cancel()
+
+    content = "".join(parts).rstrip()
+    usage = stats.get("usage")
+    if usage is not None:
+        tokens = {"prompt_tokens": usage.prompt_tokens or 0, "completion_tokens": usage.completion_tokens or 0}
+    else:
+        # Streams carry no usage unless the API version supports it: estimate
+        # at ~4 characters per token
+        _record_usage(None)
+        tokens = {
+            "prompt_tokens": (len(system_prompt) + len(user_prompt)) // 4,
+            "completion_tokens": len(content) // 4,
+            "estimated": True
+        }
+    tracing.record("llm", (time.perf_counter() - start) * 1000, parent=parent, stream=True, cache_hit=False,
+                   first_token_ms=first_token_ms, retries=stats.get("retries", 0), **tokens)
+    if use_cache:
+        get_cache().set(_cache_key(system_prompt, user_prompt, response_format), content)
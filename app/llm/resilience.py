@@ -0,0 +1,245 @@
+import asyncio
+import email.utils
+import random
+import time
+
+from app.config.settings import (
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_RPM_LIMIT,
+    LLM_TPM_LIMIT,
+    LLM_CIRCUIT_FAILURES,
+    LLM_CIRCUIT_RESET_SECONDS
+)
+
+# Everything here runs on the LLM client loop (see app.llm.client), so the
+# state is shared by all callers without locks.
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class TokenBucket:
+    """
+    Client-side rate limit: `rate` units per minute. Azure enforces its
+    per-minute quotas over 10-second windows, so bursts are capped at 10
+    seconds' worth. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = rate / 6
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if not self.rate:
+            return max(0.0, self.paused_until - time.monotonic())
+        self._refill()
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        wait = 0.0 if self.tokens >= amount else (amount - self.tokens) * 60 / self.rate
+        return max(wait, self.paused_until - time.monotonic())
+
+    def take(self, amount: float):
+        if self.rate:
+            self._refill()
+            self.tokens -= amount
+
+    def settle(self, amount: float):
+        """
+        Corrects an earlier take() once the real cost is known (may be negative).
+        """
+        if self.rate:
+            self.tokens -= amount
+
+    def pause(self, seconds: float):
+        """
+        Holds every caller back, e.g. for a 429's Retry-After.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets, matched to the
+    deployment's Azure quota so bursts queue here instead of drawing 429s.
+    """
+
+    def __init__(self, rpm: float = LLM_RPM_LIMIT, tpm: float = LLM_TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    async def acquire(self, tokens: int):
+        while True:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        self.requests.take(1)
+        self.tokens.take(tokens)
+
+    def settle(self, estimated: int, actual: int):
+        self.tokens.settle(actual - estimated)
+
+    def pause(self, seconds: float):
+        self.requests.pause(seconds)
+
+class CircuitBreaker:
+    """
+    Fails fast after `failures` consecutive server/connection errors, for
+    `reset_seconds`; then lets one trial call through (half-open) and closes
+    again if it succeeds.
+    """
+
+    def __init__(self, failures: int = LLM_CIRCUIT_FAILURES, reset_seconds: float = LLM_CIRCUIT_RESET_SECONDS):
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def check(self) -> bool:
+        """
+        Raises CircuitOpenError while open. Returns True if the caller's
+        request is the half-open trial, which it must then settle.
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_running):
+            remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"Azure OpenAI circuit open after {self.failures} failures; retry in {max(remaining, 0):.0f}s")
+        if state == "half-open":
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+def status_code(exc: Exception):
+    return getattr(exc, "status_code", None)
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    429s, 408/409, 5xx, timeouts and connection errors are transient.
+    """
+    from openai import APIConnectionError
+
+    code = status_code(exc)
+    if code is not None:
+        return code in (408, 409, 429) or code >= 500
+    return isinstance(exc, (APIConnectionError, asyncio.TimeoutError, ConnectionError))
+
+def is_server_failure(exc: Exception) -> bool:
+    """
+    Failures that count towards opening the circuit. Throttling (429) means
+    the service is up, so it is handled by backing off instead.
+    """
+    code = status_code(exc)
+    return code is None or code >= 500
+
+def retry_after_seconds(exc: Exception):
+    """
+    The server's requested delay, from retry-after-ms or Retry-After
+    (seconds or an HTTP date), or None.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: float = None,
+                  base: float = LLM_RETRY_BASE_SECONDS, cap: float = LLM_RETRY_MAX_SECONDS) -> float:
+    """
+    Exponential backoff with full jitter; a server-given Retry-After is
+    honoured (plus a little jitter so waiting callers don't retry in step).
+    """
+    if retry_after is not None:
+        return min(retry_after, cap) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+_limiter = None
+_breaker = None
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker()
+    return _breaker
+
+async def call(request, estimated_tokens: int = 0, on_retry=None, max_retries: int = LLM_MAX_RETRIES):
+    """
+    Awaits request() (a zero-argument coroutine function) under the rate
+    limiter and circuit breaker, retrying transient failures with backoff.
+    on_retry(), if given, is called before each retry. The last error is
+    re-raised.
+    """
+    limiter, breaker = get_limiter(), get_breaker()
+    for attempt in range(max_retries + 1):
+        trial = breaker.check()
+        try:
+            await limiter.acquire(estimated_tokens)
+            result = await request()
+        except Exception as e:
+            if is_server_failure(e):
+                breaker.record_failure()
+            elif trial:
+                # The service answered: don't leave a half-open trial hanging
+                breaker.trial_running = False
+            if not is_retryable(e) or attempt == max_retries:
+                raise
+            retry_after = retry_after_seconds(e)
+            delay = backoff_delay(attempt, retry_after)
+            if status_code(e) == 429:
+                # Throttled: hold back every caller, not just this one
+                limiter.pause(delay)
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled (an abandoned stream or speculation): the trial proved
+            # nothing, so let the next call try instead of staying locked out
+            if trial:
+                breaker.trial_running = False
+            raise
+        else:
+            breaker.record_success()
+            return result
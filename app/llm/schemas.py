@@ -0,0 +1,29 @@
+from typing import Literal, Union
+from pydantic import BaseModel, Field, field_validator
+
+# Response models for the JSON-producing prompts. Field descriptions are
+# sent to the model as part of the JSON schema.
+
+class Framing(BaseModel):
+    restatement: str = Field(description="A clean, professional summary of the idea")
+    confirmation_question: str = Field(description="A question asking if this logic is correct")
+
+class StructuredIdea(BaseModel):
+    problem_statement: str
+    proposed_solution: str
+    target_users: Union[str, list[str]]
+    assumptions: Union[str, list[str]]
+
+class Scores(BaseModel):
+    feasibility: int = Field(ge=1, le=10, description="Technical feasibility")
+    market_value: int = Field(ge=1, le=10, description="Business potential")
+    complexity: int = Field(ge=1, le=10, description="Implementation difficulty")
+    risk: int = Field(ge=1, le=10, description="Failure risk")
+    innovation: int = Field(ge=1, le=10, description="Novelty")
+    verdict: Literal["pursue", "refine", "drop"]
+    summary: str = Field(description="1-2 sentence justification")
+
+    @field_validator("verdict", mode="before")
+    @classmethod
+    def _lowercase_verdict(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from pydantic import BaseModel, ValidationError
+
+from app.config.settings import LLM_STRUCTURED_OUTPUT
+from app.llm.client import call_llm, stream_llm
+from app.utils import tracing
+from app.utils.parsing import IncrementalJSONParser, parse_json_safely
+
+REPAIR_SYSTEM_PROMPT = """
+You fix JSON responses that failed validation.
+You will be given the original instructions and input, the JSON schema,
+the fields that were already valid, and the errors found.
+Output VALID JSON only, containing just the missing or invalid fields.
+"""
+
+# Outcome counts for schema-validated responses, process-wide
+_stats = {"responses": 0, "invalid": 0, "repaired": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+def json_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["invalid_rate"] = round(stats["invalid"] / stats["responses"], 4) if stats["responses"] else 0.0
+    return stats
+
+def _count(**outcomes):
+    with _stats_lock:
+        _stats["responses"] += 1
+        for key, happened in outcomes.items():
+            _stats[key] += int(happened)
+
+def _strict_schema(schema: dict) -> dict:
+    """
+    Adapts a pydantic JSON schema to Azure's strict structured-output subset:
+    every property required, no additional properties, and no keywords it
+    rejects (range checks are still enforced by pydantic afterwards).
+    """
+    if isinstance(schema, list):
+        return [_strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    strict = {k: _strict_schema(v) for k, v in schema.items() if k not in ("title", "default", "minimum", "maximum")}
+    if strict.get("type") == "object" and "properties" in schema:
+        strict["properties"] = {k: _strict_schema(v) for k, v in schema["properties"].items()}
+        strict["required"] = list(schema["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+def response_format(model: type[BaseModel]):
+    """
+    The response_format to request for `model`, per LLM_STRUCTURED_OUTPUT.
+    """
+    if LLM_STRUCTURED_OUTPUT == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": model.__name__, "strict": True, "schema": _strict_schema(model.model_json_schema())}
+        }
+    if LLM_STRUCTURED_OUTPUT == "json_object":
+        return {"type": "json_object"}
+    return None
+
+def _validate(model: type[BaseModel], fields: dict):
+    """
+    Returns (instance, None) or (None, pydantic error list).
+    """
+    try:
+        return model.model_validate(fields), None
+    except ValidationError as e:
+        return None, e.errors()
+
+def _repair(system_prompt: str, user_prompt: str, model: type[BaseModel], fields: dict, errors: list, text: str,
+            cache: bool = False):
+    """
+    One follow-up call asking only for the missing or invalid fields, which
+    are merged into the fields that did parse. Returns an instance or None.
+    """
+    invalid = {str(e["loc"][0]) for e in errors if e["loc"]}
+    valid = {k: v for k, v in fields.items() if k not in invalid}
+    problems = "\n".join(f"- {'.'.join(map(str, e['loc'])) or 'response'}: {e['msg']}" for e in errors)
+    prompt = (
+        f"Original instructions:\n{system_prompt.strip()}\n\n"
+        f"Original input:\n{user_prompt}\n\n"
+        f"JSON schema:\n{json.dumps(model.model_json_schema())}\n\n"
+        f"Already valid fields:\n{json.dumps(valid)}\n\n"
+        f"Errors:\n{problems}"
+    )
+    if invalid & fields.keys():
+        prompt += f"\n\nInvalid values:\n{json.dumps({k: fields[k] for k in invalid if k in fields})}"
+    if not fields:
+        # Nothing parsed: the model may have answered in prose
+        prompt += f"\n\nUnparsed response:\n{text[:2000]}"
+
+    # Partial output, so plain JSON mode rather than the model's schema
+    repair_format = {"type": "json_object"} if LLM_STRUCTURED_OUTPUT != "off" else None
+    try:
+        patch = parse_json_safely(call_llm(REPAIR_SYSTEM_PROMPT, prompt, cache=cache, response_format=repair_format))
+    except (ValueError, RuntimeError):
+        return None
+    instance, _ = _validate(model, {**valid, **patch})
+    return instance
+
+def call_structured(system_prompt: str, user_prompt: str, model: type[BaseModel], on_partial=None,
+                    cache: bool = False) -> BaseModel:
+    """
+    Calls the LLM in JSON mode and validates the response against `model`.
+
+    The response is parsed in a single incremental pass; with on_partial,
+    it is streamed and on_partial(fields) is called as each top-level field
+    completes. A response that is not valid JSON or does not match the model
+    gets one repair call for just the failing fields before giving up with
+    a ValueError. cache is passed to the LLM client (see call_llm).
+    """
+    start = time.perf_counter()
+    fmt = response_format(model)
+    parser = IncrementalJSONParser()
+    if on_partial is None:
+        parser.feed(call_llm(system_prompt, user_prompt, cache=cache, response_format=fmt))
+    else:
+        for delta in stream_llm(system_prompt, user_prompt, cache=cache, response_format=fmt):
+            if parser.feed(delta):
+                on_partial(dict(parser.fields))
+
+    instance, errors = _validate(model, parser.fields)
+    repaired = False
+    if instance is None:
+        instance = _repair(system_prompt, user_prompt, model, parser.fields, errors, parser.text, cache)
+        repaired = instance is not None
+
+    _count(invalid=bool(errors), repaired=repaired, failed=instance is None)
+    tracing.record("llm.structured", (time.perf_counter() - start) * 1000, schema=model.__name__,
+                   valid=not errors, repaired=repaired)
+    if instance is None:
+        raise ValueError(f"Could not parse {model.__name__} JSON from text: {parser.text[:100]}...")
+    return instance
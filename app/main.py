@@ -1,29 +1,175 @@
 import sys
 import os
+import argparse
+import threading
+from concurrent.futures import wait
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 from rich.markdown import Markdown
+from rich.live import Live
+from rich.spinner import Spinner
+from rich.text import Text
+from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn
 
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.storage.database import init_db
-from app.interfaces.cli import display_welcome, display_menu, display_idea_framing, display_evaluation, console
-from app.workflows.ideation import frame_idea, conduct_research, save_structured_idea
-from app.workflows.evaluation import evaluate_idea
-from app.interfaces.voice import transcribe_audio
+from app.interfaces.cli import (
+    display_welcome, display_menu, display_idea_framing, display_evaluation,
+    display_batch_report, display_search_results, display_stats, display_portfolio, display_cluster_report,
+    display_profiles, display_profile_comparison, display_rescore_report, console
+)
+from app.config.settings import (
+    LLM_MAX_CONCURRENCY, WHISPER_PRELOAD, TRANSCRIBE_STREAM_MIN_SECONDS, SERVER_HOST, SERVER_PORT,
+    CLUSTER_COUNT, DUPLICATE_MIN_SIMILARITY
+)
+from app.utils import tracing
+
+# The storage and workflow stack (SQLAlchemy, NumPy, the indexes) is slow to
+# import, so it loads in a background thread while the menu is on screen.
+# Heavy optional deps (openai, ddgs, whisper) load on first use only.
+_backend = None
+_backend_error = None
+
+def _load_backend():
+    global _backend_error
+    try:
+        from app.storage.database import init_db
+        import app.workflows.ideation
+        import app.workflows.evaluation
+        import app.storage.search
+        init_db()
+    except Exception as e:
+        _backend_error = e
+
+def start_backend():
+    global _backend
+    if _backend is None:
+        _backend = threading.Thread(target=_load_backend, name="startup", daemon=True)
+        _backend.start()
+
+def wait_for_backend():
+    """
+    Blocks until the background startup has finished; re-raises its error.
+    """
+    start_backend()
+    _backend.join()
+    if _backend_error is not None:
+        raise _backend_error
+
+@tracing.traced("voice.transcribe")
+def transcribe_file(file_path: str) -> str:
+    """
+    Transcribes an audio file; long recordings, and those whose length
+    ffprobe cannot tell, are streamed segment by segment with a progress bar
+    instead of one blocking call, so they are never decoded whole.
+    """
+    from app.interfaces.audio import ffmpeg_available, probe_duration
+    from app.interfaces.voice import start_worker, transcribe_audio_async, transcribe_stream
+
+    duration = probe_duration(file_path)
+    # Streaming decodes with ffmpeg; without it the file goes to Whisper as is
+    stream = duration >= TRANSCRIBE_STREAM_MIN_SECONDS if duration is not None else ffmpeg_available()
+    if not stream:
+        future = transcribe_audio_async(file_path)
+        if future.done():
+            # Transcribed before: served from the transcript cache
+            return future.result()
+        worker = start_worker()
+        status = "Transcribing..." if worker.ready.is_set() else f"Loading Whisper model ({worker.model_size}) and transcribing..."
+        with console.status(f"[dim]{status}[/dim]"):
+            return future.result()
+
+    texts = []
+    columns = [SpinnerColumn(), TextColumn("[dim]Transcribing[/dim]"), BarColumn(), TimeRemainingColumn()]
+    with Progress(*columns, console=console) as progress:
+        # An unknown duration shows an indeterminate bar
+        task = progress.add_task("transcribe", total=duration)
+        for segment in transcribe_stream(file_path):
+            if segment["text"]:
+                texts.append(segment["text"])
+                progress.console.print(f"[dim][{segment['start']:.0f}s] {segment['text']}[/dim]")
+            progress.update(task, completed=segment["end"])
+        if duration is not None:
+            progress.update(task, completed=duration)
+    return " ".join(texts)
+
+SEARCH_PAGE_SIZE = 10
+
+def search_menu():
+    query = Prompt.ask("\n[bold]Search past ideas[/bold]")
+    if not query.strip():
+        return
+
+    wait_for_backend()
+    from app.storage.search import search_ideas
+
+    page = 0
+    while True:
+        # Fetch one extra row to know whether there is a next page
+        results = search_ideas(query, limit=SEARCH_PAGE_SIZE + 1, offset=page * SEARCH_PAGE_SIZE)
+        has_next = len(results) > SEARCH_PAGE_SIZE
+        if not results:
+            console.print("[yellow]No matching ideas.[/yellow]")
+            return
+
+        display_search_results(results[:SEARCH_PAGE_SIZE], query, page + 1)
+
+        choices = ["q"]
+        if has_next:
+            choices.append("n")
+        if page > 0:
+            choices.append("p")
+        nav = Prompt.ask("[dim]n = next, p = previous, q = back to menu[/dim]", choices=choices, default="q")
+        if nav == "n":
+            page += 1
+        elif nav == "p":
+            page -= 1
+        else:
+            return
+
+def show_portfolio(top: int = 10, verdict: str = None, period: str = "week"):
+    wait_for_backend()
+    from app.storage.portfolio import top_ideas, score_distribution, score_trend
+
+    display_portfolio(
+        top_ideas(top, verdict=verdict),
+        score_distribution(verdict=verdict),
+        score_trend(period, verdict=verdict),
+        verdict=verdict
+    )
 
 def main():
-    init_db()
+    start_backend()
+    if WHISPER_PRELOAD:
+        from app.interfaces.voice import whisper_available, start_worker
+        if whisper_available():
+            # Warm the Whisper model in its own process while the menu is used
+            start_worker()
     display_welcome()
     
     while True:
         display_menu()
-        choice = Prompt.ask("Choose", choices=["1", "2", "3"], default="1")
+        choice = Prompt.ask("Choose", choices=["1", "2", "3", "4", "5"], default="1")
         
-        if choice == "3":
+        if choice == "5":
             console.print("[bold]Goodbye![/bold]")
             break
+
+        if choice == "3":
+            search_menu()
+            continue
+
+        if choice == "4":
+            show_portfolio()
+            continue
+
+        wait_for_backend()
+        from app.workflows.ideation import (
+            frame_idea, conduct_research, structure_idea, save_structured_idea, RefinementHistory
+        )
+        from app.workflows.evaluation import score_idea, evaluate_idea
+        from app.workflows.pipeline import Speculation
             
         raw_input = ""
         source = "text"
@@ -51,8 +197,7 @@ def main():
                 continue
                 
             try:
-                console.print("[dim]Transcribing...[/dim]")
-                raw_input = transcribe_audio(file_path)
+                raw_input = transcribe_file(file_path)
                 console.print(f"[dim]Transcribed: {raw_input}[/dim]")
                 source = "voice"
             except Exception as e:
@@ -64,86 +209,278 @@ def main():
             continue
 
         # --- Deep Researcher Flow ---
-        try:
-            # Step 1: Framing & Confirmation Loop
-            current_context = raw_input
-            framed_data = None
+        # Later steps start in the background while the user is still reading
+        # and deciding; they are cancelled if the user refines or drops the idea.
+        speculation = Speculation()
+        with tracing.span("idea", source=source) as trace:
+            try:
+                # Step 1: Framing & Confirmation Loop
+                history = RefinementHistory(raw_input)
+                current_context = history.text()
+                framed_data = None
             
-            while True:
-                with console.status("[bold cyan]Deep Researcher: Framing your idea...[/bold cyan]"):
-                    framed_data = frame_idea(current_context)
-                
-                console.print("\n[bold cyan]--- Interpretation ---[/bold cyan]")
-                console.print(f"[italic]{framed_data.get('restatement')}[/italic]")
-                console.print(f"\n[bold yellow]Agent asks:[/bold yellow] {framed_data.get('confirmation_question')}")
+                while True:
+                    console.print("\n[bold cyan]--- Interpretation ---[/bold cyan]")
+                    # Stream the framing; the restatement shows as soon as it is complete
+                    spinner = Spinner("dots", text="[bold cyan]Deep Researcher: Framing your idea...[/bold cyan]")
+                    with Live(spinner, console=console, refresh_per_second=12) as live:
+                        def show_restatement(fields):
+                            if "restatement" in fields:
+                                live.update(Text(str(fields["restatement"]), style="italic"))
+                        framed_data = frame_idea(current_context, on_partial=show_restatement)
+                        live.update(Text(str(framed_data.get('restatement')), style="italic"))
+
+                    speculation.start_streaming("research", conduct_research, framed_data.get('restatement', current_context))
+                    speculation.start("structure", structure_idea, raw_input)
+
+                    console.print(f"\n[bold yellow]Agent asks:[/bold yellow] {framed_data.get('confirmation_question')}")
                 
-                # Custom loop for Yes/No/Exit
-                console.print("\n[bold]Is this what you meant?[/bold]")
-                console.print("1. [green]Yes, proceed[/green]")
-                console.print("2. [yellow]No, let me refine it[/yellow]")
-                console.print("3. [red]Trash idea and exit[/red]")
+                    # Custom loop for Yes/No/Exit
+                    console.print("\n[bold]Is this what you meant?[/bold]")
+                    console.print("1. [green]Yes, proceed[/green]")
+                    console.print("2. [yellow]No, let me refine it[/yellow]")
+                    console.print("3. [red]Trash idea and exit[/red]")
                 
-                conf_choice = Prompt.ask("Choose", choices=["1", "2", "3"], default="1")
+                    conf_choice = Prompt.ask("Choose", choices=["1", "2", "3"], default="1")
                 
-                if conf_choice == "1":
-                    break # Proceed to research
-                elif conf_choice == "3":
-                    console.print("[dim]Idea trashed.[/dim]")
-                    framed_data = None # Signal to skip rest
-                    break 
-                elif conf_choice == "2":
-                    refinement = Prompt.ask("\n[bold]What details would you like to add or clarify?[/bold]")
-                    if refinement.lower() == 'exit':
+                    if conf_choice == "1":
+                        break # Proceed to research
+
+                    speculation.cancel()
+                    if conf_choice == "3":
                         console.print("[dim]Idea trashed.[/dim]")
-                        framed_data = None
-                        break
-                    # Append refinement to context to keep history
-                    current_context += f"\nUser Clarification: {refinement}"
-                    continue # Loop back to framing
-
-            if not framed_data:
-                continue # Go back to main menu if trashed
-
-            # Step 2: Research
-            console.print("\n[bold blue]Checking History & Web...[/bold blue]")
-            with console.status("[bold blue]Deep Researcher: Scanning for duplicates...[/bold blue]"):
-                research_report = conduct_research(framed_data.get('restatement', current_context))
-            
-            console.print(Panel(Markdown(research_report), title="Research Verification", border_style="blue"))
+                        framed_data = None # Signal to skip rest
+                        break 
+                    elif conf_choice == "2":
+                        refinement = Prompt.ask("\n[bold]What details would you like to add or clarify?[/bold]")
+                        if refinement.lower() == 'exit':
+                            console.print("[dim]Idea trashed.[/dim]")
+                            framed_data = None
+                            break
+                        # Keep the history, summarising older clarifications once it grows long
+                        with console.status("[dim]Updating context...[/dim]"):
+                            history.add(refinement)
+                        current_context = history.text()
+                        continue # Loop back to framing
+
+                if not framed_data:
+                    continue # Go back to main menu if trashed
+
+                # Step 2: Research
+                console.print("\n[bold blue]Checking History & Web...[/bold blue]")
+                spinner = Spinner("dots", text="[bold blue]Deep Researcher: Scanning for duplicates...[/bold blue]")
+                with Live(spinner, console=console, refresh_per_second=12) as live:
+                    def show_report(text):
+                        live.update(Panel(Markdown(text), title="Research Verification", border_style="blue"))
+                    # Usually already finished (or streaming) by the time the user confirms
+                    research = speculation.future("research")
+                    while not research.done():
+                        if speculation.progress("research"):
+                            show_report(speculation.progress("research"))
+                        wait([research], timeout=0.1)
+                    research_report = speculation.result("research", conduct_research, framed_data.get('restatement', current_context))
+                    show_report(research_report)
             
-            # Step 3: Decision
-            console.print("\n[bold]How do you want to proceed?[/bold]")
-            console.print("1. [green]Pursue & structure this idea[/green]")
-            console.print("2. [yellow]Edit/Refine based on research[/yellow]")
-            console.print("3. [red]Drop idea[/red]")
+                # Step 3: Decision
+                console.print("\n[bold]How do you want to proceed?[/bold]")
+                console.print("1. [green]Pursue & structure this idea[/green]")
+                console.print("2. [yellow]Edit/Refine based on research[/yellow]")
+                console.print("3. [red]Drop idea[/red]")
             
-            decision = Prompt.ask("Choose", choices=["1", "2", "3"], default="1")
+                decision = Prompt.ask("Choose", choices=["1", "2", "3"], default="1")
             
-            if decision == "3":
-                console.print("[dim]Idea dropped.[/dim]")
-                continue
-            elif decision == "2":
-                console.print("[yellow]Please re-enter your refined idea:[/yellow]")
-                # In a fancier version we'd maintain context, but keeping it simple for CLI loop
-                continue
+                if decision != "1":
+                    speculation.cancel()
+                if decision == "3":
+                    console.print("[dim]Idea dropped.[/dim]")
+                    continue
+                elif decision == "2":
+                    console.print("[yellow]Please re-enter your refined idea:[/yellow]")
+                    # In a fancier version we'd maintain context, but keeping it simple for CLI loop
+                    continue
 
-            # Step 4: Structuring & Saving
-            with console.status("[bold green]Structuring & Saving...[/bold green]"):
-                idea_obj = save_structured_idea(raw_input, source)
+                # Step 4: Structuring & Saving
+                with console.status("[bold green]Structuring & Saving...[/bold green]"):
+                    structured = speculation.result("structure", structure_idea, raw_input)
+                    idea_obj = save_structured_idea(raw_input, source, research_report, structured=structured)
+                trace.set(idea_id=idea_obj.id)
             
-            display_idea_framing(idea_obj)
+                # Score while the user reads the structured idea
+                speculation.start("evaluate", score_idea, idea_obj)
+                display_idea_framing(idea_obj)
             
-            # Workflow B: Evaluation
-            if Confirm.ask("\nEvaluate this idea?"):
-                with console.status("[bold magenta]Evaluating feasibility & market fit...[/bold magenta]"):
-                    eval_obj = evaluate_idea(idea_obj)
+                # Workflow B: Evaluation
+                if Confirm.ask("\nEvaluate this idea?"):
+                    with console.status("[bold magenta]Evaluating feasibility & market fit...[/bold magenta]"):
+                        scores = speculation.result("evaluate", score_idea, idea_obj)
+                        eval_obj = evaluate_idea(idea_obj, scores=scores)
                 
-                display_evaluation(eval_obj)
+                    display_evaluation(eval_obj)
+                else:
+                    speculation.cancel()
                 
-        except Exception as e:
-            console.print(f"[bold red]An error occurred: {e}[/bold red]")
-            # In debug mode check traceback
-            # import traceback; traceback.print_exc()
+            except Exception as e:
+                speculation.cancel()
+                console.print(f"[bold red]An error occurred: {e}[/bold red]")
+                # In debug mode check traceback
+                # import traceback; traceback.print_exc()
+
+def run_batch_command(args):
+    from app.storage.database import init_db
+    from app.workflows.batch import run_batch
+
+    init_db()
+    with console.status("[bold green]Batch: starting...[/bold green]") as status:
+        def show_progress(report):
+            status.update(
+                f"[bold green]Batch: {report['processed']} done, {report['failed']} failed "
+                f"({report['ideas_per_minute']} ideas/min)[/bold green]"
+            )
+        report = run_batch(
+            args.path,
+            concurrency=args.concurrency,
+            evaluate=not args.no_evaluate,
+            on_progress=show_progress
+        )
+    display_batch_report(report)
+    if report["failed"]:
+        console.print(f"[yellow]Failed rows are logged in {args.path}.errors.jsonl; rerun to retry them.[/yellow]")
+
+def run_cluster_command(args):
+    from app.storage.database import init_db
+    from app.context.clustering import cluster_ideas, largest_clusters
+
+    init_db()
+    with console.status("[bold green]Clustering...[/bold green]") as status:
+        report = cluster_ideas(
+            n_clusters=args.clusters,
+            min_similarity=args.min_similarity,
+            on_progress=lambda stage: status.update(f"[bold green]Clustering: {stage}...[/bold green]")
+        )
+    display_cluster_report(report, largest_clusters(args.show))
+
+def _profile_spec(spec: str):
+    """
+    "name" (latest version) or "name:version".
+    """
+    from app.workflows.scoring import get_profile
+
+    name, _, version = spec.partition(":")
+    if version and not version.isdigit():
+        raise ValueError(f"Invalid profile version in {spec!r}")
+    return get_profile(name, int(version) if version else None)
+
+def run_profile_command(args):
+    from app.storage.database import init_db
+    from app.workflows import scoring
+
+    init_db()
+    try:
+        if args.action == "list":
+            display_profiles(scoring.list_profiles())
+        elif args.action == "create":
+            base = _profile_spec(args.base) if args.base else scoring.get_active_profile()
+            weights = scoring.weights_of(base)
+            for item in args.weight or []:
+                key, _, value = item.partition("=")
+                try:
+                    weights[key.strip()] = float(value)
+                except ValueError:
+                    raise ValueError(f"Invalid weight {item!r}; use name=value")
+            thresholds = scoring.thresholds_of(base)
+            if args.llm_verdict:
+                thresholds = None
+            elif args.pursue is not None or args.refine is not None:
+                thresholds = {"pursue": args.pursue, "refine": args.refine}
+                if None in thresholds.values():
+                    raise ValueError("Give both --pursue and --refine")
+            profile = scoring.create_profile(args.name, weights, thresholds)
+            console.print(f"[green]Created {scoring.describe(profile)}.[/green] Compare it with "
+                          f"'profile compare {profile.name}', then 'profile apply {profile.name}' to use it.")
+        elif args.action == "compare":
+            base = _profile_spec(args.against) if args.against else scoring.get_active_profile()
+            display_profile_comparison(scoring.compare_profiles(base, _profile_spec(args.profile), top=args.top))
+        elif args.action == "apply":
+            profile = _profile_spec(args.profile)
+            with console.status(f"[bold green]Re-scoring with {scoring.describe(profile)}...[/bold green]") as status:
+                report = scoring.apply_profile(
+                    profile,
+                    on_progress=lambda done, total: status.update(f"[bold green]Re-scoring: {done}/{total} written[/bold green]")
+                )
+            display_rescore_report(report)
+    except (ValueError, LookupError) as e:
+        console.print(f"[red]{e}[/red]")
+
+def run_stats_command(args):
+    import time
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    display_stats(tracing.summarize(tracing.load_spans(since=since)))
+
+def run_serve_command(args):
+    from app.interfaces.server import run_server
+
+    run_server(args.host, args.port)
+
+def cli():
+    parser = argparse.ArgumentParser(prog="execmind", description="CEO Ideation & Evaluation System")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Frame, structure and evaluate ideas from a CSV/JSONL file")
+    batch_parser.add_argument("path", help="CSV (with an 'idea' column) or JSONL file")
+    batch_parser.add_argument("--concurrency", type=int, default=LLM_MAX_CONCURRENCY, help="Ideas processed at once")
+    batch_parser.add_argument("--no-evaluate", action="store_true", help="Skip the evaluation step")
+
+    portfolio_parser = subparsers.add_parser("portfolio", help="Top ideas, score distribution and trend")
+    portfolio_parser.add_argument("--top", type=int, default=10, help="Number of top ideas to list")
+    portfolio_parser.add_argument("--verdict", choices=["pursue", "refine", "drop"], help="Only ideas with this verdict")
+    portfolio_parser.add_argument("--period", choices=["day", "week", "month"], default="week", help="Trend bucket size")
+
+    cluster_parser = subparsers.add_parser("cluster", help="Cluster all ideas and link near-duplicates")
+    cluster_parser.add_argument("--clusters", type=int, default=CLUSTER_COUNT, help="Number of clusters (0 = automatic)")
+    cluster_parser.add_argument("--min-similarity", type=float, default=DUPLICATE_MIN_SIMILARITY,
+                                help="Cosine similarity at which ideas are linked as near-duplicates")
+    cluster_parser.add_argument("--show", type=int, default=10, help="Number of largest clusters to list")
+
+    profile_parser = subparsers.add_parser("profile", help="Scoring profiles: create, compare (what-if) and apply")
+    profile_actions = profile_parser.add_subparsers(dest="action", required=True)
+    profile_actions.add_parser("list", help="List profiles and their versions")
+    create_parser = profile_actions.add_parser("create", help="Save a new profile version")
+    create_parser.add_argument("name")
+    create_parser.add_argument("--from", dest="base", help="Profile to start from (name or name:version; default: active)")
+    create_parser.add_argument("--weight", action="append", help="Sub-score weight, e.g. --weight market_value=0.4")
+    create_parser.add_argument("--pursue", type=float, help="Minimum score for a 'pursue' verdict")
+    create_parser.add_argument("--refine", type=float, help="Minimum score for a 'refine' verdict")
+    create_parser.add_argument("--llm-verdict", action="store_true", help="Keep the LLM's verdict instead of thresholds")
+    compare_parser = profile_actions.add_parser("compare", help="What-if comparison, without changing any scores")
+    compare_parser.add_argument("profile", help="name or name:version")
+    compare_parser.add_argument("--against", help="Profile to compare with (default: active)")
+    compare_parser.add_argument("--top", type=int, default=10, help="Size of the top list compared")
+    apply_parser = profile_actions.add_parser("apply", help="Re-score every evaluation and make the profile active")
+    apply_parser.add_argument("profile", help="name or name:version")
+
+    stats_parser = subparsers.add_parser("stats", help="Latency per stage and LLM cost per idea, from recorded traces")
+    stats_parser.add_argument("--since-hours", type=float, default=None, help="Only include the last N hours")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve ideation and evaluation over an HTTP API")
+    serve_parser.add_argument("--host", default=SERVER_HOST, help="Address to bind")
+    serve_parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on")
+
+    args = parser.parse_args()
+    if args.command == "batch":
+        run_batch_command(args)
+    elif args.command == "stats":
+        run_stats_command(args)
+    elif args.command == "profile":
+        run_profile_command(args)
+    elif args.command == "cluster":
+        run_cluster_command(args)
+    elif args.command == "serve":
+        run_serve_command(args)
+    elif args.command == "portfolio":
+        show_portfolio(args.top, verdict=args.verdict, period=args.period)
+    else:
+        main()
 
 if __name__ == "__main__":
-    main()
+    cli()
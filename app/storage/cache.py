@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def make_key(*parts) -> str:
+    """
+    Content-addressed cache key: SHA-256 over the JSON encoding of the parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class DiskCache:
+    """
+    Persistent string cache backed by its own SQLite file.
+
+    Entries expire after `ttl_seconds` (0 disables expiry) and the least
+    recently used entries are evicted once more than `max_entries` are
+    stored. A small in-memory LRU sits in front of the file so repeated
+    lookups within a process never touch SQLite; their access times are
+    written back in batches, so eviction still sees them as recently used.
+    """
+
+    MEMORY_ENTRIES = 256
+    TOUCH_BATCH = 64
+
+    def __init__(self, path: str, ttl_seconds: float = 0, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._touched = {} # key -> last memory hit not yet written to the file
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_last_access ON cache (last_access)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str):
+        """
+        Returns the cached value, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                if len(self._touched) >= self.TOUCH_BATCH:
+                    self._flush_touched()
+                self.hits += 1
+                return entry[0]
+
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._count -= 1
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0], row[1])
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if cursor.rowcount:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE cache SET value = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (value, now, now, key)
+                )
+            self._remember(key, value, now)
+            self._touched.pop(key, None)
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _remember(self, key: str, value: str, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE cache SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        # Pending memory hits count as accesses, or hot entries would be evicted first
+        self._flush_touched()
+        # Evict down to 90% of capacity so eviction runs once per batch of inserts
+        excess = self._count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access LIMIT ?)",
+            (excess,)
+        )
+        self._count -= excess
+        self.evictions += excess
+        self._memory.clear()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._count = 0
+            self._memory.clear()
+            self._touched.clear()
+
+    def flush(self):
+        """
+        Writes pending access times to the file.
+        """
+        with self._lock:
+            self._flush_touched()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self._count,
+        }
@@ -1,10 +1,37 @@
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Float
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from sqlalchemy import (
+    create_engine, event, insert, Column, Integer, String, Text, DateTime, ForeignKey, Float, LargeBinary, Boolean,
+    UniqueConstraint, text
+)
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship, Session
 
-DATABASE_URL = "sqlite:///execmind.db"
+from app.config.settings import DATABASE_URL, BATCH_COMMIT_SIZE, BATCH_COMMIT_DELAY_SECONDS
+from app.utils import tracing
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers run alongside the single writer and, with
+    # synchronous=NORMAL, commits no longer fsync the main database file
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Memory-map the database file so index lookups (e.g. context_chunk_terms)
+    # are served from the page cache instead of read() calls
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536") # 64 MiB page cache per connection
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -21,6 +48,7 @@ class Idea(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     evaluations = relationship("Evaluation", back_populates="idea")
+    research_reports = relationship("ResearchReport", back_populates="idea")
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
@@ -36,11 +64,263 @@ class Evaluation(Base):
     verdict = Column(String) # 'pursue', 'refine', 'drop'
     summary = Column(Text)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # The verdict as given by the LLM, and the scoring profile that computed final_score/verdict
+    llm_verdict = Column(String)
+    profile_id = Column(Integer, ForeignKey("scoring_profiles.id"), nullable=True)
 
     idea = relationship("Idea", back_populates="evaluations")
 
+class ScoringProfile(Base):
+    """
+    A versioned formula turning an evaluation's sub-scores into its final
+    score and verdict (see app.workflows.scoring). weights is a JSON object
+    over the sub-scores; thresholds, if set, is a JSON object with the
+    minimum "pursue" and "refine" scores, otherwise the LLM's verdict is kept.
+    """
+    __tablename__ = "scoring_profiles"
+    __table_args__ = (UniqueConstraint("name", "version"),)
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    weights = Column(Text, nullable=False)
+    thresholds = Column(Text, nullable=True)
+    active = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ResearchReport(Base):
+    __tablename__ = "research_reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    idea_id = Column(Integer, ForeignKey("ideas.id"))
+    report = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    idea = relationship("Idea", back_populates="research_reports")
+
+class ContextChunk(Base):
+    __tablename__ = "context_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_type = Column(String, nullable=False, index=True) # 'idea', 'research', 'evaluation'
+    source_id = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ContextChunkTerm(Base):
+    """
+    Inverted index posting: one row per (term, chunk) with the term frequency.
+    """
+    __tablename__ = "context_chunk_terms"
+
+    term = Column(String, primary_key=True)
+    chunk_id = Column(Integer, ForeignKey("context_chunks.id"), primary_key=True)
+    tf = Column(Integer, nullable=False)
+
+class IdeaCluster(Base):
+    """
+    A cluster of similar ideas: its unit-length centroid (float32 bytes),
+    member count and the member closest to the centroid.
+    """
+    __tablename__ = "idea_clusters"
+
+    id = Column(Integer, primary_key=True)
+    centroid = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False, default=0)
+    representative_idea_id = Column(Integer, ForeignKey("ideas.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class IdeaClusterMember(Base):
+    __tablename__ = "idea_cluster_members"
+
+    idea_id = Column(Integer, ForeignKey("ideas.id"), primary_key=True)
+    cluster_id = Column(Integer, ForeignKey("idea_clusters.id"), nullable=False, index=True)
+    similarity = Column(Float, nullable=False) # cosine similarity to the centroid
+
+class IdeaDuplicate(Base):
+    """
+    Near-duplicate link from an idea to its most similar earlier idea.
+    canonical_id is the earliest idea of the chain, so a duplicate group
+    is every idea sharing a canonical_id (plus the canonical idea itself).
+    """
+    __tablename__ = "idea_duplicates"
+
+    idea_id = Column(Integer, ForeignKey("ideas.id"), primary_key=True)
+    duplicate_of = Column(Integer, ForeignKey("ideas.id"), nullable=False)
+    canonical_id = Column(Integer, ForeignKey("ideas.id"), nullable=False, index=True)
+    similarity = Column(Float, nullable=False)
+
+class Transcript(Base):
+    """
+    Cached transcription of an audio file, keyed by a SHA-256 of its bytes
+    and the Whisper model size. segments is a JSON list of {"start", "end",
+    "text"} for recordings that were streamed, so they can be replayed.
+    """
+    __tablename__ = "transcripts"
+    __table_args__ = (UniqueConstraint("audio_hash", "model_size"),)
+
+    id = Column(Integer, primary_key=True)
+    audio_hash = Column(String(64), nullable=False)
+    model_size = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    segments = Column(Text, nullable=True)
+    audio_seconds = Column(Float, nullable=True) # before silence trimming
+    speech_seconds = Column(Float, nullable=True) # after
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Serves the retrieval sync's per-source anti-join; created here so
+        # databases made before it get it too
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_context_chunks_source ON context_chunks (source_type, source_id)"
+        ))
+        # Postings are keyed by term; removing a document's chunks looks them up by chunk
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_context_chunk_terms_chunk ON context_chunk_terms (chunk_id)"))
+
+    from app.storage.search import init_search_index
+    from app.storage.portfolio import init_portfolio
+    from app.workflows.scoring import init_scoring
+    init_search_index()
+    init_portfolio()
+    init_scoring()
+
+@contextmanager
+def unit_of_work():
+    """
+    Session scope that commits once on success and rolls back on error.
+    Pass the session to the workflow save functions (db=...) to group
+    several writes into a single transaction.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        with tracing.span("storage.commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class GroupCommitter:
+    """
+    Commits writes from many threads in shared transactions, so a batch of
+    ideas pays one commit (and WAL sync) per group instead of one per idea.
+
+    submit(fn) queues fn(db) and returns a Future for its result, resolved
+    once its transaction commits. A writer thread takes up to `max_batch`
+    queued writes, waiting at most `max_delay` seconds for more after the
+    first. If a group fails, it is rolled back and each write is retried in
+    its own transaction, so only the failing write's Future raises; fn must
+    therefore be safe to run again.
+    """
+
+    def __init__(self, max_batch: int = BATCH_COMMIT_SIZE, max_delay: float = BATCH_COMMIT_DELAY_SECONDS):
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.commits = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn) -> Future:
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def close(self):
+        """
+        Commits everything already submitted, then stops the writer.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_group(self) -> tuple:
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        group = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return group, True
+            group.append(item)
+        return group, False
+
+    def _run(self):
+        closed = False
+        while not closed:
+            group, closed = self._next_group()
+            if group:
+                self._commit(group)
+
+    def _commit(self, group: list):
+        try:
+            with tracing.span("storage.group_commit", writes=len(group)):
+                with unit_of_work() as db:
+                    results = [fn(db) for fn, _ in group]
+        except Exception as e:
+            if len(group) == 1:
+                group[0][1].set_exception(e)
+            else:
+                for item in group:
+                    self._commit([item])
+            return
+        self.commits += 1
+        for (_, future), result in zip(group, results):
+            future.set_result(result)
+
+def on_commit(db: Session, fn):
+    """
+    Runs fn() once db's transaction commits, or straight away if db is None.
+    Dropped if the transaction rolls back. For in-memory state and sidecar
+    files that must only ever describe committed rows: SQLite reuses the
+    rowids of rolled-back inserts.
+    """
+    if db is None:
+        fn()
+        return
+    db.info.setdefault("on_commit", []).append(fn)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _run_on_commit(session):
+    for fn in session.info.pop("on_commit", []):
+        fn()
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _drop_on_commit(session, previous_transaction):
+    session.info.pop("on_commit", None)
+
+@tracing.traced("storage.bulk_insert")
+def bulk_insert(db: Session, model, rows: list, batch_size: int = 5000, return_ids: bool = False) -> list:
+    """
+    Inserts plain dict rows with executemany, committing every batch_size rows.
+    Returns the new primary keys in input order when return_ids is set.
+    Bypasses ORM events and the workflow save functions: the full-text index
+    is kept by triggers, but the idea vectors and retrieval chunks only cover
+    these rows once app.context.provider.sync_idea_index and
+    app.context.retrieval.sync_context_index run (retrieval syncs by itself
+    once per process, on first use). Call them after a bulk insert that must
+    be searchable straight away. The batch command writes through
+    GroupCommitter instead.
+    """
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if return_ids:
+            stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+            ids.extend(db.scalars(stmt, batch).all())
+        else:
+            db.execute(insert(model), batch)
+        db.commit()
+    return ids
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,246 @@
+import numpy as np
+from sqlalchemy import text
+
+from app.storage.database import engine, SessionLocal, Idea
+from app.utils.tracing import traced
+
+# latest_evaluations keeps one row per evaluated idea (its newest evaluation),
+# maintained by triggers, so portfolio queries never scan or group the full
+# evaluations history. created_at is stored as Unix seconds.
+#
+# On top of it, score_buckets (count and score sum per verdict and 0.1-wide
+# score bucket) and score_days (count and score sum per verdict and day) are kept up to
+# date by triggers, so distributions and trends read a few hundred rows
+# whatever the number of evaluations.
+PORTFOLIO_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_evaluations_idea_created ON evaluations (idea_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_evaluations_final_score ON evaluations (final_score)",
+    """
+    CREATE TABLE IF NOT EXISTS latest_evaluations (
+        idea_id INTEGER PRIMARY KEY,
+        evaluation_id INTEGER NOT NULL,
+        final_score REAL,
+        verdict TEXT,
+        created_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_latest_evaluations_score ON latest_evaluations (final_score)",
+    "CREATE INDEX IF NOT EXISTS ix_latest_evaluations_verdict_score ON latest_evaluations (verdict, final_score)",
+    """
+    CREATE TRIGGER IF NOT EXISTS evaluations_latest_ai AFTER INSERT ON evaluations BEGIN
+        INSERT INTO latest_evaluations (idea_id, evaluation_id, final_score, verdict, created_at)
+        VALUES (new.idea_id, new.id, new.final_score, new.verdict,
+                (julianday(new.created_at) - 2440587.5) * 86400.0)
+        ON CONFLICT (idea_id) DO UPDATE SET
+            evaluation_id = excluded.evaluation_id,
+            final_score = excluded.final_score,
+            verdict = excluded.verdict,
+            created_at = excluded.created_at
+        WHERE excluded.evaluation_id > latest_evaluations.evaluation_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS evaluations_latest_au AFTER UPDATE OF final_score, verdict ON evaluations BEGIN
+        UPDATE latest_evaluations SET final_score = new.final_score, verdict = new.verdict
+        WHERE idea_id = new.idea_id AND evaluation_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS evaluations_latest_ad AFTER DELETE ON evaluations BEGIN
+        DELETE FROM latest_evaluations WHERE evaluation_id = old.id;
+        INSERT OR IGNORE INTO latest_evaluations (idea_id, evaluation_id, final_score, verdict, created_at)
+        SELECT idea_id, id, final_score, verdict, (julianday(created_at) - 2440587.5) * 86400.0
+        FROM evaluations WHERE idea_id = old.idea_id ORDER BY id DESC LIMIT 1;
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS score_buckets (
+        verdict TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        PRIMARY KEY (verdict, bucket)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS score_days (
+        verdict TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        PRIMARY KEY (verdict, day)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS latest_aggregates_ai AFTER INSERT ON latest_evaluations
+    WHEN new.final_score IS NOT NULL BEGIN
+        INSERT INTO score_buckets VALUES (coalesce(new.verdict, ''), CAST(round(new.final_score * 10) AS INTEGER), 1, new.final_score)
+        ON CONFLICT (verdict, bucket) DO UPDATE SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+        INSERT INTO score_days VALUES (coalesce(new.verdict, ''), CAST(new.created_at / 86400 AS INTEGER), 1, new.final_score)
+        ON CONFLICT (verdict, day) DO UPDATE SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS latest_aggregates_ad_old AFTER DELETE ON latest_evaluations
+    WHEN old.final_score IS NOT NULL BEGIN
+        UPDATE score_buckets SET count = count - 1, score_sum = score_sum - old.final_score
+        WHERE verdict = coalesce(old.verdict, '') AND bucket = CAST(round(old.final_score * 10) AS INTEGER);
+        UPDATE score_days SET count = count - 1, score_sum = score_sum - old.final_score
+        WHERE verdict = coalesce(old.verdict, '') AND day = CAST(old.created_at / 86400 AS INTEGER);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS latest_aggregates_au_old AFTER UPDATE ON latest_evaluations
+    WHEN old.final_score IS NOT NULL BEGIN
+        UPDATE score_buckets SET count = count - 1, score_sum = score_sum - old.final_score
+        WHERE verdict = coalesce(old.verdict, '') AND bucket = CAST(round(old.final_score * 10) AS INTEGER);
+        UPDATE score_days SET count = count - 1, score_sum = score_sum - old.final_score
+        WHERE verdict = coalesce(old.verdict, '') AND day = CAST(old.created_at / 86400 AS INTEGER);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS latest_aggregates_au_new AFTER UPDATE ON latest_evaluations
+    WHEN new.final_score IS NOT NULL BEGIN
+        INSERT INTO score_buckets VALUES (coalesce(new.verdict, ''), CAST(round(new.final_score * 10) AS INTEGER), 1, new.final_score)
+        ON CONFLICT (verdict, bucket) DO UPDATE SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+        INSERT INTO score_days VALUES (coalesce(new.verdict, ''), CAST(new.created_at / 86400 AS INTEGER), 1, new.final_score)
+        ON CONFLICT (verdict, day) DO UPDATE SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+    END
+    """,
+]
+
+LATEST_BACKFILL = """
+    INSERT OR REPLACE INTO latest_evaluations (idea_id, evaluation_id, final_score, verdict, created_at)
+    SELECT e.idea_id, e.id, e.final_score, e.verdict, (julianday(e.created_at) - 2440587.5) * 86400.0
+    FROM evaluations e
+    JOIN (SELECT idea_id, max(id) AS id FROM evaluations WHERE idea_id IS NOT NULL GROUP BY idea_id) latest
+      ON latest.id = e.id
+"""
+
+# Trend periods, in days
+TREND_PERIODS = {"day": 1, "week": 7, "month": 30}
+
+def init_portfolio():
+    """
+    Creates the ranking indexes, the latest-evaluation table and its
+    triggers. Existing evaluations are copied in once, on first creation.
+    """
+    with engine.begin() as conn:
+        existed = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_evaluations'")
+        ).first()
+        for statement in PORTFOLIO_DDL:
+            conn.execute(text(statement))
+        if not existed:
+            # Fills the aggregates too, through the latest_evaluations triggers
+            conn.execute(text(LATEST_BACKFILL))
+
+@traced("storage.portfolio.top")
+def top_ideas(n: int = 10, verdict: str = None, offset: int = 0) -> list:
+    """
+    Highest-scoring ideas by their latest evaluation, optionally for one
+    verdict. Returns (Idea, {"final_score", "verdict", "evaluation_id"}) pairs.
+    """
+    where, params = (" WHERE verdict = :verdict", {"verdict": verdict}) if verdict else ("", {})
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT idea_id, evaluation_id, final_score, verdict FROM latest_evaluations"
+                f"{where} ORDER BY final_score DESC LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "limit": n, "offset": offset}
+        ).all()
+    if not rows:
+        return []
+
+    db = SessionLocal()
+    try:
+        ideas = {i.id: i for i in db.query(Idea).filter(Idea.id.in_([r[0] for r in rows])).all()}
+    finally:
+        db.close()
+    return [
+        (ideas[r[0]], {"evaluation_id": r[1], "final_score": r[2], "verdict": r[3]})
+        for r in rows if r[0] in ideas
+    ]
+
+def _aggregate(table: str, columns: str, verdict: str = None, where: str = "", params: dict = None) -> np.ndarray:
+    clauses = ["count > 0"] + ([where] if where else [])
+    params = dict(params or {})
+    if verdict:
+        clauses.append("verdict = :verdict")
+        params["verdict"] = verdict
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT {columns} FROM {table} WHERE {' AND '.join(clauses)}"), params).all()
+    # Plain tuples: NumPy probes Row objects as mappings, which is slow
+    return np.array([tuple(r) for r in rows], dtype=object).reshape(len(rows), -1)
+
+@traced("storage.portfolio.distribution")
+def score_distribution(verdict: str = None, bins: int = 10) -> dict:
+    """
+    Summary statistics and a histogram (over 0-10) of current scores, plus
+    the count per verdict. Computed from the 0.1-wide score buckets: the
+    mean is exact, percentiles and std are to the nearest 0.1.
+    """
+    rows = _aggregate("score_buckets", "verdict, bucket, count, score_sum", verdict)
+    verdicts = rows[:, 0].astype(str)
+    scores = rows[:, 1].astype(np.float64) / 10
+    counts = rows[:, 2].astype(np.int64)
+    sums = rows[:, 3].astype(np.float64)
+
+    labels = np.unique(verdicts)
+    per_verdict = {str(label): int(counts[verdicts == label].sum()) for label in labels}
+    hist, edges = np.histogram(scores, bins=bins, range=(0, 10), weights=counts)
+    total = int(counts.sum())
+    result = {
+        "count": total,
+        "histogram": [{"low": float(lo), "high": float(hi), "count": int(c)} for lo, hi, c in zip(edges[:-1], edges[1:], hist)],
+        "verdicts": per_verdict
+    }
+    if total:
+        mean = float(sums.sum() / total)
+        order = np.argsort(scores, kind="stable")
+        scores, counts = scores[order], counts[order]
+        cumulative = np.cumsum(counts)
+        # Lower weighted percentile: the first bucket covering q of the ideas
+        p25, p50, p75, p90 = scores[np.searchsorted(cumulative, np.array([0.25, 0.5, 0.75, 0.9]) * total)]
+        std = float(np.sqrt((counts * (scores - mean) ** 2).sum() / total))
+        result.update({
+            "mean": round(mean, 2),
+            "std": round(std, 2),
+            "min": float(scores[0]),
+            "p25": float(p25),
+            "median": float(p50),
+            "p75": float(p75),
+            "p90": float(p90),
+            "max": float(scores[-1])
+        })
+    return result
+
+@traced("storage.portfolio.trend")
+def score_trend(period: str = "week", verdict: str = None, since: float = None) -> list:
+    """
+    Number of ideas and mean score per period of evaluation date (by each
+    idea's latest evaluation), oldest first. `since` is a Unix timestamp.
+    """
+    width = TREND_PERIODS[period]
+    where, params = ("day >= :since_day", {"since_day": int(since // 86400)}) if since is not None else ("", {})
+    rows = _aggregate("score_days", "day, count, score_sum", verdict, where, params)
+    if not len(rows):
+        return []
+
+    days = rows[:, 0].astype(np.int64)
+    counts = rows[:, 1].astype(np.int64)
+    sums = rows[:, 2].astype(np.float64)
+    buckets = days // width
+    first = buckets.min()
+    index = buckets - first
+    period_counts = np.bincount(index, weights=counts)
+    period_sums = np.bincount(index, weights=sums)
+    return [
+        {
+            "start": float((first + i) * width * 86400),
+            "count": int(period_counts[i]),
+            "mean_score": round(float(period_sums[i] / period_counts[i]), 2)
+        }
+        for i in np.flatnonzero(period_counts)
+    ]
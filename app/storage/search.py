@@ -0,0 +1,117 @@
+import re
+from sqlalchemy import text
+
+from app.storage.database import engine, SessionLocal, Idea
+from app.utils.tracing import traced
+
+# FTS5 mirror of the searchable idea text. rowid == ideas.id, and
+# evaluation_summary holds the summary of the idea's latest evaluation.
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ideas_fts USING fts5(
+        raw_input, problem_statement, proposed_solution, evaluation_summary,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ideas_fts_ai AFTER INSERT ON ideas BEGIN
+        INSERT INTO ideas_fts (rowid, raw_input, problem_statement, proposed_solution, evaluation_summary)
+        VALUES (new.id, new.raw_input, new.problem_statement, new.proposed_solution, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ideas_fts_au AFTER UPDATE ON ideas BEGIN
+        UPDATE ideas_fts
+        SET raw_input = new.raw_input,
+            problem_statement = new.problem_statement,
+            proposed_solution = new.proposed_solution
+        WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ideas_fts_ad AFTER DELETE ON ideas BEGIN
+        DELETE FROM ideas_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS evaluations_fts_ai AFTER INSERT ON evaluations BEGIN
+        UPDATE ideas_fts SET evaluation_summary = coalesce(new.summary, '') WHERE rowid = new.idea_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS evaluations_fts_au AFTER UPDATE OF summary ON evaluations BEGIN
+        UPDATE ideas_fts SET evaluation_summary = coalesce(new.summary, '') WHERE rowid = new.idea_id;
+    END
+    """,
+]
+
+FTS_BACKFILL = """
+    INSERT INTO ideas_fts (rowid, raw_input, problem_statement, proposed_solution, evaluation_summary)
+    SELECT i.id, i.raw_input, i.problem_statement, i.proposed_solution,
+           coalesce((SELECT e.summary FROM evaluations e WHERE e.idea_id = i.id ORDER BY e.id DESC LIMIT 1), '')
+    FROM ideas i
+"""
+
+# bm25() column weights: raw_input, problem_statement, proposed_solution, evaluation_summary
+FTS_WEIGHTS = (1.0, 2.0, 2.0, 0.5)
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+def init_search_index():
+    """
+    Creates the FTS table and its sync triggers. Existing ideas are copied
+    in once, when the table is first created.
+    """
+    with engine.begin() as conn:
+        existed = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ideas_fts'")
+        ).first()
+        for statement in FTS_DDL:
+            conn.execute(text(statement))
+        if not existed:
+            conn.execute(text(FTS_BACKFILL))
+
+def to_fts_query(query: str) -> str:
+    """
+    Turns free text into a safe FTS5 query: each word is quoted (so user
+    input can't inject FTS syntax) and terms are OR-ed, letting bm25 rank
+    ideas matching more terms first.
+    """
+    terms = _TERM_RE.findall(query or "")
+    return " OR ".join(f'"{t}"' for t in terms)
+
+def search_idea_ids(query: str, limit: int = 10, offset: int = 0) -> list:
+    """
+    Returns (idea_id, rank) pairs for the best matches, best first.
+    Lower rank is better (bm25 convention).
+    """
+    fts_query = to_fts_query(query)
+    if not fts_query:
+        return []
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                f"SELECT rowid, bm25(ideas_fts, {weights}) AS rank FROM ideas_fts "
+                "WHERE ideas_fts MATCH :query ORDER BY rank LIMIT :limit OFFSET :offset"
+            ),
+            {"query": fts_query, "limit": limit, "offset": offset}
+        ).all()
+    return [(row[0], row[1]) for row in rows]
+
+@traced("storage.search")
+def search_ideas(query: str, limit: int = 10, offset: int = 0) -> list:
+    """
+    Full-text search over ideas and their evaluation summaries.
+    Returns Idea objects, best match first.
+    """
+    ranked = search_idea_ids(query, limit, offset)
+    if not ranked:
+        return []
+
+    db = SessionLocal()
+    try:
+        ideas = {i.id: i for i in db.query(Idea).filter(Idea.id.in_([i for i, _ in ranked])).all()}
+    finally:
+        db.close()
+    return [ideas[i] for i, _ in ranked if i in ideas]
@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from app.storage.database import SessionLocal, Transcript
+from app.utils.tracing import traced
+
+# Transcripts are keyed by the audio's bytes rather than its path, so a
+# recording submitted again (renamed, or re-uploaded after a failure later in
+# the flow) is never decoded or transcribed twice with the same model.
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def audio_hash(file_path: str) -> str:
+    """
+    SHA-256 of the file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@traced("storage.transcripts.get")
+def get_transcript(audio_hash: str, model_size: str):
+    """
+    Returns the cached transcript as {"text", "segments", "audio_seconds",
+    "speech_seconds"}, or None. segments is None unless it was streamed.
+    """
+    db = SessionLocal()
+    try:
+        row = db.query(Transcript).filter(
+            Transcript.audio_hash == audio_hash, Transcript.model_size == model_size
+        ).first()
+        if row is None:
+            return None
+        return {
+            "text": row.text,
+            "segments": json.loads(row.segments) if row.segments else None,
+            "audio_seconds": row.audio_seconds,
+            "speech_seconds": row.speech_seconds
+        }
+    finally:
+        db.close()
+
+@traced("storage.transcripts.save")
+def save_transcript(audio_hash: str, model_size: str, text: str, segments: list = None,
+                    audio_seconds: float = None, speech_seconds: float = None):
+    """
+    Stores (or replaces) the transcript for this audio and model size.
+    """
+    db = SessionLocal()
+    try:
+        row = db.query(Transcript).filter(
+            Transcript.audio_hash == audio_hash, Transcript.model_size == model_size
+        ).first()
+        if row is None:
+            row = Transcript(audio_hash=audio_hash, model_size=model_size)
+            db.add(row)
+        row.text = text
+        row.segments = json.dumps(segments) if segments is not None else None
+        row.audio_seconds = audio_seconds
+        row.speech_seconds = speech_seconds
+        db.commit()
+    except IntegrityError:
+        # The same recording finished transcribing elsewhere first; keep that one
+        db.rollback()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
@@ -1,35 +1,116 @@
 import json
-import re
+
+_decoder = json.JSONDecoder()
 
 def parse_json_safely(text: str) -> dict:
     """
-    Attempts to parse JSON from a string, handling markdown code blocks
-    and potentially malformed JSON.
+    Parses the JSON object in a string in a single pass: decoding starts at
+    the first '{', so markdown fences and text before or after the object
+    are ignored.
     """
-    try:
-        # 1. Try direct parse
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    # 2. Extract from markdown code blocks ```json ... ```
-    match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
-    if match:
-        clean_text = match.group(1)
+    start = text.find("{")
+    if start != -1:
         try:
-            return json.loads(clean_text)
+            value, _ = _decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
         except json.JSONDecodeError:
             pass
-            
-    # 3. Last ditch: try to find start and end braces
-    try:
-        start = text.find('{')
-        end = text.rfind('}')
-        if start != -1 and end != -1:
-            possible_json = text[start:end+1]
-            return json.loads(possible_json)
-    except json.JSONDecodeError:
-        pass
 
     # Fail gracefully
     raise ValueError(f"Could not parse JSON from text: {text[:100]}...")
+
+class IncrementalJSONParser:
+    """
+    Single-pass, incremental parser for a streamed JSON object.
+
+    Feed response deltas as they arrive; each top-level field is decoded as
+    soon as its value is complete, so callers can act on e.g. "restatement"
+    before the rest of the object has been generated. Anything before the
+    first '{' (such as a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key" # 'key', 'colon', 'value', 'in_value', 'comma'
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._value_kind = None # 'string', 'nested', 'scalar'
+
+    def _complete(self, end: int, new_fields: dict):
+        try:
+            value = json.loads(self.text[self._value_start:end])
+        except json.JSONDecodeError:
+            value = None
+        else:
+            self.fields[self._key] = value
+            new_fields[self._key] = value
+        self._expect = "comma"
+        self._value_start = None
+
+    def feed(self, chunk: str) -> dict:
+        """
+        Consumes the next chunk and returns the fields completed by it.
+        """
+        self.text += chunk
+        text = self.text
+        new_fields = {}
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == "key":
+                            self._key = json.loads(text[self._key_start:i + 1])
+                            self._expect = "colon"
+                        elif self._value_kind == "string":
+                            self._complete(i + 1, new_fields)
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect == "key":
+                        self._key_start = i
+                    elif self._expect == "value":
+                        self._value_start, self._value_kind, self._expect = i, "string", "in_value"
+            elif ch in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start, self._value_kind, self._expect = i, "nested", "in_value"
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_kind == "nested" and self._expect == "in_value":
+                    self._complete(i + 1, new_fields)
+                elif self._depth == 0:
+                    if self._expect == "in_value" and self._value_kind == "scalar":
+                        self._complete(i, new_fields)
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif ch == ",":
+                    if self._expect == "in_value" and self._value_kind == "scalar":
+                        self._complete(i, new_fields)
+                    self._expect = "key"
+                elif self._expect == "value" and not ch.isspace():
+                    self._value_start, self._value_kind, self._expect = i, "scalar", "in_value"
+            i += 1
+        self._pos = i
+        return new_fields
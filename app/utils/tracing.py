@@ -0,0 +1,217 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+from app.config.settings import (
+    DATA_DIR,
+    TRACE_ENABLED,
+    TRACE_MAX_BYTES,
+    LLM_PROMPT_PRICE_PER_1K,
+    LLM_COMPLETION_PRICE_PER_1K
+)
+
+TRACE_PATH = os.path.join(DATA_DIR, "execmind_traces.jsonl")
+
+# The innermost open span of the current thread / task. Context variables do
+# not follow work into thread pools or onto the LLM client loop: submit with
+# bind(fn), or pass current() explicitly as `parent`.
+_current = contextvars.ContextVar("execmind_span", default=None)
+
+_sink = None
+_sink_lock = threading.Lock()
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+class Span:
+    """
+    One timed step. Spans opened inside another span share its trace id, so
+    every LLM call, search and DB write made for an idea can be grouped.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start")
+
+    def __init__(self, name: str, parent: "Span" = None, **attrs):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def finish(self, error: BaseException = None):
+        record = {
+            "ts": round(time.time(), 3),
+            "name": self.name,
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "ms": round((time.perf_counter() - self.start) * 1000, 2),
+            **self.attrs
+        }
+        if error is not None:
+            record["error"] = type(error).__name__
+        write(record)
+
+def current():
+    return _current.get()
+
+class span:
+    """
+    Context manager timing a block as a span of the current trace:
+
+        with span("search.web", queries=4) as s:
+            ...
+            s.set(results=len(results))
+    """
+
+    def __init__(self, name: str, parent: Span = None, **attrs):
+        self._span = Span(name, parent or _current.get(), **attrs)
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._span.start = time.perf_counter()
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self._span.finish(exc)
+        return False
+
+def traced(name: str):
+    """
+    Decorator form of span for workflow and storage functions.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(fn):
+    """
+    Wraps fn to run in a copy of the caller's context, so spans it opens on
+    a pool thread are parented to the caller's current span. Call once per
+    submission: a context can only be entered by one thread at a time.
+    """
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn)
+
+def record(name: str, ms: float, parent: Span = None, **attrs):
+    """
+    Records an already-timed step (e.g. one segment of a generator, which
+    cannot hold a span open across yields).
+    """
+    s = Span(name, parent or _current.get(), **attrs)
+    s.start = time.perf_counter() - ms / 1000
+    s.finish()
+
+def write(record: dict):
+    """
+    Appends one span to the JSONL sink. Tracing never breaks the traced call:
+    I/O errors are swallowed.
+    """
+    global _sink
+    if not TRACE_ENABLED:
+        return
+    line = json.dumps(record, default=str) + "\n"
+    with _sink_lock:
+        try:
+            if _sink is None:
+                if os.path.exists(TRACE_PATH) and os.path.getsize(TRACE_PATH) > TRACE_MAX_BYTES:
+                    os.replace(TRACE_PATH, TRACE_PATH + ".1")
+                _sink = open(TRACE_PATH, "a", encoding="utf-8")
+            _sink.write(line)
+            _sink.flush()
+        except OSError:
+            pass
+
+def load_spans(path: str = TRACE_PATH, since: float = None) -> list:
+    spans = []
+    if not os.path.exists(path):
+        return spans
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # a line cut short by a crash
+            if since is None or record.get("ts", 0) >= since:
+                spans.append(record)
+    return spans
+
+def llm_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (prompt_tokens * LLM_PROMPT_PRICE_PER_1K + completion_tokens * LLM_COMPLETION_PRICE_PER_1K) / 1000
+
+def summarize(spans: list) -> dict:
+    """
+    Aggregates spans into per-stage latency percentiles and per-idea cost.
+    Each trace rooted at an "idea" span that saved an idea counts as one
+    idea; the LLM spend of ideas trashed before saving is reported apart.
+    """
+    import numpy as np
+
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+
+    stages = []
+    for name, group in sorted(by_name.items()):
+        ms = np.array([s["ms"] for s in group])
+        stages.append({
+            "name": name,
+            "count": len(group),
+            "errors": sum(1 for s in group if s.get("error")),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "total_s": round(float(ms.sum()) / 1000, 1)
+        })
+
+    llm = by_name.get("llm", [])
+    prompt_tokens = sum(s.get("prompt_tokens", 0) for s in llm)
+    completion_tokens = sum(s.get("completion_tokens", 0) for s in llm)
+
+    saved = {s["trace"] for s in by_name.get("idea", []) if s.get("idea_id") is not None}
+    dropped = {s["trace"] for s in by_name.get("idea", [])} - saved
+    costs = {trace: 0.0 for trace in saved}
+    dropped_cost = 0.0
+    for s in llm:
+        cost = llm_cost(s.get("prompt_tokens", 0), s.get("completion_tokens", 0))
+        if s["trace"] in costs:
+            costs[s["trace"]] += cost
+        elif s["trace"] in dropped:
+            dropped_cost += cost
+    idea_costs = np.array(list(costs.values()))
+    structured = by_name.get("llm.structured", [])
+    invalid = sum(1 for s in structured if not s.get("valid", True))
+
+    return {
+        "spans": len(spans),
+        "stages": stages,
+        "llm_calls": len(llm),
+        "llm_cache_hits": sum(1 for s in llm if s.get("cache_hit")),
+        "llm_retries": sum(s.get("retries", 0) for s in llm),
+        "json_responses": len(structured),
+        "json_invalid_rate": round(invalid / len(structured), 4) if structured else 0.0,
+        "json_repaired": sum(1 for s in structured if s.get("repaired")),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "llm_cost": round(llm_cost(prompt_tokens, completion_tokens), 4),
+        "ideas": len(idea_costs),
+        "cost_per_idea": round(float(idea_costs.mean()), 4) if len(idea_costs) else 0.0,
+        "cost_per_idea_p95": round(float(np.percentile(idea_costs, 95)), 4) if len(idea_costs) else 0.0,
+        "dropped_ideas": len(dropped),
+        "dropped_cost": round(dropped_cost, 4)
+    }
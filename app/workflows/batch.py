@@ -0,0 +1,177 @@
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config.settings import LLM_MAX_CONCURRENCY
+from app.llm.client import usage_totals
+from app.storage.database import GroupCommitter, unit_of_work
+from app.workflows.ideation import frame_idea, structure_idea, build_idea, save_structured_idea
+from app.workflows.evaluation import score_idea, evaluate_idea
+from app.utils import tracing
+
+# Column / key names accepted for the idea text, in order of preference
+TEXT_FIELDS = ("idea", "raw_input", "text", "description")
+
+def _row_text(row) -> str:
+    if isinstance(row, str):
+        return row
+    for field in TEXT_FIELDS:
+        if row.get(field):
+            return str(row[field])
+    # Fall back to the first non-empty value
+    return next((str(v) for v in row.values() if v), "")
+
+def read_rows(path: str, on_error=None):
+    """
+    Streams (row_number, idea_text) pairs from a CSV or JSONL file without
+    loading it into memory. Row numbers start at 1 and are stable across runs.
+    A JSONL line that is not a JSON object or string is skipped, after
+    calling on_error(row_number, message) if given.
+    """
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for row_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    error = f"invalid JSON: {e}"
+                else:
+                    if isinstance(row, (dict, str)):
+                        yield row_number, _row_text(row)
+                        continue
+                    error = f"expected a JSON object, got {type(row).__name__}"
+                if on_error:
+                    on_error(row_number, error)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row_number, row in enumerate(csv.DictReader(f), start=1):
+                yield row_number, _row_text(row)
+
+def checkpoint_path(path: str) -> str:
+    return f"{path}.checkpoint"
+
+def load_checkpoint(path: str) -> set:
+    """
+    Returns the row numbers already completed in earlier runs.
+    """
+    done = set()
+    if os.path.exists(checkpoint_path(path)):
+        with open(checkpoint_path(path), encoding="utf-8") as f:
+            for line in f:
+                if line.strip().isdigit():
+                    done.add(int(line))
+    return done
+
+def process_idea(raw_input: str, evaluate: bool = True, source: str = "batch",
+                 committer: GroupCommitter = None) -> dict:
+    """
+    Runs one idea through frame -> structure/save -> evaluate, non-interactively.
+    All LLM calls happen first; the idea and its evaluation are then written
+    in a single transaction, so the write lock is never held across a call.
+    With a committer, that transaction is shared with other finished ideas
+    and this call returns once it commits.
+    """
+    with tracing.span("idea", source=source) as trace:
+        framed = frame_idea(raw_input)
+        structured = structure_idea(raw_input, framed.get("restatement"))
+        scores = score_idea(build_idea(raw_input, source, structured)) if evaluate else None
+
+        def _write(db) -> dict:
+            idea = save_structured_idea(raw_input, source, structured=structured, db=db)
+            result = {"idea_id": idea.id}
+            if evaluate:
+                evaluation = evaluate_idea(idea, scores=scores, db=db)
+                result["final_score"] = evaluation.final_score
+                result["verdict"] = evaluation.verdict
+            return result
+
+        if committer is not None:
+            result = committer.submit(tracing.bind(_write)).result()
+        else:
+            with unit_of_work() as db:
+                result = _write(db)
+        trace.set(idea_id=result["idea_id"])
+    return result
+
+def run_batch(path: str, concurrency: int = LLM_MAX_CONCURRENCY, evaluate: bool = True, on_progress=None) -> dict:
+    """
+    Processes every row of a CSV/JSONL file as a bounded-concurrency pipeline.
+
+    At most `concurrency` ideas run at once and the reader blocks while
+    `2 * concurrency` rows are in flight, so memory stays flat on large files.
+    Each completed row is appended to `<path>.checkpoint`; rerunning the same
+    file skips those rows, so a crash only loses work in flight. Finished
+    ideas are written in shared transactions of up to BATCH_COMMIT_SIZE (see
+    GroupCommitter) and checkpointed once theirs commits. Failed rows are
+    logged to `<path>.errors.jsonl` and retried on the next run.
+
+    Returns a throughput report. on_progress(report), if given, is called
+    after every completed row.
+    """
+    done = load_checkpoint(path)
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+    lock = threading.Lock()
+    usage_start = usage_totals()
+    started = time.perf_counter()
+    report = {"processed": 0, "failed": 0, "skipped": 0}
+
+    checkpoint = open(checkpoint_path(path), "a", encoding="utf-8")
+    errors = open(f"{path}.errors.jsonl", "a", encoding="utf-8")
+    committer = GroupCommitter()
+
+    def _log_error(row_number: int, message: str):
+        with lock:
+            errors.write(json.dumps({"row": row_number, "error": message}) + "\n")
+            errors.flush()
+            report["failed"] += 1
+
+    def _run(row_number: int, text: str):
+        try:
+            process_idea(text, evaluate=evaluate, committer=committer)
+            with lock:
+                checkpoint.write(f"{row_number}\n")
+                checkpoint.flush()
+                report["processed"] += 1
+        except Exception as e:
+            _log_error(row_number, str(e))
+        finally:
+            in_flight.release()
+        if on_progress:
+            on_progress(throughput_report(report, started, usage_start))
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+            for row_number, text in read_rows(path, on_error=_log_error):
+                if row_number in done or not text.strip():
+                    report["skipped"] += 1
+                    continue
+                # Backpressure: wait for a slot before reading further
+                in_flight.acquire()
+                pool.submit(_run, row_number, text)
+    finally:
+        committer.close()
+        checkpoint.close()
+        errors.close()
+
+    return throughput_report(report, started, usage_start)
+
+def throughput_report(report: dict, started: float, usage_start: dict) -> dict:
+    elapsed = time.perf_counter() - started
+    usage = usage_totals()
+    tokens = (
+        usage["prompt_tokens"] - usage_start["prompt_tokens"]
+        + usage["completion_tokens"] - usage_start["completion_tokens"]
+    )
+    minutes = max(elapsed, 1e-9) / 60
+    return {
+        **report,
+        "elapsed_seconds": round(elapsed, 2),
+        "tokens": tokens,
+        "ideas_per_minute": round(report["processed"] / minutes, 2),
+        "tokens_per_minute": round(tokens / minutes, 2),
+    }
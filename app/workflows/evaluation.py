@@ -1,6 +1,9 @@
-from app.llm.client import call_llm
+from app.llm.structured import call_structured
+from app.llm.schemas import Scores
 from app.storage.database import SessionLocal, Idea, Evaluation
-from app.utils.parsing import parse_json_safely
+from app.context.provider import index_evaluation
+from app.workflows.scoring import get_active_profile, score
+from app.utils.tracing import traced
 
 EVALUATION_SYSTEM_PROMPT = """
 You are a ruthless VC investor and technical auditor.
@@ -17,9 +20,12 @@ Output VALID JSON only with these exact keys:
 Do not include conversational text.
 """
 
-def evaluate_idea(idea: Idea) -> Evaluation:
+@traced("workflow.score")
+def score_idea(idea: Idea) -> dict:
     """
-    Evaluates an existing Idea object and saves the evaluation.
+    Asks the LLM to score an idea (saved or not) and computes the final score
+    and verdict with the active scoring profile (see app.workflows.scoring).
+    Nothing is written to the database.
     """
     # 1. Construct Prompt
     idea_description = f"""
@@ -30,50 +36,52 @@ def evaluate_idea(idea: Idea) -> Evaluation:
     """
     
     # 2. Call LLM
-    llm_output = call_llm(EVALUATION_SYSTEM_PROMPT, idea_description)
-    
-    # 3. Parse
-    data = parse_json_safely(llm_output)
+    # 3. Parse (validated against the Scores schema, with one repair call if needed)
+    data = call_structured(EVALUATION_SYSTEM_PROMPT, idea_description, Scores, cache=True).model_dump()
     
-    # 4. Calculate Final Score (Simple Average for now)
-    scores = [
-        data.get("feasibility", 0),
-        data.get("market_value", 0),
-        data.get("complexity", 0), # High complexity might be bad, but storing raw 1-10
-        data.get("risk", 0),       # High risk might be bad
-        data.get("innovation", 0)
-    ]
-    # Naive scoring: (Feasibility + Market + Innovation) - (Risk + Complexity)/2 ... 
-    # Let's just do a simple weighted score or just average of positives. 
-    # For simplicity, let's just Avg(Feasibility, Market, Innovation).
-    # NOTE: The user didn't specify the formula, just "Compute final score".
-    # I'll use a balanced weighted sum logic.
-    score_val = (
-        data.get("feasibility", 0) * 0.2 + 
-        data.get("market_value", 0) * 0.3 + 
-        data.get("innovation", 0) * 0.2 +
-        (10 - data.get("complexity", 10)) * 0.15 + # Lower complexity is better
-        (10 - data.get("risk", 10)) * 0.15         # Lower risk is better
-    )
-    final_score = round(score_val, 2)
+    # 4. Calculate Final Score and verdict with the active scoring profile,
+    # keeping the LLM's own verdict alongside
+    profile = get_active_profile()
+    data["llm_verdict"] = data.get("verdict")
+    data["final_score"], data["verdict"] = score(data, profile)
+    data["profile_id"] = profile.id
+    return data
+
+@traced("workflow.evaluate")
+def evaluate_idea(idea: Idea, scores: dict = None, db=None) -> Evaluation:
+    """
+    Evaluates an existing Idea object and saves the evaluation.
+    Pass `scores` (from score_idea) to skip the LLM call, and `db` (e.g. from
+    unit_of_work) to write within the caller's transaction.
+    """
+    data = scores if scores is not None else score_idea(idea)
 
     # 5. Save
+    evaluation = Evaluation(
+        idea_id=idea.id,
+        feasibility=data.get("feasibility"),
+        market_value=data.get("market_value"),
+        complexity=data.get("complexity"),
+        risk=data.get("risk"),
+        innovation=data.get("innovation"),
+        final_score=data.get("final_score"),
+        verdict=data.get("verdict"),
+        summary=data.get("summary"),
+        llm_verdict=data.get("llm_verdict", data.get("verdict")),
+        profile_id=data.get("profile_id")
+    )
+    if db is not None:
+        db.add(evaluation)
+        db.flush()
+        index_evaluation(evaluation, db=db)
+        return evaluation
+
     db = SessionLocal()
     try:
-        evaluation = Evaluation(
-            idea_id=idea.id,
-            feasibility=data.get("feasibility"),
-            market_value=data.get("market_value"),
-            complexity=data.get("complexity"),
-            risk=data.get("risk"),
-            innovation=data.get("innovation"),
-            final_score=final_score,
-            verdict=data.get("verdict"),
-            summary=data.get("summary")
-        )
         db.add(evaluation)
         db.commit()
         db.refresh(evaluation)
+        index_evaluation(evaluation)
         return evaluation
     except Exception as e:
         db.rollback()
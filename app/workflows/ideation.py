@@ -1,17 +1,19 @@
-from app.llm.client import call_llm
 import json
-from app.storage.database import SessionLocal, Idea
-from app.utils.parsing import parse_json_safely
-from app.context.provider import get_context
-
-from app.llm.client import call_llm
-from app.storage.database import SessionLocal, Idea
-from app.utils.parsing import parse_json_safely
-from app.context.provider import get_context
-try:
-    from ddgs import DDGS
-except ImportError:
-    from duckduckgo_search import DDGS
+from app.config.settings import (
+    RESEARCH_HISTORY_TOKEN_BUDGET, RESEARCH_WEB_TOKEN_BUDGET, RESEARCH_SNIPPET_MAX_TOKENS,
+    REFINEMENT_HISTORY_TOKEN_BUDGET
+)
+from app.llm.budget import count_tokens, truncate_tokens, select_within_budget
+from app.llm.client import call_llm, stream_llm
+from app.llm.structured import call_structured
+from app.llm.schemas import Framing, StructuredIdea
+from app.storage.database import SessionLocal, Idea, ResearchReport
+from app.context.provider import get_context, find_similar_ideas, index_idea
+from app.storage.search import search_ideas
+from app.context.web_search import search_web
+from app.context.retrieval import index_terms
+from app.workflows.pipeline import check_cancelled
+from app.utils.tracing import traced
 
 # 1. Framing Prompt
 FRAMING_SYSTEM_PROMPT = """
@@ -54,41 +56,120 @@ Output VALID JSON only:
 - "assumptions"
 """
 
-def frame_idea(raw_input: str) -> dict:
+# 4. Refinement summary prompt
+REFINEMENT_SUMMARY_SYSTEM_PROMPT = """
+You condense the clarifications a user has given about their product idea.
+You will be given the current summary (possibly empty) and new clarifications.
+Output a short plain-text summary that keeps every concrete requirement,
+constraint and correction, with later clarifications overriding earlier ones.
+"""
+
+class RefinementHistory:
+    """
+    The raw idea plus the user's clarifications, as passed to frame_idea.
+    Recent clarifications are kept verbatim; once they exceed the token
+    budget, the older ones are folded into a running summary (one LLM call
+    per fold, and answered from the cache on replays), so the context stays
+    bounded however many times the idea is refined.
+    """
+
+    def __init__(self, raw_input: str, token_budget: int = REFINEMENT_HISTORY_TOKEN_BUDGET):
+        self.raw_input = raw_input
+        self.token_budget = token_budget
+        self.summary = ""
+        self.recent = []
+
+    def add(self, clarification: str):
+        self.recent.append(clarification)
+        if self._tokens() > self.token_budget:
+            self._fold()
+
+    def _tokens(self) -> int:
+        return count_tokens(self.summary) + sum(count_tokens(c) for c in self.recent)
+
+    def _fold(self):
+        folded, self.recent = self.recent[:-1], self.recent[-1:]
+        if folded:
+            new = "\n".join(f"- {c}" for c in folded)
+            try:
+                summary = call_llm(
+                    REFINEMENT_SUMMARY_SYSTEM_PROMPT,
+                    f"Current summary: {self.summary or '(none)'}\n\nNew clarifications:\n{new}"
+                )
+            except RuntimeError:
+                # Keep going without the LLM: the newest text matters most
+                summary = f"{self.summary}\n{new}".strip()
+            self.summary = truncate_tokens(summary, self.token_budget // 2)
+        if self._tokens() > self.token_budget:
+            self.recent = [truncate_tokens(self.recent[-1], self.token_budget - count_tokens(self.summary))]
+
+    def text(self) -> str:
+        parts = [self.raw_input]
+        if self.summary:
+            parts.append(f"Earlier Clarifications (summary): {self.summary}")
+        parts += [f"User Clarification: {c}" for c in self.recent]
+        return "\n".join(parts)
+
+def rank_web_results(query: str, results: list) -> list:
+    """
+    Orders web results by the share of the query's terms they contain
+    (ties keep the search order).
+    """
+    terms = set(index_terms(query))
+    if not terms:
+        return list(results)
+
+    def overlap(result):
+        return len(terms.intersection(index_terms(f"{result['title']} {result['body']}"))) / len(terms)
+    return sorted(results, key=overlap, reverse=True)
+
+@traced("workflow.frame")
+def frame_idea(raw_input: str, on_partial=None) -> dict:
     """
     Step 1: Frame the idea for user confirmation.
+    If on_partial is given, the response is streamed and on_partial(fields)
+    is called each time another JSON field (e.g. "restatement") is complete.
     """
-    llm_output = call_llm(FRAMING_SYSTEM_PROMPT, raw_input)
-    return parse_json_safely(llm_output)
+    return call_structured(FRAMING_SYSTEM_PROMPT, raw_input, Framing, on_partial=on_partial).model_dump()
 
-def conduct_research(framed_text: str) -> str:
+@traced("workflow.research")
+def conduct_research(framed_text: str, on_token=None) -> str:
     """
     Step 2: Check internal history and web.
+    If on_token is given, the report is streamed and on_token(text_so_far)
+    is called as each delta arrives.
     """
-    # A. Internal Search (Simple Linear Scan via LLM for now - lean)
-    db = SessionLocal()
+    # A. Internal Search (nearest neighbours + keyword matches over the whole corpus)
     history_context = "No internal duplicates found."
-    try:
-        # Get last 20 ideas to check against - lean method
-        recent_ideas = db.query(Idea).order_by(Idea.id.desc()).limit(20).all()
-        if recent_ideas:
-            history_list = "\n".join([f"- ID {i.id}: {i.proposed_solution}" for i in recent_ideas])
-            # Ask LLM if any match
-            # For speed, we just dump this into the final prompt
-            history_context = f"Recent Internal Ideas:\n{history_list}"
-    finally:
-        db.close()
+    similar = find_similar_ideas(framed_text)
+    seen = {i.id for i, _ in similar}
+    keyword_matches = [i for i in search_ideas(framed_text, limit=len(similar) or 5) if i.id not in seen]
+
+    history_lines = [f"- ID {i.id} (similarity {score:.2f}): {i.proposed_solution}" for i, score in similar]
+    history_lines += [f"- ID {i.id} (keyword match): {i.proposed_solution}" for i in keyword_matches]
+    history_lines = select_within_budget(history_lines, RESEARCH_HISTORY_TOKEN_BUDGET)
+    if history_lines:
+        history_list = "\n".join(history_lines)
+        history_context = f"Most Similar Internal Ideas:\n{history_list}"
 
-    # B. External Search
+    check_cancelled()
+
+    # B. External Search (several query variants, run concurrently and cached),
+    # most relevant snippets first, within the web results budget
     web_context = "No web results found."
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(framed_text, max_results=5))
-            if results:
-                web_context = "\n".join([f"- {r['title']}: {r['body']} ({r['href']})" for r in results])
+        results = search_web(framed_text)
+        if results:
+            web_lines = select_within_budget([
+                f"- {r['title']}: {truncate_tokens(r['body'], RESEARCH_SNIPPET_MAX_TOKENS)} ({r['href']})"
+                for r in rank_web_results(framed_text, results)
+            ], RESEARCH_WEB_TOKEN_BUDGET)
+            web_context = "\n".join(web_lines)
     except Exception as e:
         web_context = f"Web search failed: {e}"
 
+    check_cancelled()
+
     # C. Analyze
     research_prompt = f"""
     Idea: {framed_text}
@@ -99,42 +180,85 @@ def conduct_research(framed_text: str) -> str:
     {web_context}
     """
     
-    return call_llm(RESEARCH_SYSTEM_PROMPT, research_prompt)
+    if on_token is None:
+        return call_llm(RESEARCH_SYSTEM_PROMPT, research_prompt)
+
+    report = ""
+    for delta in stream_llm(RESEARCH_SYSTEM_PROMPT, research_prompt):
+        report += delta
+        on_token(report)
+    return report
 
-def save_structured_idea(raw_input: str, source: str) -> Idea:
+@traced("workflow.structure")
+def structure_idea(raw_input: str, framed_text: str = None) -> dict:
     """
-    Step 3: Final save after confirmation.
+    Structures the idea via the LLM without saving it.
+    framed_text is the confirmed restatement from frame_idea, if available.
     """
     context = get_context(raw_input) 
+    check_cancelled()
     user_prompt = f"Raw Idea: {raw_input}\n\nContext: {context}"
-    llm_output = call_llm(STRUCTURING_SYSTEM_PROMPT, user_prompt)
-    
-    parsed_data = parse_json_safely(llm_output)
-    
+    if framed_text:
+        user_prompt = f"Raw Idea: {raw_input}\n\nConfirmed Interpretation: {framed_text}\n\nContext: {context}"
+    return call_structured(STRUCTURING_SYSTEM_PROMPT, user_prompt, StructuredIdea, cache=True).model_dump()
+
+def build_idea(raw_input: str, source: str, parsed_data: dict) -> Idea:
+    """
+    Builds an (unsaved) Idea from structure_idea output.
+    """
+    assumptions = parsed_data.get("assumptions")
+    if isinstance(assumptions, list):
+        assumptions = json.dumps(assumptions)
+        
+    target_users = parsed_data.get("target_users")
+    if isinstance(target_users, list):
+        target_users = json.dumps(target_users)
+
+    return Idea(
+        raw_input=raw_input,
+        problem_statement=parsed_data.get("problem_statement"),
+        proposed_solution=parsed_data.get("proposed_solution"),
+        target_users=target_users,
+        assumptions=assumptions,
+        source=source
+    )
+
+@traced("workflow.save")
+def save_structured_idea(raw_input: str, source: str, research_report: str = None, framed_text: str = None,
+                         structured: dict = None, db=None) -> Idea:
+    """
+    Step 3: Final save after confirmation.
+    The research report, if given, is stored alongside the idea for retrieval.
+    Pass `structured` (from structure_idea) to skip the LLM call, and `db`
+    (e.g. from unit_of_work) to write within the caller's transaction.
+    """
+    if structured is None:
+        structured = structure_idea(raw_input, framed_text)
+    new_idea = build_idea(raw_input, source, structured)
+
+    if db is not None:
+        report = _add_idea(db, new_idea, research_report)
+        index_idea(new_idea, report, db=db)
+        return new_idea
+
     db = SessionLocal()
     try:
-        assumptions = parsed_data.get("assumptions")
-        if isinstance(assumptions, list):
-            assumptions = json.dumps(assumptions)
-            
-        target_users = parsed_data.get("target_users")
-        if isinstance(target_users, list):
-            target_users = json.dumps(target_users)
-
-        new_idea = Idea(
-            raw_input=raw_input,
-            problem_statement=parsed_data.get("problem_statement"),
-            proposed_solution=parsed_data.get("proposed_solution"),
-            target_users=target_users,
-            assumptions=assumptions,
-            source=source
-        )
-        db.add(new_idea)
+        report = _add_idea(db, new_idea, research_report)
         db.commit()
         db.refresh(new_idea)
+        index_idea(new_idea, report)
         return new_idea
     except Exception as e:
         db.rollback()
         raise e
     finally:
         db.close()
+
+def _add_idea(db, new_idea: Idea, research_report: str = None) -> ResearchReport:
+    db.add(new_idea)
+    report = None
+    if research_report:
+        report = ResearchReport(idea=new_idea, report=research_report)
+        db.add(report)
+    db.flush()
+    return report
@@ -0,0 +1,98 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import tracing
+
+# Shared by all speculations. Cancelled work that has not started is dropped;
+# work already running stops at its next check_cancelled() call (or streamed
+# token), so a discarded framing does not keep spending LLM and search calls.
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative")
+
+# Set, inside speculative work, to the cancel event of the generation it belongs to
+_cancel_event = contextvars.ContextVar("speculation_cancel_event", default=None)
+
+class Cancelled(Exception):
+    """
+    Raised inside speculative work whose speculation has been cancelled.
+    """
+
+def check_cancelled():
+    """
+    Cancellation point for workflow steps: raises Cancelled if the
+    speculation running this step was cancelled. Does nothing elsewhere.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise Cancelled()
+
+def _run(event: threading.Event, fn, *args, **kwargs):
+    _cancel_event.set(event)
+    check_cancelled()
+    return fn(*args, **kwargs)
+
+class Speculation:
+    """
+    Work started ahead of a user decision, keyed by step name.
+
+    The Deep Researcher flow starts research and structuring as soon as the
+    framing is shown, so they run while the user reads it. If the user
+    confirms, the results are usually ready; if they refine or drop the idea,
+    cancel() discards everything started so far and stops it. Each round of
+    work between cancels is a generation with its own cancel event and
+    progress, so late output from a cancelled step is never shown.
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self._progress = {}
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, name: str, fn, *args, **kwargs):
+        with self._lock:
+            # bind: spans opened by fn belong to the caller's trace
+            self._futures[name] = _pool.submit(tracing.bind(_run), self._cancelled, fn, *args, **kwargs)
+
+    def start_streaming(self, name: str, fn, *args, **kwargs):
+        """
+        Like start, for workflow steps taking an on_token callback: the text
+        streamed so far is available from progress(name).
+        """
+        with self._lock:
+            progress, cancelled = self._progress, self._cancelled
+        progress[name] = ""
+
+        def on_token(text):
+            # Raising here closes the stream, which stops the LLM request
+            if cancelled.is_set():
+                raise Cancelled()
+            progress[name] = text
+
+        self.start(name, fn, *args, on_token=on_token, **kwargs)
+
+    def progress(self, name: str) -> str:
+        return self._progress.get(name, "")
+
+    def future(self, name: str):
+        return self._futures.get(name)
+
+    def result(self, name: str, fn, *args, **kwargs):
+        """
+        Returns the speculative result for `name`, or runs fn(*args, **kwargs)
+        now if that step was never started (or was cancelled).
+        """
+        with self._lock:
+            future = self._futures.pop(name, None)
+        if future is None or future.cancelled():
+            return fn(*args, **kwargs)
+        return future.result()
+
+    def cancel(self):
+        with self._lock:
+            futures, self._futures = self._futures, {}
+            self._progress = {}
+            cancelled, self._cancelled = self._cancelled, threading.Event()
+        cancelled.set()
+        for future in futures.values():
+            future.cancel()
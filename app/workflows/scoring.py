@@ -0,0 +1,291 @@
+import json
+import time
+
+import numpy as np
+from sqlalchemy import func, text
+
+from app.context.retrieval import reindex_documents, remove_documents
+from app.storage.database import engine, SessionLocal, ScoringProfile
+from app.utils.tracing import traced
+
+# Evaluations keep the LLM's raw sub-scores (and its verdict in llm_verdict);
+# final_score and verdict are derived from them by a scoring profile. Changing
+# the formula is a new profile version, re-applied to every evaluation as one
+# NumPy batch with no LLM calls.
+
+SUBSCORES = ["feasibility", "market_value", "innovation", "complexity", "risk"]
+# Lower is better for these: they are scored as (10 - value)
+INVERTED = ["complexity", "risk"]
+VERDICTS = ["pursue", "refine", "drop"]
+
+DEFAULT_PROFILE = "default"
+# The original formula: positives count for more, and complexity/risk are inverted
+DEFAULT_WEIGHTS = {"feasibility": 0.2, "market_value": 0.3, "innovation": 0.2, "complexity": 0.15, "risk": 0.15}
+
+# Evaluations written per executemany call when applying a profile
+WRITE_BATCH_SIZE = 50000
+
+def init_scoring():
+    """
+    Adds the llm_verdict and profile_id columns to evaluations tables created
+    before profiles existed (keeping each stored verdict as the LLM's), and
+    creates the default profile, matching the original formula.
+    """
+    with engine.begin() as conn:
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(evaluations)"))}
+        if "llm_verdict" not in columns:
+            conn.execute(text("ALTER TABLE evaluations ADD COLUMN llm_verdict VARCHAR"))
+            conn.execute(text("UPDATE evaluations SET llm_verdict = verdict"))
+        if "profile_id" not in columns:
+            conn.execute(text("ALTER TABLE evaluations ADD COLUMN profile_id INTEGER REFERENCES scoring_profiles (id)"))
+
+    db = SessionLocal()
+    try:
+        if not db.query(ScoringProfile.id).first():
+            db.add(ScoringProfile(name=DEFAULT_PROFILE, version=1, weights=json.dumps(DEFAULT_WEIGHTS), active=True))
+            db.commit()
+    finally:
+        db.close()
+
+def weights_of(profile: ScoringProfile) -> dict:
+    return json.loads(profile.weights)
+
+def thresholds_of(profile: ScoringProfile) -> dict:
+    return json.loads(profile.thresholds) if profile.thresholds else None
+
+def describe(profile: ScoringProfile) -> str:
+    return f"{profile.name} v{profile.version}"
+
+def score_arrays(subscores: np.ndarray, llm_verdicts: np.ndarray, profile: ScoringProfile) -> tuple:
+    """
+    Final scores and verdicts for many evaluations at once. subscores has one
+    row per evaluation and one column per SUBSCORES entry (NaN if missing,
+    which scores 0 like the original formula). Returns (scores rounded to
+    2 places, verdicts).
+    """
+    weights = weights_of(profile)
+    adjusted = np.asarray(subscores, dtype=np.float64).copy()
+    inverted = [SUBSCORES.index(name) for name in INVERTED]
+    adjusted[:, inverted] = 10 - adjusted[:, inverted]
+    adjusted = np.nan_to_num(adjusted, nan=0.0)
+    scores = np.round(adjusted @ np.array([weights.get(name, 0.0) for name in SUBSCORES]), 2)
+
+    thresholds = thresholds_of(profile)
+    if thresholds is None:
+        return scores, np.asarray(llm_verdicts, dtype=object)
+    verdicts = np.where(
+        scores >= thresholds["pursue"], "pursue", np.where(scores >= thresholds["refine"], "refine", "drop")
+    ).astype(object)
+    return scores, verdicts
+
+def score(data: dict, profile: ScoringProfile = None) -> tuple:
+    """
+    (final score, verdict) for one set of sub-scores, such as score_idea's.
+    """
+    profile = profile or get_active_profile()
+    subscores = np.array([[np.nan if data.get(name) is None else data[name] for name in SUBSCORES]], dtype=np.float64)
+    scores, verdicts = score_arrays(subscores, np.array([data.get("verdict")], dtype=object), profile)
+    return float(scores[0]), verdicts[0]
+
+def _validate(weights: dict, thresholds: dict = None):
+    unknown = set(weights) - set(SUBSCORES)
+    if unknown:
+        raise ValueError(f"Unknown sub-scores: {', '.join(sorted(unknown))} (expected {', '.join(SUBSCORES)})")
+    if any(not isinstance(w, (int, float)) or w < 0 for w in weights.values()):
+        raise ValueError("Weights must be non-negative numbers")
+    if thresholds is not None:
+        if set(thresholds) != {"pursue", "refine"}:
+            raise ValueError("Thresholds need exactly 'pursue' and 'refine'")
+        if thresholds["pursue"] < thresholds["refine"]:
+            raise ValueError("The 'pursue' threshold must be at least the 'refine' threshold")
+
+def create_profile(name: str, weights: dict, thresholds: dict = None) -> ScoringProfile:
+    """
+    Saves a new version of the named profile (version 1 if the name is new).
+    Profiles are never edited in place, so every stored score can be traced
+    to the exact formula that produced it.
+    """
+    _validate(weights, thresholds)
+    db = SessionLocal()
+    try:
+        latest = db.query(func.max(ScoringProfile.version)).filter(ScoringProfile.name == name).scalar() or 0
+        profile = ScoringProfile(
+            name=name, version=latest + 1, weights=json.dumps(weights),
+            thresholds=json.dumps(thresholds) if thresholds is not None else None
+        )
+        db.add(profile)
+        db.commit()
+        db.refresh(profile)
+        return profile
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def get_profile(name: str = None, version: int = None) -> ScoringProfile:
+    """
+    The given version of a profile, its latest version if version is None,
+    or the active profile if name is None too.
+    """
+    if name is None:
+        return get_active_profile()
+    db = SessionLocal()
+    try:
+        query = db.query(ScoringProfile).filter(ScoringProfile.name == name)
+        if version is not None:
+            query = query.filter(ScoringProfile.version == version)
+        profile = query.order_by(ScoringProfile.version.desc()).first()
+    finally:
+        db.close()
+    if profile is None:
+        raise LookupError(f"No scoring profile {name}" + (f" v{version}" if version is not None else ""))
+    return profile
+
+def list_profiles() -> list:
+    db = SessionLocal()
+    try:
+        return db.query(ScoringProfile).order_by(ScoringProfile.name, ScoringProfile.version).all()
+    finally:
+        db.close()
+
+def get_active_profile() -> ScoringProfile:
+    """
+    The profile new evaluations are scored with. Read on every call, not
+    cached, so a profile applied by another process takes effect at once.
+    """
+    db = SessionLocal()
+    try:
+        profile = db.query(ScoringProfile).filter(ScoringProfile.active.is_(True)).first()
+    finally:
+        db.close()
+    if profile is None:
+        raise LookupError("No active scoring profile; run init_db first")
+    return profile
+
+def load_subscores(latest_only: bool = False) -> tuple:
+    """
+    Reads every evaluation's (or, with latest_only, each idea's latest
+    evaluation's) sub-scores as arrays: (evaluation ids, sub-score matrix,
+    LLM verdicts, current final scores, current verdicts, profile ids).
+    """
+    columns = ", ".join(f"e.{name}" for name in SUBSCORES)
+    query = f"SELECT e.id, {columns}, e.llm_verdict, e.final_score, e.verdict, e.profile_id FROM evaluations e"
+    if latest_only:
+        query += " JOIN latest_evaluations l ON l.evaluation_id = e.id"
+    # Plain DB-API rows: converting 1M ORM rows would dominate the run time
+    connection = engine.raw_connection()
+    try:
+        rows = connection.cursor().execute(query).fetchall()
+    finally:
+        connection.close()
+
+    n = len(rows)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    subscores = np.array([r[1:6] for r in rows], dtype=np.float64).reshape(n, len(SUBSCORES))
+    llm_verdicts = np.array([r[6] for r in rows], dtype=object)
+    final_scores = np.array([r[7] for r in rows], dtype=np.float64)
+    verdicts = np.array([r[8] for r in rows], dtype=object)
+    profile_ids = np.array([-1 if r[9] is None else r[9] for r in rows], dtype=np.int64)
+    return ids, subscores, llm_verdicts, final_scores, verdicts, profile_ids
+
+def _summary(scores: np.ndarray, verdicts: np.ndarray, profile: ScoringProfile) -> dict:
+    return {
+        "profile": describe(profile),
+        "mean": round(float(scores.mean()), 2) if len(scores) else 0.0,
+        "verdicts": {v: int((verdicts == v).sum()) for v in VERDICTS}
+    }
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.argsort(values, kind="stable")] = np.arange(len(values))
+    return ranks
+
+@traced("workflow.scoring.compare")
+def compare_profiles(a: ScoringProfile, b: ScoringProfile, top: int = 10) -> dict:
+    """
+    What-if comparison of two profiles over each idea's latest evaluation,
+    without writing anything: score and verdict summaries for both, how many
+    verdicts change (and between what), score deltas, the Spearman rank
+    correlation and how much the top ideas overlap.
+    """
+    ids, subscores, llm_verdicts, _, _, _ = load_subscores(latest_only=True)
+    scores_a, verdicts_a = score_arrays(subscores, llm_verdicts, a)
+    scores_b, verdicts_b = score_arrays(subscores, llm_verdicts, b)
+
+    report = {"ideas": len(ids), "a": _summary(scores_a, verdicts_a, a), "b": _summary(scores_b, verdicts_b, b)}
+    if not len(ids):
+        report.update({"changed_verdicts": 0, "transitions": {}, "mean_delta": 0.0, "max_delta": 0.0,
+                       "rank_correlation": 1.0, "top_overlap": 1.0})
+        return report
+
+    changed = verdicts_a != verdicts_b
+    transitions = {}
+    for before, after in zip(verdicts_a[changed], verdicts_b[changed]):
+        transitions[f"{before} -> {after}"] = transitions.get(f"{before} -> {after}", 0) + 1
+    delta = scores_b - scores_a
+    ranks_a, ranks_b = _ranks(scores_a), _ranks(scores_b)
+    correlation = np.corrcoef(ranks_a, ranks_b)[0, 1] if len(ids) > 1 else 1.0
+    k = min(top, len(ids))
+    top_a = set(ids[np.argsort(-scores_a, kind="stable")[:k]].tolist())
+    top_b = set(ids[np.argsort(-scores_b, kind="stable")[:k]].tolist())
+    report.update({
+        "changed_verdicts": int(changed.sum()),
+        "transitions": dict(sorted(transitions.items(), key=lambda item: -item[1])),
+        "mean_delta": round(float(delta.mean()), 3),
+        "max_delta": round(float(np.abs(delta).max()), 2),
+        "rank_correlation": round(float(np.nan_to_num(correlation, nan=1.0)), 4),
+        "top_overlap": round(len(top_a & top_b) / k, 2)
+    })
+    return report
+
+@traced("workflow.scoring.apply")
+def apply_profile(profile: ScoringProfile, on_progress=None) -> dict:
+    """
+    Re-scores every evaluation with the profile and makes it the active one,
+    in a single transaction. Only rows whose score, verdict or profile
+    changes are written; the portfolio tables follow through their triggers.
+    Retrieval chunks quote the score and verdict, so those of the re-scored
+    evaluations are removed in the same transaction and re-chunked after it.
+    on_progress(written, total) is called after each batch.
+    """
+    started = time.perf_counter()
+    ids, subscores, llm_verdicts, final_scores, verdicts, profile_ids = load_subscores()
+    loaded = time.perf_counter()
+
+    scores, new_verdicts = score_arrays(subscores, llm_verdicts, profile)
+    changed = (scores != final_scores) | (new_verdicts != verdicts)
+    stale = changed | (profile_ids != profile.id)
+    rows = list(zip(scores[stale].tolist(), new_verdicts[stale].tolist(), ids[stale].tolist()))
+    computed = time.perf_counter()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            cursor.executemany(
+                f"UPDATE evaluations SET final_score = ?, verdict = ?, profile_id = {int(profile.id)} WHERE id = ?",
+                rows[start:start + WRITE_BATCH_SIZE]
+            )
+            if on_progress:
+                on_progress(min(start + WRITE_BATCH_SIZE, len(rows)), len(rows))
+        cursor.execute("UPDATE scoring_profiles SET active = (id = ?)", (profile.id,))
+        rechunk = remove_documents(cursor, "evaluation", ids[changed].tolist())
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        raise e
+    finally:
+        connection.close()
+    reindex_documents("evaluation", rechunk)
+
+    return {
+        "profile": describe(profile),
+        "evaluations": len(ids),
+        "updated": len(rows),
+        "rechunked": len(rechunk),
+        "load_seconds": round(loaded - started, 2),
+        "compute_seconds": round(computed - loaded, 2),
+        "write_seconds": round(time.perf_counter() - computed, 2),
+        "elapsed_seconds": round(time.perf_counter() - started, 2)
+    }
@@ -0,0 +1,116 @@
+"""
+Clustering benchmark.
+
+Fills a throwaway database with N synthetic ideas, a share of which are
+near-copies of an earlier idea (one word swapped), then times the offline
+clustering job and incremental assignment, and checks how many of the
+planted near-duplicates were linked:
+
+    python benchmarks/bench_clustering.py --ideas 100000 --duplicate-rate 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DOMAINS = ["logistics", "healthcare", "retail", "education", "energy", "finance", "hiring", "legal",
+           "agriculture", "construction", "insurance", "travel", "media", "security", "manufacturing"]
+ACTIONS = ["automates", "predicts", "tracks", "audits", "schedules", "prices", "summarises", "matches"]
+OBJECTS = ["invoices", "shipments", "appointments", "contracts", "inventory", "claims", "leads",
+           "inspections", "payroll", "tickets", "maintenance", "onboarding", "returns", "permits"]
+USERS = ["small businesses", "enterprise teams", "field workers", "managers", "regulators", "freelancers"]
+FILLER = ["quickly", "reliably", "cheaply", "securely", "with AI", "on mobile", "in real time", "at scale"]
+
+def make_ideas(n: int, duplicate_rate: float, rng: np.random.Generator) -> tuple:
+    """
+    Returns (rows, planted) where planted maps a duplicate's index to its original's.
+    """
+    rows, planted = [], {}
+    for i in range(n):
+        if i > 0 and rng.random() < duplicate_rate:
+            original = int(rng.integers(0, i))
+            words = rows[original]["proposed_solution"].split()
+            words[int(rng.integers(0, len(words)))] = str(rng.choice(FILLER))
+            rows.append({**rows[original], "proposed_solution": " ".join(words), "raw_input": f"Resubmitted idea {i}"})
+            planted[i] = original
+            continue
+        domain, action, obj, users = (rng.choice(DOMAINS), rng.choice(ACTIONS), rng.choice(OBJECTS), rng.choice(USERS))
+        extra = " ".join(rng.choice(FILLER, size=2, replace=False))
+        rows.append({
+            "raw_input": f"Idea {i}",
+            "problem_statement": f"{users} in {domain} lose time on {obj} (case {i})",
+            "proposed_solution": f"A {domain} tool that {action} {obj} {extra} for {users}, variant {i}",
+            "target_users": str(users),
+            "source": "text"
+        })
+    return rows, planted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--incremental", type=int, default=500, help="New ideas assigned after clustering")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_TRACE"] = "false"
+    from app.storage.database import init_db, SessionLocal, Idea, IdeaDuplicate, bulk_insert
+    from app.context.clustering import cluster_ideas, assign_idea
+    from app.context.provider import idea_text, sync_idea_index
+    from app.context.vector_index import embed_text, get_idea_index
+    init_db()
+
+    rng = np.random.default_rng(0)
+    rows, planted = make_ideas(args.ideas + args.incremental, args.duplicate_rate, rng)
+    db = SessionLocal()
+    try:
+        ids = bulk_insert(db, Idea, rows[:args.ideas], batch_size=20000, return_ids=True)
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    sync_idea_index()
+    print(f"data dir: {data_dir}")
+    print(f"embedded {args.ideas:,} ideas in {time.perf_counter() - start:.1f}s")
+
+    report = cluster_ideas()
+    print(
+        f"clustered into {report['clusters']} clusters in {report['cluster_seconds']}s, "
+        f"duplicates in {report['duplicate_seconds']}s (total {report['elapsed_seconds']}s)"
+    )
+
+    db = SessionLocal()
+    try:
+        links = {i: d for i, d in db.query(IdeaDuplicate.idea_id, IdeaDuplicate.duplicate_of)}
+    finally:
+        db.close()
+    expected = {ids[i]: ids[o] for i, o in planted.items() if i < args.ideas}
+    found = sum(1 for i in expected if i in links)
+    print(f"planted near-duplicates linked: {found}/{len(expected)} ({found / max(1, len(expected)):.1%}); "
+          f"links total: {len(links)}")
+
+    # Incremental: what save_structured_idea does for each new idea
+    db = SessionLocal()
+    try:
+        new_ids = bulk_insert(db, Idea, rows[args.ideas:], batch_size=20000, return_ids=True)
+        new_ideas = db.query(Idea).filter(Idea.id.in_(new_ids)).order_by(Idea.id).all()
+    finally:
+        db.close()
+    timings = []
+    for idea in new_ideas:
+        vector = embed_text(idea_text(idea))
+        start = time.perf_counter()
+        get_idea_index().add(idea.id, vector)
+        assign_idea(idea.id, vector)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    print(f"incremental assignment of {len(timings)} ideas: p50 {p50:.2f} ms, p95 {p95:.2f} ms (index add + cluster + duplicate check)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Portfolio query benchmark.
+
+Fills a throwaway database with N evaluations spread over a year (several
+per idea, so latest_evaluations is exercised) and times the portfolio
+queries against it:
+
+    python benchmarks/bench_portfolio.py --evaluations 1000000 --ideas 200000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VERDICTS = np.array(["pursue", "refine", "drop"])
+
+def populate(n_ideas: int, n_evaluations: int, batch_size: int):
+    from app.storage.database import SessionLocal, Idea, Evaluation, bulk_insert
+
+    rng = np.random.default_rng(0)
+    db = SessionLocal()
+    try:
+        ids = bulk_insert(db, Idea, [
+            {"raw_input": f"Benchmark idea {i}", "problem_statement": f"Problem {i}", "proposed_solution": f"Solution {i}", "source": "text"}
+            for i in range(n_ideas)
+        ], batch_size=batch_size, return_ids=True)
+
+        start = datetime.datetime(2025, 1, 1)
+        idea_ids = rng.choice(ids, size=n_evaluations)
+        scores = np.round(np.clip(rng.normal(5.5, 1.5, n_evaluations), 0, 10), 2)
+        verdicts = VERDICTS[rng.integers(0, 3, n_evaluations)]
+        offsets = np.sort(rng.integers(0, 365 * 86400, n_evaluations))
+        for lo in range(0, n_evaluations, batch_size):
+            hi = min(lo + batch_size, n_evaluations)
+            bulk_insert(db, Evaluation, [
+                {
+                    "idea_id": int(idea_ids[i]), "feasibility": 5, "market_value": 5, "complexity": 5,
+                    "risk": 5, "innovation": 5, "final_score": float(scores[i]), "verdict": str(verdicts[i]),
+                    "summary": "Benchmark", "created_at": start + datetime.timedelta(seconds=int(offsets[i]))
+                }
+                for i in range(lo, hi)
+            ], batch_size=batch_size)
+    finally:
+        db.close()
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=1000000)
+    parser.add_argument("--ideas", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_TRACE"] = "false"
+    from app.storage.database import init_db
+    from app.storage.portfolio import top_ideas, score_distribution, score_trend
+    init_db()
+
+    start = time.perf_counter()
+    populate(args.ideas, args.evaluations, args.batch_size)
+    print(f"data dir: {data_dir}")
+    print(f"inserted {args.evaluations:,} evaluations for {args.ideas:,} ideas in {time.perf_counter() - start:.1f}s (triggers included)")
+
+    for name, fn in [
+        ("top 10", lambda: top_ideas(10)),
+        ("top 10 'pursue'", lambda: top_ideas(10, verdict="pursue")),
+        ("distribution", lambda: score_distribution()),
+        ("distribution 'drop'", lambda: score_distribution(verdict="drop")),
+        ("weekly trend", lambda: score_trend("week")),
+    ]:
+        print(f"{name:<22} {timed(fn, args.repeat):8.1f} ms (best of {args.repeat})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Re-scoring benchmark.
+
+Fills a throwaway database with N evaluations (reusing the portfolio
+benchmark's generator), creates a second scoring profile, then times the
+what-if comparison and the full re-score, and checks that the portfolio
+aggregates still match the evaluations afterwards:
+
+    python benchmarks/bench_rescoring.py --evaluations 1000000 --ideas 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def check_aggregates():
+    """
+    Compares the score_buckets aggregates with the latest evaluation per
+    idea, computed directly.
+    """
+    from app.storage.database import engine
+
+    with engine.connect() as conn:
+        expected = conn.exec_driver_sql(
+            "SELECT coalesce(e.verdict, ''), COUNT(*), ROUND(SUM(e.final_score), 2) FROM latest_evaluations l "
+            "JOIN evaluations e ON e.id = l.evaluation_id GROUP BY e.verdict ORDER BY e.verdict"
+        ).fetchall()
+        stored = conn.exec_driver_sql(
+            "SELECT verdict, SUM(count), ROUND(SUM(score_sum), 2) FROM score_buckets GROUP BY verdict "
+            "HAVING SUM(count) > 0 ORDER BY verdict"
+        ).fetchall()
+    return [tuple(r) for r in expected] == [tuple(r) for r in stored], expected, stored
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=1000000)
+    parser.add_argument("--ideas", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_TRACE"] = "false"
+    from benchmarks.bench_portfolio import populate
+    from app.storage.database import init_db, engine
+    from app.workflows.scoring import create_profile, compare_profiles, apply_profile, get_active_profile
+    init_db()
+
+    start = time.perf_counter()
+    populate(args.ideas, args.evaluations, args.batch_size)
+    with engine.begin() as conn:
+        # evaluate_idea keeps the LLM's own verdict alongside the profile's
+        conn.exec_driver_sql("UPDATE evaluations SET llm_verdict = verdict")
+    print(f"data dir: {data_dir}")
+    print(f"inserted {args.evaluations:,} evaluations for {args.ideas:,} ideas in {time.perf_counter() - start:.1f}s")
+
+    default = get_active_profile()
+    growth = create_profile("growth", {"feasibility": 0.15, "market_value": 0.45, "innovation": 0.25,
+                                       "complexity": 0.05, "risk": 0.1}, {"pursue": 6.0, "refine": 4.5})
+
+    start = time.perf_counter()
+    report = compare_profiles(default, growth)
+    print(f"what-if over {report['ideas']:,} ideas: {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({report['changed_verdicts']:,} verdicts would change)")
+
+    for profile in (growth, default):
+        report = apply_profile(profile)
+        print(f"apply {profile.name} v{profile.version}: {report['updated']:,}/{report['evaluations']:,} rows in "
+              f"{report['elapsed_seconds']}s (load {report['load_seconds']}s, compute {report['compute_seconds']}s, "
+              f"write {report['write_seconds']}s)")
+        consistent, expected, stored = check_aggregates()
+        print(f"  portfolio aggregates consistent: {consistent}")
+        if not consistent:
+            print(f"  expected {expected}\n  stored   {stored}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
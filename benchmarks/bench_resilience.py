@@ -0,0 +1,151 @@
+"""
+Resilience check against a local fake Azure OpenAI server.
+
+Serves /openai/deployments/<name>/chat/completions on localhost, enforcing a
+requests-per-minute quota over 10-second windows (429 + Retry-After, like
+Azure) and injecting random 500s and dropped connections. A burst of
+concurrent call_many requests is then sent through the real client:
+
+    python benchmarks/bench_resilience.py --requests 150 --server-rpm 600
+    python benchmarks/bench_resilience.py --match-quota     # client RPM limit = server quota
+    python benchmarks/bench_resilience.py --max-retries 0   # the old behaviour
+
+Exits 1 if any request failed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeAzure:
+    def __init__(self, rpm: float, error_rate: float, drop_rate: float, latency: float):
+        self.window_quota = max(1, int(rpm / 6))
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.latency = latency
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def admit(self):
+        """
+        Returns seconds until the next window if the quota is spent, else None.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 10:
+                self.window_start, self.window_count = now, 0
+            if self.window_count >= self.window_quota:
+                return 10 - (now - self.window_start)
+            self.window_count += 1
+            return None
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                wait = server.admit()
+                if wait is not None:
+                    server.counts["429"] += 1
+                    return self._send(429, {"error": {"code": "429", "message": "Rate limit exceeded"}},
+                                      {"Retry-After": str(max(1, round(wait)))})
+                roll = random.random()
+                if roll < server.drop_rate:
+                    server.counts["dropped"] += 1
+                    self.close_connection = True
+                    return
+                if roll < server.drop_rate + server.error_rate:
+                    server.counts["500"] += 1
+                    return self._send(500, {"error": {"code": "500", "message": "Internal server error"}})
+
+                time.sleep(server.latency)
+                server.counts["200"] += 1
+                prompt_tokens = sum(len(m["content"]) for m in request["messages"]) // 4
+                self._send(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": "fake",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "{\"ok\": true}"}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 5,
+                              "total_tokens": prompt_tokens + 5}
+                })
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--server-rpm", type=float, default=600, help="Quota enforced by the fake server")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests answered with a 500")
+    parser.add_argument("--drop-rate", type=float, default=0.02, help="Share of connections dropped")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per successful response")
+    parser.add_argument("--max-retries", type=int, default=None)
+    parser.add_argument("--match-quota", action="store_true", help="Set the client RPM limit to the server quota")
+    args = parser.parse_args()
+
+    fake = FakeAzure(args.server_rpm, args.error_rate, args.drop_rate, args.latency)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    # Settings are read at import, so configure the client before importing app
+    os.environ.update({
+        "AZURE_OPENAI_API_KEY": "fake",
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{httpd.server_address[1]}",
+        "EXECMIND_LLM_MAX_CONCURRENCY": str(args.concurrency),
+        "EXECMIND_LLM_CACHE": "false",
+        "EXECMIND_TRACE": "false",
+        # Trip only on a sustained outage, not on the injected error rate
+        "EXECMIND_LLM_CIRCUIT_FAILURES": "20"
+    })
+    if args.max_retries is not None:
+        os.environ["EXECMIND_LLM_MAX_RETRIES"] = str(args.max_retries)
+    if args.match_quota:
+        os.environ["EXECMIND_LLM_RPM_LIMIT"] = str(args.server_rpm)
+    sys.path.insert(0, ROOT)
+    from app.llm.client import call_many
+
+    requests = [("Reply with JSON.", f"Request {i}") for i in range(args.requests)]
+    start = time.perf_counter()
+    results = call_many(requests, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    httpd.shutdown()
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    print(json.dumps({
+        "requests": args.requests,
+        "succeeded": args.requests - len(failed),
+        "failed": len(failed),
+        "server_responses": dict(fake.counts),
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_minute": round((args.requests - len(failed)) / elapsed * 60, 1)
+    }, indent=2))
+    if failed:
+        print(f"first error: {failed[0]}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
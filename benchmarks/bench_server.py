@@ -0,0 +1,149 @@
+"""
+Server-mode load test on localhost.
+
+Starts the HTTP API in-process on a throwaway database, with a stubbed LLM
+(fixed latency) and web search, then sends N requests per endpoint at the
+given concurrency and reports requests/sec and latency percentiles:
+
+    python benchmarks/bench_server.py --requests 200 --concurrency 32 --llm-latency 0.05
+
+Research is measured end to end: submit the job, then read its event
+stream until "done".
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def start_server(port: int):
+    """
+    Runs the server on its own event loop thread; returns once it is listening.
+    """
+    from aiohttp import web
+    from app.interfaces.server import ExecMindServer
+
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(ExecMindServer().make_app(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+
+async def research(session, base: str, payload: dict):
+    async with session.post(f"{base}/research", json=payload) as response:
+        job = await response.json()
+    async with session.get(f"{base}/jobs/{job['id']}/events") as response:
+        async for line in response.content:
+            if line.startswith(b"event: done"):
+                return 200
+            if line.startswith(b"event: error"):
+                return 500
+    return 500
+
+async def run_scenario(session, base: str, name: str, make_request, n: int, concurrency: int) -> dict:
+    latencies = []
+    failures = 0
+    counter = iter(range(n))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = await make_request(session, base, i)
+            except Exception:
+                status = 0
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status >= 400 or status == 0:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in counter))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"name": name, "rps": n / elapsed, "p50": p50, "p95": p95, "p99": p99, "failed": failures}
+
+async def _status(response_context) -> int:
+    async with response_context as response:
+        await response.read()
+        return response.status
+
+async def main_async(args):
+    import aiohttp
+
+    base = f"http://127.0.0.1:{args.port}"
+    idea_ids = []
+
+    async def frame(session, base, i):
+        return await _status(session.post(f"{base}/frame", json={"text": f"Idea {i}: a marketplace for used lab equipment"}))
+
+    async def structure(session, base, i):
+        async with session.post(f"{base}/structure", json={"text": f"Idea {i}: scheduling for field technicians", "save": True}) as response:
+            body = await response.json()
+            if response.status == 201:
+                idea_ids.append(body["id"])
+            return response.status
+
+    async def evaluate(session, base, i):
+        return await _status(session.post(f"{base}/evaluate", json={"idea_id": idea_ids[i % len(idea_ids)]}))
+
+    async def search(session, base, i):
+        return await _status(session.get(f"{base}/search", params={"q": "technicians scheduling", "limit": 10}))
+
+    async def research_job(session, base, i):
+        return await research(session, base, {"text": f"Idea {i}: carbon tracking for logistics fleets"})
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = []
+        for name, fn in [
+            ("POST /frame", frame),
+            ("POST /structure (save)", structure),
+            ("POST /evaluate", evaluate),
+            ("GET /search", search),
+            ("research job + SSE", research_job),
+        ]:
+            results.append(await run_scenario(session, base, name, fn, args.requests, args.concurrency))
+
+    print(f"{'endpoint':<24} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    for r in results:
+        print(f"{r['name']:<24} {r['rps']:8.1f} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} {r['failed']:7d}")
+    return sum(r["failed"] for r in results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stubbed LLM response time (s)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_LLM_CACHE"] = "false"
+    os.environ["EXECMIND_TRACE"] = "false"
+    from benchmarks.fakes import install_fakes
+
+    fake = install_fakes(llm_latency=args.llm_latency)
+    start_server(args.port)
+    failed = asyncio.run(main_async(args))
+    print(f"data dir: {data_dir}; stubbed LLM calls: {fake.calls}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
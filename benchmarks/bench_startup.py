@@ -0,0 +1,67 @@
+"""
+Startup budget check.
+
+Starts a fresh interpreter, imports app.main and renders the welcome screen
+and menu, and fails (exit 1) if that takes longer than the budget or if any
+heavy optional dependency was imported on the way. tests/test_startup.py
+runs the same probe with a loose budget; use this script to check a
+tighter one before merging changes to imports:
+
+    python benchmarks/bench_startup.py --budget-ms 300
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported on first use
+LAZY_MODULES = ("openai", "whisper", "torch", "ddgs", "duckduckgo_search", "sqlalchemy", "numpy")
+
+PROBE = """
+import io, json, sys, time
+start = time.perf_counter()
+import app.main as m
+m.console.file = io.StringIO()
+m.display_welcome()
+m.display_menu()
+elapsed = time.perf_counter() - start
+print(json.dumps({"menu_ms": elapsed * 1000, "loaded": [n for n in %r if n in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def measure() -> dict:
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": ROOT}
+    ).stdout
+    wall_ms = (time.perf_counter() - start) * 1000
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_ms"] = wall_ms
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    best = min(results, key=lambda r: r["process_ms"])
+    print(f"menu shown after {best['menu_ms']:.0f} ms of imports ({best['process_ms']:.0f} ms incl. interpreter), best of {args.runs}")
+
+    failed = False
+    if best["loaded"]:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(best['loaded'])}")
+        failed = True
+    if best["process_ms"] > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Storage write-path benchmark.
+
+Inserts N ideas, each with one evaluation, into a throwaway database and
+reports rows/sec for the bulk API (bulk_insert, grouped commits) against the
+per-row ORM path the workflows used before (one session + commit per row).
+
+    python benchmarks/bench_storage.py --ideas 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_rows(n: int) -> list:
+    return [
+        {
+            "raw_input": f"Benchmark idea {i}: an assistant that triages inbound requests",
+            "problem_statement": f"Teams lose time triaging request #{i}",
+            "proposed_solution": "Classify and route requests automatically",
+            "target_users": "Operations teams",
+            "assumptions": "Requests are mostly text",
+            "source": "text",
+        }
+        for i in range(n)
+    ]
+
+def make_evaluation(idea_id: int) -> dict:
+    return {
+        "idea_id": idea_id,
+        "feasibility": 7,
+        "market_value": 6,
+        "complexity": 4,
+        "risk": 3,
+        "innovation": 5,
+        "final_score": 6.25,
+        "verdict": "refine",
+        "summary": "Solid but crowded space.",
+    }
+
+def bench_bulk(n: int, batch_size: int) -> float:
+    from app.storage.database import SessionLocal, Idea, Evaluation, bulk_insert
+
+    rows = make_rows(n)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        ids = bulk_insert(db, Idea, rows, batch_size=batch_size, return_ids=True)
+        bulk_insert(db, Evaluation, [make_evaluation(i) for i in ids], batch_size=batch_size)
+    finally:
+        db.close()
+    return time.perf_counter() - start
+
+def bench_per_row(n: int) -> float:
+    from app.storage.database import SessionLocal, Idea, Evaluation
+
+    start = time.perf_counter()
+    for row in make_rows(n):
+        db = SessionLocal()
+        try:
+            idea = Idea(**row)
+            db.add(idea)
+            db.commit()
+            db.refresh(idea)
+        finally:
+            db.close()
+        db = SessionLocal()
+        try:
+            evaluation = Evaluation(**make_evaluation(idea.id))
+            db.add(evaluation)
+            db.commit()
+            db.refresh(evaluation)
+        finally:
+            db.close()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--per-row-sample", type=int, default=2000, help="Ideas inserted via the per-row path")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    from app.storage.database import init_db
+    init_db()
+
+    bulk_seconds = bench_bulk(args.ideas, args.batch_size)
+    per_row_seconds = bench_per_row(args.per_row_sample)
+
+    bulk_rate = 2 * args.ideas / bulk_seconds
+    per_row_rate = 2 * args.per_row_sample / per_row_seconds
+    print(f"data dir:        {data_dir}")
+    print(f"bulk:            {args.ideas} ideas + evaluations in {bulk_seconds:.2f}s ({bulk_rate:,.0f} rows/s)")
+    print(f"per-row session: {args.per_row_sample} ideas + evaluations in {per_row_seconds:.2f}s ({per_row_rate:,.0f} rows/s)")
+    print(f"speedup:         {bulk_rate / per_row_rate:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Transcription benchmark (needs Whisper and ffmpeg installed).
+
+Times one recording three ways with a warm model: the original file as is,
+after ffmpeg preprocessing (16 kHz mono, pauses trimmed), and re-submitted
+through transcribe_audio, which is served from the transcript cache. With
+no --file, a silence-heavy synthetic recording is generated (bursts of
+noise between long pauses):
+
+    python benchmarks/bench_transcription.py --seconds 120 --speech-ratio 0.3
+    python benchmarks/bench_transcription.py --file meeting.mp3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_recording(path: str, seconds: float, speech_ratio: float, rng: np.random.Generator):
+    from app.interfaces.audio import SAMPLE_RATE
+
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(1, 4) * SAMPLE_RATE)
+        pause = int(burst * (1 - speech_ratio) / speech_ratio)
+        samples[position:position + burst] = rng.normal(0, 0.1, len(samples[position:position + burst]))
+        position += burst + pause
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="Recording to transcribe (default: a generated one)")
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--speech-ratio", type=float, default=0.3, help="Share of the generated recording that is sound")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_TRACE"] = "false"
+    from app.storage.database import init_db
+    from app.interfaces.audio import SAMPLE_RATE, ffmpeg_available, preprocess_audio, probe_duration
+    from app.interfaces.voice import whisper_available, start_worker, transcribe_audio
+    if not whisper_available() or not ffmpeg_available():
+        sys.exit("This benchmark needs Whisper and ffmpeg installed.")
+    init_db()
+
+    path = args.file
+    if path is None:
+        path = os.path.join(data_dir, "recording.wav")
+        make_recording(path, args.seconds, args.speech_ratio, np.random.default_rng(0))
+    print(f"data dir: {data_dir}")
+
+    worker = start_worker()
+    worker.ready.wait()
+    if worker.error:
+        sys.exit(worker.error)
+
+    _, raw_seconds = timed(lambda: worker.submit(path).result())
+    samples, preprocess_seconds = timed(lambda: preprocess_audio(path))
+    _, trimmed_seconds = timed(lambda: worker.submit(samples).result() if len(samples) else "")
+    transcribe_audio(path) # fills the cache
+    _, cached_seconds = timed(lambda: transcribe_audio(path))
+
+    print(f"audio: {probe_duration(path):.1f}s, after trimming: {len(samples) / SAMPLE_RATE:.1f}s")
+    print(f"original file:        {raw_seconds:7.2f}s")
+    print(f"preprocessed:         {preprocess_seconds + trimmed_seconds:7.2f}s "
+          f"(ffmpeg {preprocess_seconds:.2f}s + model {trimmed_seconds:.2f}s)")
+    print(f"re-submitted, cached: {cached_seconds * 1000:7.1f} ms")
+    worker.shutdown()
+
+if __name__ == "__main__":
+    main()
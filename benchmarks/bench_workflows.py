@@ -0,0 +1,207 @@
+"""
+End-to-end workflow benchmark, fully offline.
+
+Swaps the Azure OpenAI client and web search for the deterministic fakes in
+benchmarks/fakes.py, seeds a throwaway database with an existing corpus, then
+runs N ideas through frame_idea -> conduct_research -> save_structured_idea
+-> evaluate_idea, several at a time. Reports throughput, latency percentiles
+per step, database size and peak memory:
+
+    python benchmarks/bench_workflows.py --ideas 200 --repeat 3 --concurrency 8
+    python benchmarks/bench_workflows.py --save benchmarks/baselines/workflows.json
+    python benchmarks/bench_workflows.py --compare benchmarks/baselines/workflows.json
+
+With --compare, exits 1 if any metric is worse than the baseline by more
+than --tolerance (a fraction). Baselines are only comparable when taken on
+the same machine with the same options.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+STEPS = ["frame", "research", "save", "evaluate"]
+# Metrics compared against a baseline, and whether higher is better
+COMPARED = {"ideas_per_second": True, "db_bytes": False, "peak_rss_mb": False}
+COMPARED.update({f"{step}_{p}_ms": False for step in STEPS + ["idea"] for p in ("p50", "p95")})
+
+SUBJECTS = ["invoice matching", "shift scheduling", "cold-chain monitoring", "contract review", "lead scoring",
+            "fleet maintenance", "patient intake", "returns processing", "energy metering", "tenant screening"]
+USERS = ["small retailers", "hospital admins", "logistics teams", "law firms", "property managers", "utilities"]
+
+def make_ideas(n: int, seed: int, offset: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        f"Idea {offset + i}: {rng.choice(SUBJECTS)} for {rng.choice(USERS)} using {rng.choice(['AI', 'sensors', 'a marketplace', 'automation'])}"
+        for i in range(n)
+    ]
+
+def seed_corpus(n: int, seed: int):
+    from app.storage.database import SessionLocal, Idea, bulk_insert
+    from app.context.provider import find_similar_ideas, get_context
+
+    db = SessionLocal()
+    try:
+        bulk_insert(db, Idea, [
+            {"raw_input": text, "problem_statement": f"Problem behind {text}", "proposed_solution": f"Solution for {text}",
+             "target_users": "Operations teams", "source": "text"}
+            for text in make_ideas(n, seed + 1, offset=-n)
+        ])
+    finally:
+        db.close()
+    # Build the similarity and retrieval indexes now rather than in the first timed idea
+    find_similar_ideas("warm up")
+    get_context("warm up")
+
+def run_idea(raw_input: str) -> dict:
+    from app.workflows.ideation import frame_idea, conduct_research, save_structured_idea
+    from app.workflows.evaluation import evaluate_idea
+
+    timings = {}
+    start = time.perf_counter()
+    framed = frame_idea(raw_input)
+    timings["frame"] = time.perf_counter()
+    report = conduct_research(framed["restatement"])
+    timings["research"] = time.perf_counter()
+    idea = save_structured_idea(raw_input, "text", report, framed_text=framed["restatement"])
+    timings["save"] = time.perf_counter()
+    evaluate_idea(idea)
+    timings["evaluate"] = time.perf_counter()
+
+    previous, result = start, {}
+    for step in STEPS:
+        result[step] = (timings[step] - previous) * 1000
+        previous = timings[step]
+    result["idea"] = (previous - start) * 1000
+    return result
+
+def summarize(results: list, elapsed: float) -> dict:
+    metrics = {"elapsed_seconds": round(elapsed, 3), "ideas_per_second": round(len(results) / elapsed, 3)}
+    for step in STEPS + ["idea"]:
+        values = np.array([r[step] for r in results])
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        metrics.update({
+            f"{step}_p50_ms": round(float(p50), 2),
+            f"{step}_p95_ms": round(float(p95), 2),
+            f"{step}_p99_ms": round(float(p99), 2),
+            f"{step}_mean_ms": round(float(values.mean()), 2)
+        })
+    return metrics
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if os.path.isfile(os.path.join(path, f)))
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(args) -> dict:
+    data_dir = tempfile.mkdtemp(prefix="execmind-bench-")
+    os.environ["EXECMIND_DATA_DIR"] = data_dir
+    os.environ["EXECMIND_LLM_CACHE"] = "false"
+    os.environ["EXECMIND_TRACE"] = "false"
+    os.environ["EXECMIND_WHISPER_PRELOAD"] = "false"
+    from benchmarks.fakes import install_fakes
+    from app.storage.database import init_db, engine
+
+    fake = install_fakes(llm_latency=args.llm_latency, search_results=args.search_results,
+                         search_latency=args.search_latency, jitter=args.jitter)
+    init_db()
+    seed_corpus(args.corpus, args.seed)
+    print(f"data dir: {data_dir}")
+
+    # Latencies on a shared machine are noisy: each metric is the median over repeats
+    runs = []
+    for r in range(args.repeat):
+        ideas = make_ideas(args.ideas, args.seed + r, offset=r * args.ideas)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(run_idea, ideas))
+        runs.append(summarize(results, time.perf_counter() - start))
+    metrics = {name: round(float(np.median([run[name] for run in runs])), 3) for name in runs[0]}
+
+    with engine.connect() as conn:
+        # Fold the write-ahead log into the database so its size is comparable
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    metrics.update({
+        "ideas": args.ideas * args.repeat,
+        "llm_calls": fake.calls,
+        "db_bytes": dir_size(data_dir),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    })
+    return {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "options": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "tolerance")},
+        "metrics": metrics
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Prints each compared metric against the baseline; returns the regressions.
+    """
+    if baseline.get("options") != result["options"]:
+        print("note: baseline was taken with different options; differences may not be meaningful")
+    regressions = []
+    print(f"\n{'metric':<22} {'baseline':>12} {'current':>12} {'change':>8}  (baseline {baseline.get('commit')})")
+    for name, higher_is_better in COMPARED.items():
+        old, new = baseline["metrics"].get(name), result["metrics"][name]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        print(f"{name:<22} {old:>12} {new:>12} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100, help="Ideas run through the full flow, per repeat")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs whose median is reported")
+    parser.add_argument("--concurrency", type=int, default=8, help="Ideas in flight at once")
+    parser.add_argument("--corpus", type=int, default=5000, help="Existing ideas in the database beforehand")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per call")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="Fake web search seconds per query")
+    parser.add_argument("--search-results", type=int, default=5)
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter, as a fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed change before a metric is flagged")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Stand-ins for the external services, so benchmarks measure ExecMind's own
+overhead: a fake AsyncAzureOpenAI client answering each workflow prompt with
+a fixed, valid response after a simulated latency, and a fake web search
+provider. Both are deterministic: latency jitter is derived from the request
+itself, so reruns see the same timings whatever the scheduling.
+
+    from benchmarks.fakes import install_fakes
+    install_fakes(llm_latency=0.05)
+"""
+import asyncio
+import json
+import random
+import time
+import types
+import zlib
+
+FRAMING = {"restatement": "A platform for {topic}", "confirmation_question": "Is this the core of the idea?"}
+STRUCTURED = {
+    "problem_statement": "Teams struggle with {topic}",
+    "proposed_solution": "A service that automates {topic}",
+    "target_users": ["operations leads", "executives"],
+    "assumptions": ["Teams will share their data", "Budgets exist for tooling"]
+}
+SCORES = {
+    "feasibility": 7, "market_value": 6, "complexity": 4, "risk": 3, "innovation": 8,
+    "verdict": "pursue", "summary": "A focused idea with a clear buyer for {topic}."
+}
+REPORT = (
+    "**Internal History:** No close internal matches for {topic}.\n\n"
+    "**External Market:** A few adjacent tools exist, none covering {topic} end to end.\n\n"
+    "**Verdict:** Novel"
+)
+SUMMARY = "The user clarified: {topic}."
+
+def _respond(system_prompt: str, user_prompt: str) -> str:
+    from app.workflows.ideation import FRAMING_SYSTEM_PROMPT, STRUCTURING_SYSTEM_PROMPT, REFINEMENT_SUMMARY_SYSTEM_PROMPT
+    from app.workflows.evaluation import EVALUATION_SYSTEM_PROMPT
+
+    topic = " ".join(user_prompt.split()[:6]).replace('"', "")
+    template = {
+        FRAMING_SYSTEM_PROMPT: FRAMING,
+        STRUCTURING_SYSTEM_PROMPT: STRUCTURED,
+        EVALUATION_SYSTEM_PROMPT: SCORES
+    }.get(system_prompt)
+    if system_prompt == REFINEMENT_SUMMARY_SYSTEM_PROMPT:
+        return SUMMARY.format(topic=topic)
+    if template is None:
+        return REPORT.format(topic=topic)
+    return json.dumps({k: v.format(topic=topic) if isinstance(v, str) else v for k, v in template.items()})
+
+def _usage(prompt: str, completion: str):
+    return types.SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(completion) // 4)
+
+class _Stream:
+    def __init__(self, content: str, usage, delay: float):
+        self.parts = [content[i:i + 16] for i in range(0, len(content), 16)]
+        self.usage = usage
+        self.delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            if self.usage is None:
+                raise StopAsyncIteration
+            usage, self.usage = self.usage, None
+            return types.SimpleNamespace(choices=[], usage=usage)
+        await asyncio.sleep(self.delay)
+        delta = types.SimpleNamespace(content=self.parts.pop(0))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+
+def _jittered(latency: float, jitter: float, key: str) -> float:
+    """
+    latency +/- jitter (a fraction), fixed per request text.
+    """
+    if not jitter:
+        return latency
+    return latency * (1 + jitter * (2 * random.Random(zlib.crc32(key.encode("utf-8"))).random() - 1))
+
+class FakeAsyncClient:
+    """
+    Mimics client.chat.completions.create of AsyncAzureOpenAI, including
+    stream=True (the latency is spread over the chunks). `responses` maps a
+    system prompt to a fixed reply, or to a function of the user prompt, to
+    override the built-in answers.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, responses: dict = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.responses = responses or {}
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def respond(self, system_prompt: str, user_prompt: str) -> str:
+        override = self.responses.get(system_prompt)
+        if override is None:
+            return _respond(system_prompt, user_prompt)
+        return override(user_prompt) if callable(override) else override
+
+    async def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        self.calls += 1
+        system_prompt, user_prompt = messages[0]["content"], messages[-1]["content"]
+        content = self.respond(system_prompt, user_prompt)
+        usage = _usage(system_prompt + user_prompt, content)
+        latency = _jittered(self.latency, self.jitter, user_prompt)
+        if stream:
+            stream_response = _Stream(content, usage, 0)
+            stream_response.delay = latency / max(1, len(stream_response.parts))
+            return stream_response
+        await asyncio.sleep(latency)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+class FakeSearchProvider:
+    """
+    Web search stand-in returning `results` synthetic hits per query after
+    `latency` seconds (blocking, like DDGS).
+    """
+
+    name = "fake"
+
+    def __init__(self, results: int = 5, latency: float = 0.0, jitter: float = 0.0):
+        self.results = results
+        self.latency = latency
+        self.jitter = jitter
+
+    def search(self, query: str, max_results: int) -> list:
+        if self.latency:
+            time.sleep(_jittered(self.latency, self.jitter, query))
+        return [
+            {"title": f"Result {i} for {query[:30]}", "body": f"Background on {query[:60]}", "href": f"https://example.com/{i}"}
+            for i in range(min(max_results, self.results))
+        ]
+
+def install_fakes(llm_latency: float = 0.05, search_results: int = 5, search_latency: float = 0.0,
+                  jitter: float = 0.0, responses: dict = None) -> FakeAsyncClient:
+    """
+    Points the shared LLM client and the web search at the fakes. Returns
+    the fake client (its `calls` counts requests).
+    """
+    from app.llm import client as llm_client
+    from app.context.web_search import set_search_provider
+
+    fake = FakeAsyncClient(llm_latency, jitter=jitter, responses=responses)
+    llm_client.client = fake
+    set_search_provider(FakeSearchProvider(search_results, search_latency, jitter))
+    return fake
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so the test environment is set up before
+# anything under app/ is imported
+os.environ["EXECMIND_DATA_DIR"] = tempfile.mkdtemp(prefix="execmind-test-")
+os.environ["EXECMIND_LLM_CACHE"] = "false"
+os.environ["EXECMIND_TRACE"] = "false"
+os.environ["EXECMIND_WHISPER_PRELOAD"] = "false"
+os.environ["EXECMIND_LLM_MAX_CONCURRENCY"] = "3"
+# Keep retry backoff short; a server-given Retry-After is still honoured
+os.environ["EXECMIND_LLM_RETRY_BASE_SECONDS"] = "0.01"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="module")
+def stub():
+    from openai import AsyncAzureOpenAI
+    from app.llm import client as llm_client
+    from llm_stub import StubServer
+
+    server = StubServer()
+    server.start()
+    previous = llm_client.client
+    llm_client.client = AsyncAzureOpenAI(api_key="test", azure_endpoint=server.url, api_version="2024-02-15-preview",
+                                         max_retries=0)
+    yield server
+    llm_client.client = previous
+    server.stop()
+
+@pytest.fixture(scope="session")
+def database():
+    """
+    Creates the tables (and FTS/aggregate triggers) in the test data directory.
+    """
+    from app.storage.database import init_db
+
+    init_db()
+
+@pytest.fixture
+def fake_llm(database):
+    """
+    Points the LLM client and web search at the deterministic fakes used by
+    the benchmarks (see benchmarks/fakes.py). Returns the fake client.
+    """
+    from app.llm import client as llm_client
+    from app.context import web_search
+    from benchmarks.fakes import install_fakes
+
+    previous = llm_client.client, web_search._provider
+    fake = install_fakes(llm_latency=0.01)
+    yield fake
+    llm_client.client, web_search._provider = previous
@@ -0,0 +1,76 @@
+"""
+A local stub of the Azure OpenAI chat completions endpoint, with fault
+injection, for the LLM client tests.
+"""
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+class StubServer:
+    """
+    Answers each chat completion with "echo: <user prompt>" after the delay
+    given in the prompt ("delay=0.1 ..."); prompts containing "fail" get a
+    400. Tracks the highest number of requests in flight at once.
+
+    Faults are injected from the prompt too: "status=503" answers with that
+    status, only for the first N attempts at the prompt with "faults=N",
+    and "retry-after=0.3" adds that Retry-After header.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.attempts = {} # prompt -> requests received
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self.url = None
+
+    async def _handle(self, request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        self.requests += 1
+        self.attempts[prompt] = self.attempts.get(prompt, 0) + 1
+        options = dict(word.split("=", 1) for word in prompt.split() if "=" in word)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if "delay" in options:
+                await asyncio.sleep(float(options["delay"]))
+            if "status" in options and self.attempts[prompt] <= int(options.get("faults", 10 ** 6)):
+                headers = {"retry-after": options["retry-after"]} if "retry-after" in options else None
+                return web.json_response({"error": {"message": "injected fault", "code": options["status"]}},
+                                         status=int(options["status"]), headers=headers)
+            if "fail" in prompt:
+                return web.json_response({"error": {"message": "bad request", "code": "400"}}, status=400)
+            return web.json_response({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": "stub",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"echo: {prompt}"}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+        finally:
+            self.in_flight -= 1
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/openai/deployments/{deployment}/chat/completions", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+    def start(self):
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def reset(self):
+        self.in_flight = self.max_in_flight = self.requests = 0
+        self.attempts.clear()
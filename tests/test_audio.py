@@ -0,0 +1,119 @@
+"""
+Pause-aware segmentation of long recordings, on synthetic PCM.
+"""
+import wave
+
+import numpy as np
+import pytest
+
+from app.interfaces import audio
+from app.interfaces.audio import SAMPLE_RATE, FRAME_SAMPLES, find_cut, frame_energy, iter_speech_segments
+
+def tone(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    return rng.normal(0, 0.1, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+def recording(rng: np.random.Generator, longest_sentence: float = 4) -> np.ndarray:
+    """
+    Sentences of 1 s to longest_sentence separated by 0.3-0.8 s pauses, with
+    a 40 s silent stretch in the middle.
+    """
+    parts = []
+    for i in range(24):
+        parts.append(tone(rng.uniform(1, longest_sentence), rng))
+        parts.append(silence(40 if i == 10 else rng.uniform(0.3, 0.8)))
+    return np.concatenate(parts)
+
+def write_wav(path: str, samples: np.ndarray) -> str:
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples * 32767).astype(np.int16).tobytes())
+    return path
+
+@pytest.fixture
+def fake_decoder(monkeypatch):
+    """
+    Replaces the ffmpeg decode with blocks of the given samples.
+    """
+    def install(samples: np.ndarray):
+        def iter_pcm_blocks(file_path, block_seconds):
+            size = int(block_seconds * SAMPLE_RATE)
+            for start in range(0, len(samples), size):
+                yield samples[start:start + size]
+        monkeypatch.setattr(audio, "iter_pcm_blocks", iter_pcm_blocks)
+    return install
+
+def test_find_cut_lands_in_the_pause():
+    rng = np.random.default_rng(0)
+    samples = np.concatenate([tone(3.0, rng), silence(0.3), tone(1.7, rng)])
+    cut = find_cut(samples, search_seconds=2)
+    assert 3.0 <= cut / SAMPLE_RATE <= 3.3
+    assert cut % FRAME_SAMPLES == 0
+
+def test_find_cut_keeps_short_buffers_whole():
+    samples = tone(1.0, np.random.default_rng(0))
+    assert find_cut(samples, search_seconds=5) == len(samples)
+
+def test_segments_match_the_single_shot_audio(fake_decoder):
+    samples = recording(np.random.default_rng(1))
+    fake_decoder(samples)
+    window = 10
+
+    segments = list(iter_speech_segments("fixture.wav", window_seconds=window, search_seconds=2))
+    assert segments
+    voiced = frame_energy(samples) > audio.SPEECH_THRESHOLD
+    covered = np.zeros(len(voiced), dtype=bool)
+    previous_end = 0.0
+    for start, end, segment in segments:
+        assert start >= previous_end
+        assert end - start <= window + 1e-9
+        # Each segment is exactly the single-shot audio for its time range
+        lo, hi = round(start * SAMPLE_RATE), round(end * SAMPLE_RATE)
+        assert np.array_equal(segment, samples[lo:hi])
+        covered[lo // FRAME_SAMPLES:hi // FRAME_SAMPLES] = True
+        previous_end = end
+
+    # No speech is lost, and most of the 40 s silence is never sent
+    assert covered[voiced].all()
+    total = sum(end - start for start, end, _ in segments)
+    assert total < len(samples) / SAMPLE_RATE - 20
+
+def test_cuts_fall_in_pauses(fake_decoder):
+    # Every 2 s search range then holds a pause
+    samples = recording(np.random.default_rng(2), longest_sentence=1.5)
+    fake_decoder(samples)
+    segments = list(iter_speech_segments("fixture.wav", window_seconds=10, search_seconds=2))
+    for _, end, _ in segments[:-1]:
+        frame = round(end * SAMPLE_RATE) // FRAME_SAMPLES - 1
+        assert frame_energy(samples[frame * FRAME_SAMPLES:(frame + 1) * FRAME_SAMPLES])[0] <= audio.SPEECH_THRESHOLD
+
+@pytest.mark.skipif(not audio.ffmpeg_available(), reason="ffmpeg is not installed")
+def test_iter_pcm_blocks_closed_early_does_not_raise(tmp_path):
+    path = write_wav(str(tmp_path / "long.wav"), tone(30, np.random.default_rng(3)))
+    blocks = audio.iter_pcm_blocks(path, block_seconds=1)
+    assert len(next(blocks)) == SAMPLE_RATE
+    blocks.close()
+
+@pytest.mark.skipif(not audio.ffmpeg_available(), reason="ffmpeg is not installed")
+def test_preprocess_audio_cuts_long_pauses(tmp_path):
+    rng = np.random.default_rng(4)
+    samples = np.concatenate([silence(2), tone(3, rng), silence(6), tone(2, rng), silence(0.3), tone(2, rng), silence(3)])
+    path = write_wav(str(tmp_path / "pauses.wav"), samples)
+
+    trimmed = audio.preprocess_audio(path, silence_min_seconds=1.0)
+    seconds = len(trimmed) / SAMPLE_RATE
+    # 7 s of speech survive, plus the short pause and a gap of at most 0.2 s per cut
+    assert 7 <= seconds <= 7.3 + 0.2 * 3
+    # The pause shorter than silence_min_seconds is left alone
+    voiced = frame_energy(trimmed) > audio.SPEECH_THRESHOLD
+    assert voiced.sum() * FRAME_SAMPLES / SAMPLE_RATE >= 6.9
+
+@pytest.mark.skipif(not audio.ffmpeg_available(), reason="ffmpeg is not installed")
+def test_preprocess_audio_gives_up_past_the_memory_cap(tmp_path):
+    path = write_wav(str(tmp_path / "long.wav"), tone(30, np.random.default_rng(5)))
+    assert audio.preprocess_audio(path, max_seconds=10) is None
+    assert len(audio.preprocess_audio(path, max_seconds=60)) / SAMPLE_RATE >= 29
@@ -0,0 +1,102 @@
+"""
+Batch import against the fake LLM: grouped commits and checkpoints.
+"""
+import csv
+import json
+import threading
+
+import pytest
+
+from app.storage.database import GroupCommitter, SessionLocal, Idea, Evaluation
+from app.workflows.batch import load_checkpoint, read_rows, run_batch
+
+def write_csv(path, ideas: list) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["idea"])
+        writer.writerows([idea] for idea in ideas)
+    return str(path)
+
+def count(model) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(model).count()
+    finally:
+        db.close()
+
+def test_group_committer_shares_commits_and_isolates_failures(database):
+    committer = GroupCommitter(max_batch=8, max_delay=0.2)
+    futures = []
+    lock = threading.Lock()
+
+    def submit(i: int):
+        def write(db):
+            if i == 3:
+                raise ValueError("bad row")
+            db.add(Idea(raw_input=f"grouped {i}", source="test"))
+            db.flush()
+            return i
+        with lock:
+            futures.append((i, committer.submit(write)))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(6)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    committer.close()
+
+    for i, future in futures:
+        if i == 3:
+            with pytest.raises(ValueError):
+                future.result()
+        else:
+            assert future.result() == i
+    # The failing write's group was retried one write per transaction
+    db = SessionLocal()
+    try:
+        stored = {raw for (raw,) in db.query(Idea.raw_input).filter(Idea.raw_input.like("grouped %"))}
+    finally:
+        db.close()
+    assert stored == {f"grouped {i}" for i in range(6) if i != 3}
+
+def test_group_committer_batches_concurrent_writes(database):
+    committer = GroupCommitter(max_batch=4, max_delay=0.5)
+    futures = [committer.submit(lambda db: None) for _ in range(8)]
+    committer.close()
+    assert all(f.result() is None for f in futures)
+    assert committer.commits == 2
+
+def test_run_batch_saves_every_row(fake_llm, tmp_path):
+    ideas_before, evaluations_before = count(Idea), count(Evaluation)
+    path = write_csv(tmp_path / "ideas.csv", [f"Batch idea number {i} about logistics" for i in range(10)])
+
+    report = run_batch(path, concurrency=4)
+    assert report["processed"] == 10 and report["failed"] == 0
+    assert count(Idea) - ideas_before == 10
+    assert count(Evaluation) - evaluations_before == 10
+    assert load_checkpoint(path) == set(range(1, 11))
+
+    # A rerun skips every checkpointed row
+    assert run_batch(path, concurrency=4)["skipped"] == 10
+    assert count(Idea) - ideas_before == 10
+
+def test_bad_jsonl_rows_are_logged_and_skipped(fake_llm, tmp_path):
+    path = tmp_path / "ideas.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"idea": "Drone delivery for rural pharmacies"}),
+        '{"idea": "truncated',
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"idea": "Shared cold storage for farmers markets"}),
+    ]) + "\n", encoding="utf-8")
+
+    errors = []
+    rows = list(read_rows(str(path), on_error=lambda row, message: errors.append(row)))
+    assert [row for row, _ in rows] == [1, 4]
+    assert errors == [2, 3]
+
+    report = run_batch(str(path), concurrency=2)
+    assert report["processed"] == 2 and report["failed"] == 2
+    with open(f"{path}.errors.jsonl", encoding="utf-8") as f:
+        logged = [json.loads(line) for line in f]
+    assert [e["row"] for e in logged] == [2, 3]
+    assert "invalid JSON" in logged[0]["error"]
+    assert load_checkpoint(str(path)) == {1, 4}
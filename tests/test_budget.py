@@ -0,0 +1,28 @@
+"""
+Prompt budgeting against the token ceiling.
+"""
+import pytest
+
+from app.llm import budget
+from app.llm.budget import count_tokens, fit_prompt
+
+def words(n: int) -> str:
+    return " ".join(f"word{i}" for i in range(n))
+
+def test_prompts_under_the_ceiling_are_untouched():
+    assert fit_prompt("system", "user", ceiling=100) == ("user", 0)
+
+def test_the_middle_of_the_user_prompt_is_cut():
+    system, user = words(50), words(2000)
+    fitted, dropped = fit_prompt(system, user, ceiling=1000)
+    assert count_tokens(system) + count_tokens(fitted) <= 1000
+    assert fitted.startswith("word0 ") and fitted.endswith("word1999")
+    assert dropped == count_tokens(user) - count_tokens(fitted)
+
+def test_a_system_prompt_filling_the_ceiling_raises():
+    with pytest.raises(ValueError, match="prompt ceiling"):
+        fit_prompt(words(500), words(100), ceiling=1000 + budget.MIN_USER_TOKENS // 2)
+
+def test_a_short_user_prompt_still_fits_beside_a_long_system_prompt():
+    system = words(195)
+    assert fit_prompt(system, "ok", ceiling=count_tokens(system) + 2) == ("ok", 0)
@@ -0,0 +1,39 @@
+"""
+DiskCache expiry and eviction.
+"""
+import time
+
+from app.storage.cache import DiskCache
+
+def test_memory_hits_keep_entries_from_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_entries=100)
+    for i in range(100):
+        cache.set(f"k{i}", "value")
+    time.sleep(0.01)
+    # Answered from the in-memory LRU, without touching SQLite
+    assert cache.get("k0") == "value"
+
+    for i in range(100, 120):
+        cache.set(f"k{i}", "value")
+    assert cache.evictions
+    assert cache.get("k0") == "value"
+    assert cache.get("k1") is None
+
+def test_access_times_are_flushed(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"))
+    cache.set("key", "value")
+    time.sleep(0.01)
+    cache.get("key")
+    cache.flush()
+
+    created_at, last_access = cache._conn.execute(
+        "SELECT created_at, last_access FROM cache WHERE key = 'key'"
+    ).fetchone()
+    assert last_access > created_at
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), ttl_seconds=0.01)
+    cache.set("key", "value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
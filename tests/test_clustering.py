@@ -0,0 +1,116 @@
+"""
+Mini-batch k-means, near-duplicate linking and incremental cluster
+assignment.
+"""
+import numpy as np
+import pytest
+from sqlalchemy import delete
+
+from app.config.settings import VECTOR_DIM
+from app.context import clustering
+from app.context.clustering import assign_idea, find_duplicates, get_cluster_model, minibatch_kmeans
+from app.storage.database import SessionLocal, Idea, IdeaCluster, IdeaClusterMember
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)).astype(np.float32)
+
+def blobs(rng, centres: np.ndarray, per_blob: int, noise: float) -> tuple:
+    labels = np.repeat(np.arange(len(centres)), per_blob)
+    return unit(centres[labels] + rng.normal(scale=noise, size=(len(labels), centres.shape[1]))), labels
+
+def test_kmeans_separates_obvious_clusters():
+    rng = np.random.default_rng(1)
+    vectors, truth = blobs(rng, np.eye(32)[[0, 10, 20]] * 5, per_blob=200, noise=0.3)
+
+    centroids = minibatch_kmeans(vectors, 3, batch_size=64, iterations=50)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1, atol=1e-5)
+    labels, _ = clustering._nearest(vectors, centroids)
+    # Each blob lands whole in its own cluster
+    assert all(len(set(labels[truth == t])) == 1 for t in range(3))
+    assert len(set(labels)) == 3
+
+def test_find_duplicates_links_near_identical_ideas():
+    rng = np.random.default_rng(2)
+    vectors, _ = blobs(rng, np.eye(32)[[0, 10]] * 5, per_blob=20, noise=1.0)
+    ids = np.arange(1, 41, dtype=np.int64)
+    # 12 repeats 3, 30 repeats 12, and 25 straddles both clusters but is near 22
+    vectors[11] = unit(vectors[2] + rng.normal(scale=0.01, size=32))
+    vectors[29] = unit(vectors[11] + rng.normal(scale=0.01, size=32))
+    vectors[24] = unit(vectors[21] + rng.normal(scale=0.01, size=32))
+
+    centroids = minibatch_kmeans(vectors, 2, batch_size=16, iterations=20)
+    groups = clustering._top_clusters(vectors, centroids, 2)
+    links = find_duplicates(ids, vectors, groups, min_similarity=0.95)
+
+    assert [(i, d, c) for i, d, c, _ in links] == [(12, 3, 3), (25, 22, 22), (30, 12, 3)]
+    assert all(s >= 0.95 for *_, s in links)
+
+@pytest.fixture
+def two_clusters(database):
+    """
+    Two clusters along the first two axes, each with ten members so far.
+    """
+    centroids = np.eye(2, VECTOR_DIM, dtype=np.float32)
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdeaClusterMember))
+        db.execute(delete(IdeaCluster))
+        db.add_all([IdeaCluster(id=c + 1, centroid=centroids[c].tobytes(), size=10) for c in range(2)])
+        db.commit()
+    finally:
+        db.close()
+    clustering.reset_cluster_model()
+    yield
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdeaClusterMember))
+        db.execute(delete(IdeaCluster))
+        db.commit()
+    finally:
+        db.close()
+    clustering.reset_cluster_model()
+
+def stored_cluster(cluster_id: int) -> tuple:
+    db = SessionLocal()
+    try:
+        centroid, size = db.query(IdeaCluster.centroid, IdeaCluster.size).filter(IdeaCluster.id == cluster_id).one()
+        members = db.query(IdeaClusterMember).filter(IdeaClusterMember.cluster_id == cluster_id).count()
+        return np.frombuffer(centroid, dtype=np.float32), size, members
+    finally:
+        db.close()
+
+def test_assign_idea_grows_the_cluster_only_on_commit(two_clusters):
+    vector = unit(np.eye(1, VECTOR_DIM, 0, dtype=np.float32)[0] + np.eye(1, VECTOR_DIM, 5, dtype=np.float32)[0] * 0.5)
+    model = get_cluster_model()
+    assert model.nearest(vector)[0] == 1
+
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input="Cluster assignment check")
+        db.add(idea)
+        db.flush()
+        assign_idea(idea.id, vector, db=db)
+        # Written but uncommitted: neither other readers nor the model see it
+        assert stored_cluster(1)[1:] == (10, 0)
+        assert model.sizes[0] == 10
+        db.rollback()
+    finally:
+        db.close()
+    centroid, size, members = stored_cluster(1)
+    assert (size, members) == (10, 0) and model.sizes[0] == 10
+    assert np.array_equal(centroid, model.centroids[0]) and centroid[5] == 0
+
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input="Cluster assignment check")
+        db.add(idea)
+        db.flush()
+        assign_idea(idea.id, vector, db=db)
+        db.commit()
+    finally:
+        db.close()
+    centroid, size, members = stored_cluster(1)
+    assert (size, members) == (11, 1) and model.sizes[0] == 11
+    # The centroid moved 1/11 of the way towards the idea, in the table and in memory
+    assert centroid[5] > 0 and np.allclose(centroid, model.centroids[0])
+    assert stored_cluster(2)[1:] == (10, 0) and model.sizes[1] == 10
@@ -0,0 +1,60 @@
+"""
+acall_llm and call_many against a local stub of the Azure OpenAI chat
+completions endpoint.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.config.settings import LLM_MAX_CONCURRENCY, LLM_PROMPT_TOKEN_CEILING
+from app.llm import client as llm_client
+
+@pytest.fixture(autouse=True)
+def _reset(stub):
+    stub.reset()
+
+def test_call_many_returns_results_in_request_order(stub):
+    # Earlier requests are slower, so they finish last
+    prompts = [f"delay={0.05 * (5 - i)} request {i}" for i in range(6)]
+    results = llm_client.call_many([("system", p) for p in prompts])
+    assert results == [f"echo: {p}" for p in prompts]
+
+def test_call_many_is_bounded_by_max_concurrency(stub):
+    start = time.perf_counter()
+    results = llm_client.call_many([("system", f"delay=0.2 request {i}") for i in range(LLM_MAX_CONCURRENCY * 3)])
+    elapsed = time.perf_counter() - start
+    assert len(results) == LLM_MAX_CONCURRENCY * 3
+    assert stub.max_in_flight == LLM_MAX_CONCURRENCY
+    # Three waves of 0.2 s, not one
+    assert elapsed >= 0.55
+
+def test_call_many_return_exceptions(stub):
+    results = llm_client.call_many(
+        [("system", "ok 1"), ("system", "fail 2"), ("system", "ok 3")], return_exceptions=True
+    )
+    assert results[0] == "echo: ok 1"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "echo: ok 3"
+
+def test_call_many_returns_a_prompt_over_the_ceiling_as_its_error(stub):
+    oversized = "x " * (LLM_PROMPT_TOKEN_CEILING * 4)
+    results = llm_client.call_many([("system", "ok 1"), (oversized, "too long")], return_exceptions=True)
+    assert results[0] == "echo: ok 1"
+    assert isinstance(results[1], ValueError)
+
+def test_call_many_raises_without_return_exceptions(stub):
+    with pytest.raises(RuntimeError):
+        llm_client.call_many([("system", "ok 1"), ("system", "fail 2")])
+
+def test_acall_llm_from_another_loop_is_bounded(stub):
+    async def run():
+        return await asyncio.gather(*[llm_client.acall_llm("system", f"delay=0.1 async {i}") for i in range(8)])
+
+    results = asyncio.run(run())
+    assert results == [f"echo: delay=0.1 async {i}" for i in range(8)]
+    assert 1 < stub.max_in_flight <= LLM_MAX_CONCURRENCY
+
+def test_acall_llm_raises_runtime_error_on_failure(stub):
+    with pytest.raises(RuntimeError, match="LLM Call Failed"):
+        asyncio.run(llm_client.acall_llm("system", "fail"))
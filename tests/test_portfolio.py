@@ -0,0 +1,122 @@
+"""
+The trigger-maintained portfolio tables: latest_evaluations, score_buckets
+and score_days stay equal to what the evaluations history implies.
+"""
+import datetime
+import math
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from app.storage.database import engine, SessionLocal, Evaluation, Idea
+from app.storage.portfolio import score_distribution, top_ideas
+
+def unix(moment: datetime.datetime) -> float:
+    return moment.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+def expected() -> tuple:
+    """
+    The three tables recomputed from the evaluations themselves.
+    """
+    db = SessionLocal()
+    try:
+        evaluations = db.query(Evaluation).filter(Evaluation.idea_id.isnot(None)).order_by(Evaluation.id).all()
+    finally:
+        db.close()
+    latest = {e.idea_id: e for e in evaluations}
+    buckets, days = defaultdict(lambda: [0, 0.0]), defaultdict(lambda: [0, 0.0])
+    for e in latest.values():
+        if e.final_score is None:
+            continue
+        for table, key in ((buckets, math.floor(e.final_score * 10 + 0.5)), (days, int(unix(e.created_at) // 86400))):
+            table[(e.verdict or "", key)][0] += 1
+            table[(e.verdict or "", key)][1] += e.final_score
+    return (
+        {idea_id: (e.id, e.final_score, e.verdict) for idea_id, e in latest.items()},
+        {key: (count, round(total, 6)) for key, (count, total) in buckets.items()},
+        {key: (count, round(total, 6)) for key, (count, total) in days.items()},
+    )
+
+def stored() -> tuple:
+    with engine.connect() as conn:
+        latest = {r[0]: tuple(r[1:]) for r in conn.execute(
+            text("SELECT idea_id, evaluation_id, final_score, verdict FROM latest_evaluations")
+        )}
+        buckets, days = (
+            {(r[0], r[1]): (r[2], round(r[3], 6)) for r in conn.execute(
+                text(f"SELECT verdict, {key}, count, score_sum FROM {table} WHERE count > 0")
+            )}
+            for table, key in (("score_buckets", "bucket"), ("score_days", "day"))
+        )
+    return latest, buckets, days
+
+def assert_consistent():
+    latest, buckets, days = stored()
+    want_latest, want_buckets, want_days = expected()
+    assert latest == want_latest
+    assert buckets == want_buckets
+    assert days == want_days
+
+def test_aggregates_follow_inserts_reevaluations_and_deletes(database):
+    day = datetime.datetime(2026, 3, 10, 12, 0)
+    db = SessionLocal()
+    try:
+        ideas = [Idea(raw_input=f"Portfolio idea {i}") for i in range(3)]
+        db.add_all(ideas)
+        db.flush()
+        first = [
+            Evaluation(idea_id=ideas[0].id, final_score=7.3, verdict="pursue", created_at=day),
+            Evaluation(idea_id=ideas[1].id, final_score=4.0, verdict="refine", created_at=day),
+            Evaluation(idea_id=ideas[2].id, final_score=None, verdict="drop", created_at=day),
+        ]
+        db.add_all(first)
+        db.commit()
+        assert_consistent()
+
+        # Re-evaluation on a later day replaces the idea's entry in both aggregates
+        again = Evaluation(idea_id=ideas[1].id, final_score=8.6, verdict="pursue", created_at=day + datetime.timedelta(days=3))
+        db.add(again)
+        db.commit()
+        assert_consistent()
+        assert stored()[0][ideas[1].id] == (again.id, 8.6, "pursue")
+
+        # Re-scoring the latest evaluation moves it between buckets; an older one is history only
+        again.final_score, again.verdict = 5.1, "refine"
+        first[1].final_score = 9.9
+        first[2].final_score = 2.0
+        db.commit()
+        assert_consistent()
+
+        # Deleting the latest falls back to the previous evaluation
+        db.delete(again)
+        db.commit()
+        assert_consistent()
+        assert stored()[0][ideas[1].id] == (first[1].id, 9.9, "refine")
+
+        # Deleting the only one drops the idea
+        db.delete(first[0])
+        db.commit()
+        assert_consistent()
+        assert ideas[0].id not in stored()[0]
+    finally:
+        db.close()
+
+def test_portfolio_queries_read_the_aggregates(database):
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input="Portfolio leader")
+        db.add(idea)
+        db.flush()
+        db.add(Evaluation(idea_id=idea.id, final_score=10.0, verdict="pursue"))
+        db.commit()
+        idea_id = idea.id
+    finally:
+        db.close()
+
+    # Other ideas may tie at the top score
+    assert top_ideas(1)[0][1]["final_score"] == 10.0
+    assert idea_id in [leader.id for leader, _ in top_ideas(100, verdict="pursue")]
+    distribution = score_distribution()
+    _, buckets, _ = expected()
+    assert distribution["count"] == sum(count for count, _ in buckets.values())
+    assert distribution["max"] == 10.0 and distribution["verdicts"]["pursue"] >= 1
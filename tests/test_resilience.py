@@ -0,0 +1,89 @@
+"""
+Retries, backoff and the circuit breaker, against faults injected by the
+local LLM stub.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.config.settings import LLM_MAX_RETRIES
+from app.llm import client as llm_client
+from app.llm import resilience
+
+@pytest.fixture(autouse=True)
+def breaker(stub, monkeypatch):
+    stub.reset()
+    fresh = resilience.CircuitBreaker(failures=2, reset_seconds=0.3)
+    monkeypatch.setattr(resilience, "_breaker", fresh)
+    monkeypatch.setattr(resilience, "_limiter", resilience.RateLimiter(rpm=0, tpm=0))
+    return fresh
+
+def test_retry_after_is_honoured(stub):
+    start = time.perf_counter()
+    prompt = "status=429 faults=1 retry-after=0.4 throttled"
+    assert llm_client.call_llm("system", prompt) == f"echo: {prompt}"
+    assert stub.attempts[prompt] == 2
+    assert time.perf_counter() - start >= 0.4
+
+def test_server_errors_are_retried(stub, breaker):
+    breaker.threshold = 5
+    prompt = "status=503 faults=2 flaky"
+    assert llm_client.call_llm("system", prompt) == f"echo: {prompt}"
+    assert stub.attempts[prompt] == 3
+
+def test_persistent_server_errors_surface(stub, breaker):
+    breaker.threshold = LLM_MAX_RETRIES + 2
+    prompt = "status=500 down"
+    with pytest.raises(RuntimeError, match="LLM Call Failed"):
+        llm_client.call_llm("system", prompt)
+    assert stub.attempts[prompt] == LLM_MAX_RETRIES + 1
+
+def test_client_errors_are_not_retried(stub, breaker):
+    prompt = "status=422 invalid"
+    with pytest.raises(RuntimeError, match="LLM Call Failed"):
+        llm_client.call_llm("system", prompt)
+    assert stub.attempts[prompt] == 1
+    assert breaker.state == "closed"
+
+def test_breaker_opens_then_half_opens_and_closes(stub, breaker):
+    with pytest.raises(RuntimeError):
+        llm_client.call_llm("system", "status=503 outage")
+    assert breaker.state == "open"
+
+    # Open: fails fast without reaching the server
+    requests = stub.requests
+    with pytest.raises(RuntimeError, match="circuit open"):
+        llm_client.call_llm("system", "while open")
+    assert stub.requests == requests
+
+    time.sleep(0.35)
+    assert breaker.state == "half-open"
+    assert llm_client.call_llm("system", "trial") == "echo: trial"
+    assert breaker.state == "closed"
+
+def test_a_failed_trial_reopens_the_breaker(stub, breaker):
+    with pytest.raises(RuntimeError):
+        llm_client.call_llm("system", "status=503 outage")
+    time.sleep(0.35)
+    with pytest.raises(RuntimeError):
+        llm_client.call_llm("system", "status=503 still down")
+    assert breaker.state == "open"
+
+def test_cancelled_trial_releases_the_half_open_slot(stub, breaker):
+    with pytest.raises(RuntimeError):
+        llm_client.call_llm("system", "status=503 outage")
+    time.sleep(0.35)
+
+    # The trial request is abandoned mid-flight, as by stream_llm or Speculation.cancel
+    future = asyncio.run_coroutine_threadsafe(
+        llm_client._complete("system", "delay=2 abandoned", use_cache=False), llm_client._get_loop()
+    )
+    time.sleep(0.2)
+    assert breaker.trial_running
+    future.cancel()
+    time.sleep(0.1)
+    assert not breaker.trial_running
+
+    assert llm_client.call_llm("system", "next trial") == "echo: next trial"
+    assert breaker.state == "closed"
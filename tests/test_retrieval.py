@@ -0,0 +1,77 @@
+"""
+Chunking, BM25 scoring and hybrid retrieval over the chunk index.
+"""
+from app.context import retrieval
+from app.context.retrieval import chunk_text, estimate_tokens, index_document, retrieve, sync_context_index
+from app.storage.database import SessionLocal, ContextChunk, Evaluation, Idea
+
+def chunks_for(source_type: str, source_id: int) -> list:
+    db = SessionLocal()
+    try:
+        return [c.text for c in db.query(ContextChunk).filter(
+            ContextChunk.source_type == source_type, ContextChunk.source_id == source_id
+        ).order_by(ContextChunk.id)]
+    finally:
+        db.close()
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(250)]
+    chunks = chunk_text(" ".join(words), words=100, overlap=20)
+    assert [len(c.split()) for c in chunks] == [100, 100, 90]
+    # Each window starts 80 words after the previous one
+    assert chunks[1].split()[0] == "w80" and chunks[2].split()[-1] == "w249"
+    assert chunk_text("") == [] and chunk_text("  short  text ") == ["short text"]
+
+def test_bm25_prefers_rare_terms_and_short_chunks(database):
+    index_document("research", 900001, "zorblax quintor market sizing notes")
+    index_document("research", 900002, "zorblax " + " ".join(f"filler{i}" for i in range(80)))
+    index_document("research", 900003, "zorblax zorblax pricing")
+
+    db = SessionLocal()
+    try:
+        scores = retrieval._bm25_scores(db, ["zorblax", "quintor"])
+        chunk_ids = {c.source_id: c.id for c in db.query(ContextChunk).filter(ContextChunk.source_id >= 900001)}
+    finally:
+        db.close()
+    both, long_chunk, repeated = (scores[chunk_ids[i]] for i in (900001, 900002, 900003))
+    # Matching the rarer term as well beats repeating the common one
+    assert both > repeated > long_chunk
+
+def test_retrieve_ranks_respects_k_and_budget(database):
+    index_document("research", 900011, "glimmerfish aquaculture feed costs in coastal farms")
+    index_document("research", 900012, "glimmerfish export regulations")
+    index_document("research", 900013, "unrelated notes on office furniture")
+
+    results = retrieve("glimmerfish aquaculture feed", k=2, alpha=0.3)
+    assert [r["source_id"] for r in results] == [900011, 900012]
+    assert results[0]["score"] >= results[1]["score"]
+    assert {r["source_type"] for r in results} == {"research"}
+
+    lexical_only = retrieve("glimmerfish aquaculture feed", k=5, alpha=0)
+    assert 900013 not in {r["source_id"] for r in lexical_only}
+
+    budget = estimate_tokens(results[0]["text"])
+    assert [r["source_id"] for r in retrieve("glimmerfish aquaculture feed", k=2, token_budget=budget)] == [900011]
+
+def test_sync_chunks_rows_below_the_highest_indexed_id(database):
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input="sync source idea")
+        db.add(idea)
+        db.flush()
+        evaluations = [
+            Evaluation(idea_id=idea.id, verdict="refine", final_score=5.0, summary=f"sync check {i}") for i in range(2)
+        ]
+        db.add_all(evaluations)
+        db.commit()
+        older, newer = (e.id for e in evaluations)
+
+        # The newer evaluation was chunked first; the older one's commit hook never ran
+        retrieval._index_document(db, "evaluation", newer, retrieval.evaluation_document(evaluations[1]))
+        db.commit()
+    finally:
+        db.close()
+
+    sync_context_index()
+    assert chunks_for("evaluation", older)
+    assert len(chunks_for("evaluation", newer)) == 1
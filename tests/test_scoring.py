@@ -0,0 +1,78 @@
+"""
+Scoring profiles: applying one re-scores stored evaluations, keeps their
+retrieval chunks in step and is seen by every process.
+"""
+import sqlite3
+
+import pytest
+
+from app.config.settings import DATABASE_URL
+from app.context.retrieval import evaluation_document, index_document
+from app.storage.database import SessionLocal, ContextChunk, Evaluation, Idea
+from app.workflows import scoring
+
+@pytest.fixture
+def restore_default(database):
+    yield
+    scoring.apply_profile(scoring.get_profile(scoring.DEFAULT_PROFILE, 1))
+
+def add_evaluation(**subscores) -> int:
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input="Rescored idea")
+        db.add(idea)
+        db.flush()
+        evaluation = Evaluation(idea_id=idea.id, verdict="refine", llm_verdict="refine", final_score=5.0,
+                                summary="Quillwort rescoring check.", **subscores)
+        db.add(evaluation)
+        db.commit()
+        index_document("evaluation", evaluation.id, evaluation_document(evaluation))
+        return evaluation.id
+    finally:
+        db.close()
+
+def stored(evaluation_id: int) -> tuple:
+    db = SessionLocal()
+    try:
+        evaluation = db.get(Evaluation, evaluation_id)
+        chunks = [c.text for c in db.query(ContextChunk).filter(
+            ContextChunk.source_type == "evaluation", ContextChunk.source_id == evaluation_id
+        )]
+        return evaluation.final_score, evaluation.verdict, evaluation.profile_id, chunks
+    finally:
+        db.close()
+
+def test_apply_profile_rescores_by_its_weights(restore_default):
+    strong = add_evaluation(feasibility=8, market_value=9, innovation=7, complexity=2, risk=3)
+    weak = add_evaluation(feasibility=3, market_value=2, innovation=4, complexity=8, risk=9)
+
+    market = scoring.create_profile("market-only", {"market_value": 1.0}, {"pursue": 7, "refine": 4})
+    report = scoring.apply_profile(market)
+    assert report["updated"] >= 2 and report["rechunked"] >= 2
+    # Only market_value counts, and the verdict follows the thresholds, not the LLM
+    assert stored(strong)[:3] == (9.0, "pursue", market.id)
+    assert stored(weak)[:3] == (2.0, "drop", market.id)
+
+    # Inverted: a risk of 3 scores 7
+    risk = scoring.create_profile("risk-averse", {"risk": 1.0}, {"pursue": 7, "refine": 4})
+    scoring.apply_profile(risk)
+    assert stored(strong)[:2] == (7.0, "pursue") and stored(weak)[:2] == (1.0, "drop")
+
+def test_apply_profile_rechunks_rescored_evaluations(restore_default):
+    evaluation_id = add_evaluation(feasibility=5, market_value=5, innovation=5, complexity=5, risk=5)
+    assert "verdict refine, score 5.0/10" in stored(evaluation_id)[3][0]
+
+    scoring.apply_profile(scoring.create_profile("generous", {"innovation": 2.0}, {"pursue": 8, "refine": 4}))
+    chunks = stored(evaluation_id)[3]
+    assert len(chunks) == 1 and "verdict pursue, score 10.0/10" in chunks[0]
+
+def test_active_profile_is_read_from_the_database(restore_default):
+    assert scoring.get_active_profile().name == scoring.DEFAULT_PROFILE
+    other = scoring.create_profile("elsewhere", dict(scoring.DEFAULT_WEIGHTS))
+
+    # Another process applies a profile; this one sees it without a restart
+    connection = sqlite3.connect(DATABASE_URL.removeprefix("sqlite:///"))
+    with connection:
+        connection.execute("UPDATE scoring_profiles SET active = (id = ?)", (other.id,))
+    connection.close()
+    assert scoring.get_active_profile().id == other.id
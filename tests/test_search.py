@@ -0,0 +1,73 @@
+"""
+Full-text search over ideas: query quoting, the trigger-maintained FTS5
+index and pagination.
+"""
+from app.storage.database import SessionLocal, Evaluation, Idea
+from app.storage.search import search_idea_ids, search_ideas, to_fts_query
+
+def test_query_words_are_quoted_and_or_ed():
+    assert to_fts_query("drone delivery") == '"drone" OR "delivery"'
+    # FTS5 operators and quotes in user input stay plain words
+    assert to_fts_query('solar NOT "panels" AND (wind*) NEAR/2 x:y') == (
+        '"solar" OR "NOT" OR "panels" OR "AND" OR "wind" OR "NEAR" OR "2" OR "x" OR "y"'
+    )
+    assert to_fts_query("  !?  ") == "" and to_fts_query(None) == ""
+
+def test_operator_words_do_not_break_search(database):
+    assert search_ideas('AND OR NOT "') == []
+    assert search_ideas("") == []
+
+def add_idea(raw_input: str, **fields) -> int:
+    db = SessionLocal()
+    try:
+        idea = Idea(raw_input=raw_input, **fields)
+        db.add(idea)
+        db.commit()
+        return idea.id
+    finally:
+        db.close()
+
+def matches(query: str) -> list:
+    return [idea_id for idea_id, _ in search_idea_ids(query, limit=50)]
+
+def test_triggers_keep_the_index_in_step(database):
+    idea_id = add_idea("Vorticulate mushroom farming", problem_statement="Growers lack humidity data")
+    assert matches("vorticulate") == [idea_id]
+    # Porter stemming: "farms" matches "farming"
+    assert matches("vorticulate farms") == [idea_id]
+
+    db = SessionLocal()
+    try:
+        idea = db.get(Idea, idea_id)
+        idea.problem_statement = "Growers lack zephyrine sensors"
+        db.add(Evaluation(idea_id=idea_id, verdict="refine", final_score=5.0, summary="Strong quorbital margins"))
+        db.commit()
+        assert matches("zephyrine") == [idea_id] and matches("humidity vorticulate") == [idea_id]
+        assert idea_id not in matches("humidity")
+        assert matches("quorbital") == [idea_id]
+
+        # Only the latest evaluation's summary is searchable
+        evaluation = db.query(Evaluation).filter(Evaluation.idea_id == idea_id).one()
+        evaluation.summary = "Weak plimsoid margins"
+        db.commit()
+        assert matches("plimsoid") == [idea_id] and matches("quorbital") == []
+
+        db.delete(evaluation)
+        db.delete(db.get(Idea, idea_id))
+        db.commit()
+    finally:
+        db.close()
+    assert matches("vorticulate") == []
+
+def test_ranking_and_pagination(database):
+    strong = add_idea("Glossamer glossamer rental", problem_statement="Glossamer owners idle", proposed_solution="Glossamer sharing")
+    weak = add_idea("Glossamer", problem_statement="Something else entirely, at length, about other matters")
+    others = [add_idea(f"Glossamer variant {i}") for i in range(5)]
+
+    ranked = search_idea_ids("glossamer", limit=10)
+    assert ranked[0][0] == strong and {i for i, _ in ranked} == {strong, weak, *others}
+    assert [r for _, r in ranked] == sorted(r for _, r in ranked)
+
+    pages = [search_ideas("glossamer", limit=3, offset=offset) for offset in (0, 3, 6)]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [idea.id for page in pages for idea in page] == [i for i, _ in ranked]
@@ -0,0 +1,96 @@
+"""
+The HTTP API, through aiohttp's test client, with the fake LLM and search.
+"""
+import asyncio
+import json
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.interfaces.server import ExecMindServer
+
+def run_with_client(test, server: ExecMindServer = None):
+    """
+    Runs test(client, server) against a fresh app on its own event loop.
+    """
+    server = server or ExecMindServer(workers=4)
+
+    async def main():
+        async with TestClient(TestServer(server.make_app())) as client:
+            await test(client, server)
+    asyncio.run(main())
+
+async def wait_for_job(client, job_id: str) -> dict:
+    for _ in range(200):
+        response = await client.get(f"/jobs/{job_id}")
+        job = await response.json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    pytest.fail(f"job {job_id} did not finish")
+
+def test_endpoints(fake_llm):
+    async def test(client, server):
+        assert (await client.get("/health")).status == 200
+
+        response = await client.post("/frame", json={"text": "Robotic lawn mowing as a service"})
+        assert response.status == 200
+        assert (await response.json())["restatement"].startswith("A platform for")
+
+        response = await client.post("/structure", json={"text": "Robotic lawn mowing as a service", "save": True})
+        assert response.status == 201
+        idea = await response.json()
+
+        response = await client.post("/evaluate", json={"idea_id": idea["id"]})
+        assert response.status == 201
+        evaluation = await response.json()
+        assert evaluation["idea_id"] == idea["id"] and evaluation["final_score"] is not None
+
+        response = await client.get("/search", params={"q": "lawn mowing"})
+        assert idea["id"] in [i["id"] for i in await response.json()]
+    run_with_client(test)
+
+def test_errors_map_to_status_codes(fake_llm, monkeypatch):
+    from app.workflows import ideation
+
+    async def test(client, server):
+        assert (await client.post("/frame", data="not json")).status == 400
+        assert (await client.post("/frame", json={"text": " "})).status == 400
+        assert (await client.get("/search")).status == 400
+        assert (await client.post("/evaluate", json={"idea_id": 10 ** 9})).status == 404
+        assert (await client.get("/jobs/research-999")).status == 404
+
+        # A KeyError inside a workflow is a server bug, not an unknown id
+        def broken(text):
+            raise KeyError("restatement")
+        monkeypatch.setattr(ideation, "frame_idea", broken)
+        assert (await client.post("/frame", json={"text": "anything"})).status == 500
+    run_with_client(test)
+
+def test_research_job_lifecycle_and_events(fake_llm):
+    async def test(client, server):
+        response = await client.post("/research", json={"text": "Subscription repair kits for bikes"})
+        assert response.status == 202
+        job = await response.json()
+        assert job["status"] in ("queued", "running")
+
+        done = await wait_for_job(client, job["id"])
+        assert done["status"] == "done" and done["result"]["report"]
+
+        # A late subscriber still gets the whole stream, ending with "done"
+        response = await client.get(f"/jobs/{job['id']}/events")
+        assert response.headers["Content-Type"] == "text/event-stream"
+        events = [block.split("\n") for block in (await response.text()).strip().split("\n\n")]
+        names = [lines[0].removeprefix("event: ") for lines in events]
+        assert set(names[:-1]) == {"delta"} and names[-1] == "done"
+        deltas = "".join(json.loads(lines[1].removeprefix("data: ")) for lines in events[:-1])
+        assert deltas == done["result"]["report"]
+    run_with_client(test)
+
+def test_job_backlog_is_bounded(fake_llm):
+    async def test(client, server):
+        server.jobs.max_pending = 0
+        response = await client.post("/research", json={"text": "Anything at all"})
+        assert response.status == 503
+        assert "retry later" in (await response.json())["error"]
+    run_with_client(test)
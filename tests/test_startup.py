@@ -0,0 +1,13 @@
+"""
+Import-time budget: the menu must come up without the heavy dependencies.
+"""
+from benchmarks.bench_startup import LAZY_MODULES, measure
+
+# Loose, so a slow CI machine does not fail it; regressions from eager
+# imports of the heavy modules cost far more than this
+BUDGET_MS = 2000
+
+def test_menu_renders_without_heavy_imports():
+    result = min((measure() for _ in range(3)), key=lambda r: r["process_ms"])
+    assert result["loaded"] == [], f"imported at startup: {result['loaded']} (must be lazy: {LAZY_MODULES})"
+    assert result["menu_ms"] < BUDGET_MS
@@ -0,0 +1,103 @@
+"""
+The incremental JSON parser, strict-schema conversion and the single repair
+round-trip in call_structured, with call_llm replaced by scripted replies.
+"""
+import json
+
+import pytest
+from pydantic import BaseModel, Field
+
+from app.llm import structured
+from app.utils.parsing import IncrementalJSONParser
+
+class Pitch(BaseModel):
+    title: str
+    score: int = Field(ge=0, le=10)
+    tags: list[str]
+
+def feed_all(chunks) -> tuple:
+    parser = IncrementalJSONParser()
+    completed = [parser.feed(chunk) for chunk in chunks]
+    return parser, completed
+
+def test_fields_complete_as_their_chunks_arrive():
+    parser, completed = feed_all(['```json\n{"ti', 'tle": "Bike', ' kits", "sco', 're": 7', ', "tags": ["a", ', '"b"]}'])
+    # A scalar is only known to be complete at the following comma
+    assert completed == [{}, {}, {"title": "Bike kits"}, {}, {"score": 7}, {"tags": ["a", "b"]}]
+    assert parser.done and parser.fields == {"title": "Bike kits", "score": 7, "tags": ["a", "b"]}
+
+def test_braces_and_quotes_inside_strings_are_not_structure():
+    text = '{"title": "uses {curly} and [square] \\"quoted\\" }", "tags": ["}{", "]"], "score": 3}'
+    # One character at a time, so every state boundary falls between chunks
+    parser, _ = feed_all(text)
+    assert parser.fields == json.loads(text)
+
+def test_trailing_prose_after_the_object_is_ignored():
+    parser, _ = feed_all(['Sure! {"title": "x", "score": 1, "tags": []}', " Hope this helps {\"score\": 9}"])
+    assert parser.done and parser.fields == {"title": "x", "score": 1, "tags": []}
+
+def test_strict_schema_requires_every_property_and_drops_rejected_keywords():
+    class Outer(BaseModel):
+        name: str = "unnamed"
+        inner: Pitch
+
+    schema = structured._strict_schema(Outer.model_json_schema())
+    assert schema["required"] == ["name", "inner"] and schema["additionalProperties"] is False
+    pitch = schema["$defs"]["Pitch"]
+    assert pitch["required"] == ["title", "score", "tags"] and pitch["additionalProperties"] is False
+    assert "minimum" not in pitch["properties"]["score"] and "default" not in schema["properties"]["name"]
+    assert not any("title" in prop for prop in pitch["properties"].values())
+
+def test_response_format_follows_the_setting(monkeypatch):
+    monkeypatch.setattr(structured, "LLM_STRUCTURED_OUTPUT", "json_schema")
+    fmt = structured.response_format(Pitch)
+    assert fmt["type"] == "json_schema" and fmt["json_schema"]["name"] == "Pitch" and fmt["json_schema"]["strict"]
+    monkeypatch.setattr(structured, "LLM_STRUCTURED_OUTPUT", "json_object")
+    assert structured.response_format(Pitch) == {"type": "json_object"}
+    monkeypatch.setattr(structured, "LLM_STRUCTURED_OUTPUT", "off")
+    assert structured.response_format(Pitch) is None
+
+@pytest.fixture
+def replies(monkeypatch):
+    """
+    Scripts call_llm: each call pops the next reply and is recorded.
+    """
+    calls, queue = [], []
+
+    def call_llm(system_prompt, user_prompt, cache=False, response_format=None):
+        calls.append((system_prompt, user_prompt, response_format))
+        return queue.pop(0)
+    monkeypatch.setattr(structured, "call_llm", call_llm)
+    return calls, queue
+
+def test_valid_response_needs_no_repair(replies):
+    calls, queue = replies
+    queue.append('{"title": "Bike kits", "score": 7, "tags": ["b2c"]}')
+    assert structured.call_structured("system", "user", Pitch).score == 7
+    assert len(calls) == 1
+
+def test_invalid_field_gets_exactly_one_repair_call(replies):
+    calls, queue = replies
+    queue += ['{"title": "Bike kits", "score": 42, "tags": ["b2c"]}', '{"score": 8}']
+    before = structured.json_stats()
+
+    pitch = structured.call_structured("system", "user", Pitch)
+    assert pitch == Pitch(title="Bike kits", score=8, tags=["b2c"])
+    assert len(calls) == 2
+    system_prompt, prompt, _ = calls[1]
+    assert system_prompt == structured.REPAIR_SYSTEM_PROMPT
+    # Only the failing field is asked for; the valid ones are passed along
+    assert '"score": 42' in prompt and '"title": "Bike kits"' in prompt.split("Already valid fields:")[1]
+
+    after = structured.json_stats()
+    assert after["invalid"] - before["invalid"] == 1 and after["repaired"] - before["repaired"] == 1
+
+def test_failed_repair_is_not_retried(replies):
+    calls, queue = replies
+    queue += ["I'm sorry, I can't produce JSON for that.", '{"title": "still missing the rest"}']
+
+    with pytest.raises(ValueError, match="Could not parse Pitch"):
+        structured.call_structured("system", "user", Pitch)
+    assert len(calls) == 2
+    # With nothing parsed, the prose answer is handed to the repair call
+    assert "Unparsed response:\nI'm sorry" in calls[1][1]
@@ -0,0 +1,80 @@
+"""
+Span parenting and the trace summary: per-stage percentiles and LLM cost
+per idea.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import tracing
+from app.utils.tracing import llm_cost, summarize
+
+@pytest.fixture
+def captured(monkeypatch):
+    records = []
+    monkeypatch.setattr(tracing, "write", records.append)
+    return records
+
+def test_nested_spans_share_the_trace(captured):
+    with tracing.span("idea") as root:
+        with tracing.span("llm", prompt_tokens=10):
+            pass
+        with ThreadPoolExecutor(1) as pool:
+            # Without bind the pool thread would start a trace of its own
+            pool.submit(tracing.bind(lambda: tracing.record("search.web", 5.0))).result()
+        root.set(idea_id=1)
+
+    llm, search, idea = captured
+    assert {llm["trace"], search["trace"]} == {idea["trace"]}
+    assert llm["parent"] == search["parent"] == idea["span"] and idea["parent"] is None
+    assert llm["prompt_tokens"] == 10 and idea["idea_id"] == 1 and search["ms"] >= 5.0
+
+def test_failed_span_records_the_error(captured):
+    with pytest.raises(KeyError):
+        with tracing.span("storage.commit"):
+            raise KeyError("x")
+    assert captured[0]["error"] == "KeyError"
+
+def spans_for_idea(trace: str, idea_id, tokens: list) -> list:
+    spans = [{"name": "idea", "trace": trace, "ms": 1000.0, "idea_id": idea_id}]
+    spans += [{"name": "llm", "trace": trace, "ms": 100.0, "prompt_tokens": p, "completion_tokens": c}
+              for p, c in tokens]
+    return spans
+
+def test_summary_percentiles_per_stage():
+    spans = [{"name": "search.web", "trace": "t", "ms": float(ms)} for ms in range(1, 101)]
+    spans.append({"name": "search.web", "trace": "t", "ms": 5.0, "error": "TimeoutError"})
+    stage, = summarize(spans)["stages"]
+    assert stage["name"] == "search.web" and stage["count"] == 101 and stage["errors"] == 1
+    assert stage["p50_ms"] == 50.0 and stage["p95_ms"] == 95.0
+    assert stage["total_s"] == round((5050 + 5) / 1000, 1)
+
+def test_summary_cost_per_saved_idea():
+    spans = (
+        spans_for_idea("a", 1, [(1000, 100), (2000, 200)])
+        + spans_for_idea("b", 2, [(1000, 100)])
+        # Trashed before saving: its spend is reported on its own
+        + spans_for_idea("c", None, [(4000, 0)])
+        # Not part of any idea (e.g. a standalone research call)
+        + [{"name": "llm", "trace": "d", "ms": 50.0, "prompt_tokens": 500, "completion_tokens": 50, "cache_hit": True}]
+    )
+    summary = summarize(spans)
+
+    cost_a, cost_b = llm_cost(3000, 300), llm_cost(1000, 100)
+    assert summary["ideas"] == 2 and summary["dropped_ideas"] == 1
+    assert summary["cost_per_idea"] == round((cost_a + cost_b) / 2, 4)
+    assert cost_b < summary["cost_per_idea_p95"] <= round(cost_a, 4)
+    assert summary["dropped_cost"] == round(llm_cost(4000, 0), 4)
+    assert summary["llm_calls"] == 5 and summary["llm_cache_hits"] == 1
+    assert (summary["prompt_tokens"], summary["completion_tokens"]) == (8500, 450)
+    assert summary["llm_cost"] == round(llm_cost(8500, 450), 4)
+
+def test_summary_of_no_spans():
+    summary = summarize([])
+    assert summary["stages"] == [] and summary["ideas"] == 0 and summary["cost_per_idea"] == 0.0
+
+def test_load_spans_skips_torn_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    path.write_text('{"name": "old", "ts": 1}\n{"name": "new", "ts": 5}\n{"name": "to', encoding="utf-8")
+    assert [s["name"] for s in tracing.load_spans(str(path))] == ["old", "new"]
+    assert [s["name"] for s in tracing.load_spans(str(path), since=2)] == ["new"]
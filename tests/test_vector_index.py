@@ -0,0 +1,84 @@
+"""
+Hashed embeddings, the on-disk VectorIndex and the idea index backfill.
+"""
+import numpy as np
+
+from app.context.vector_index import VectorIndex, embed_text, get_idea_index, tokenize
+from app.storage.database import SessionLocal, Idea
+
+def test_tokenize_lowercases_alphanumerics():
+    assert tokenize("B2B SaaS, for Ops-teams!") == ["b2b", "saas", "for", "ops", "teams"]
+    assert tokenize(None) == []
+
+def test_embeddings_are_deterministic_and_normalised():
+    a = embed_text("inventory forecasting for small retailers")
+    assert np.array_equal(a, embed_text("inventory forecasting for small retailers"))
+    assert abs(np.linalg.norm(a) - 1) < 1e-5
+    assert not embed_text("").any()
+
+def test_related_texts_score_higher():
+    query = embed_text("inventory forecasting for small retailers")
+    related = embed_text("forecasting inventory levels for retailers")
+    unrelated = embed_text("a podcast about medieval castles")
+    assert query @ related > query @ unrelated
+
+def test_add_search_and_reload(tmp_path):
+    path = str(tmp_path / "vectors")
+    index = VectorIndex(path, dim=64)
+    texts = {1: "solar panel cleaning robots", 2: "meal planning for families", 3: "robots that clean solar farms"}
+    index.add_many([(i, embed_text(t, dim=64)) for i, t in texts.items()])
+    # Ids already present are skipped, not duplicated
+    index.add(1, embed_text("something else", dim=64))
+    assert len(index) == 3
+
+    hits = index.search(embed_text("solar panel cleaning robots", dim=64), k=2)
+    assert hits[0][0] == 1 and abs(hits[0][1] - 1) < 1e-5
+    assert hits[1][0] == 3
+
+    reloaded = VectorIndex(path, dim=64)
+    assert len(reloaded) == 3 and 2 in reloaded and reloaded.max_id() == 3
+    assert reloaded.search(embed_text("meal planning for families", dim=64), k=1)[0][0] == 2
+
+def test_a_torn_append_keeps_whole_rows(tmp_path):
+    path = str(tmp_path / "vectors")
+    index = VectorIndex(path, dim=16)
+    index.add_many([(i, np.full(16, 0.25, dtype=np.float32)) for i in range(1, 4)])
+    with open(f"{path}.f32", "ab") as f:
+        f.write(b"\x00" * 10)
+    assert len(VectorIndex(path, dim=16)) == 3
+
+def test_hamming_prefilter_finds_near_neighbours(tmp_path):
+    rng = np.random.default_rng(0)
+    size = VectorIndex.EXACT_SEARCH_LIMIT + 5000
+    vectors = rng.normal(size=(size, 256)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = VectorIndex(str(tmp_path / "large"), dim=256)
+    index.add_many(zip(range(1, size + 1), vectors))
+
+    found = 0
+    for target in rng.choice(size, 50, replace=False):
+        query = vectors[target] + rng.normal(scale=0.02, size=256).astype(np.float32)
+        query /= np.linalg.norm(query)
+        hits = index.search(query, k=5)
+        assert len(hits) == 5
+        assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+        found += hits[0][0] == target + 1
+    assert found == 50
+
+def test_sync_backfills_ideas_below_the_highest_indexed_id(database):
+    db = SessionLocal()
+    try:
+        ideas = [Idea(raw_input=f"backfill idea {i}", problem_statement=f"backfill problem {i}") for i in range(3)]
+        db.add_all(ideas)
+        db.commit()
+        ids = [idea.id for idea in ideas]
+    finally:
+        db.close()
+
+    from app.context.provider import sync_idea_index
+
+    index = get_idea_index()
+    # The newest idea was indexed first; the older ones' commit hooks never ran
+    index.add(ids[-1], embed_text("backfill problem 2"))
+    sync_idea_index()
+    assert all(idea_id in index for idea_id in ids)
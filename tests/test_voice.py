@@ -0,0 +1,86 @@
+"""
+transcribe_audio_async routing, with the worker and ffmpeg replaced.
+"""
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from app.interfaces import audio, voice
+
+class FakeWorker:
+    model_size = "base"
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, audio) -> Future:
+        self.submitted.append(audio)
+        future = Future()
+        future.set_result("transcript")
+        return future
+
+@pytest.fixture
+def worker(monkeypatch):
+    fake = FakeWorker()
+    monkeypatch.setattr(voice, "start_worker", lambda model_size=None: fake)
+    monkeypatch.setattr(voice, "TRANSCRIPT_CACHE_ENABLED", False)
+    monkeypatch.setattr(audio, "probe_duration", lambda file_path: 1.0)
+    return fake
+
+def preprocessed(value=None, error: Exception = None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+    return lambda file_path: future
+
+@pytest.fixture
+def recording(tmp_path) -> str:
+    path = tmp_path / "memo.wav"
+    path.write_bytes(b"RIFF")
+    return str(path)
+
+def test_failed_preprocessing_falls_back_to_the_file(worker, recording, monkeypatch):
+    monkeypatch.setattr(audio, "preprocess_audio_async", preprocessed(error=RuntimeError("ffmpeg failed")))
+    assert voice.transcribe_audio_async(recording).result(timeout=5) == "transcript"
+    assert worker.submitted == [recording]
+
+def test_preprocessed_samples_are_sent(worker, recording, monkeypatch):
+    samples = np.ones(audio.SAMPLE_RATE, dtype=np.float32)
+    monkeypatch.setattr(audio, "preprocess_audio_async", preprocessed(samples))
+    assert voice.transcribe_audio_async(recording).result(timeout=5) == "transcript"
+    assert worker.submitted[0] is samples
+
+def test_silent_recording_skips_the_model(worker, recording, monkeypatch):
+    monkeypatch.setattr(audio, "preprocess_audio_async", preprocessed(np.zeros(0, dtype=np.float32)))
+    assert voice.transcribe_audio_async(recording).result(timeout=5) == ""
+    assert worker.submitted == []
+
+def test_recordings_of_unknown_length_are_streamed(recording, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(audio, "probe_duration", lambda file_path: None)
+    monkeypatch.setattr(audio, "ffmpeg_available", lambda: True)
+    monkeypatch.setattr(voice, "transcribe_audio_async", lambda file_path: pytest.fail("decoded whole"))
+    monkeypatch.setattr(voice, "transcribe_stream", lambda file_path: iter([
+        {"start": 0.0, "end": 4.0, "text": "first part"}, {"start": 4.0, "end": 9.0, "text": "second part"}
+    ]))
+    assert main.transcribe_file(recording) == "first part second part"
+
+def test_submit_after_the_worker_failed_does_not_hang(monkeypatch):
+    import itertools
+    import threading
+
+    worker = object.__new__(voice.TranscriptionWorker)
+    worker._lock, worker._pending, worker._ids = threading.Lock(), {}, itertools.count(1)
+    worker._closed, worker.error = None, None
+    # The process has just died, but is_alive() was true when checked
+    monkeypatch.setattr(voice.TranscriptionWorker, "is_alive", lambda self: True)
+    worker._fail_pending("Transcription worker exited unexpectedly.")
+
+    future = worker.submit("memo.wav")
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        future.result(timeout=1)
+    assert worker._pending == {}
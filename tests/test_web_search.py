@@ -0,0 +1,28 @@
+"""
+Per-query search caching, with a local fake provider.
+"""
+from app.context import web_search
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.calls = 0
+
+    def search(self, query: str, max_results: int) -> list:
+        self.calls += 1
+        return self.responses.pop(0)
+
+def test_results_are_cached():
+    provider = FakeProvider([[{"title": "A", "body": "", "href": "https://a.example"}]])
+    first = web_search._cached_search(provider, "cached query", 5)
+    assert web_search._cached_search(provider, "cached query", 5) == first
+    assert provider.calls == 1
+
+def test_empty_results_are_not_cached():
+    hit = [{"title": "B", "body": "", "href": "https://b.example"}]
+    provider = FakeProvider([[], hit])
+    assert web_search._cached_search(provider, "flaky query", 5) == []
+    assert web_search._cached_search(provider, "flaky query", 5) == hit
+    assert provider.calls == 2